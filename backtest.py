@@ -1,5 +1,8 @@
 
-import MetaTrader5 as mt5
+try:
+    import MetaTrader5 as mt5
+except ImportError:  # Offline research nodes: backtest from stored data and symbol.json
+    mt5 = None
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -7,49 +10,108 @@ import json
 import logging
 import os
 import time
+import argparse
+import heapq
+import hashlib
+import pickle
+import shutil
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
 from strategies.rsi_strategy import RSIStrategy
 from core.base_trading_strategy import BaseTradingStrategy
 from core.risk_manager import RiskManager
 from core.simulated_trade_manager import SimulatedTradeManager
 from core.trade_manager import TradeManager as LiveTradeManager
+from core.timeframe_cursor import MultiTimeframeCursor, TIMEFRAME_MINUTES, timeframe_delta
+from core.exit_resolver import resolve_exits, settle_exit
+from core.trade_accounting import open_trade, close_trade
+from core.range_extrema import RangeExtremaIndex
+from core.hierarchical_exit import HierarchicalExitEngine
+from core.param_grid import expand_grid, apply_params
+from core.vector_sweep import evaluate_param_sets
+from core.feature_cache import FeatureCache, data_fingerprint
+from core.indicators import calculate_rsi_rma
+from core.event_engine import EventDrivenBacktest
+from core.clock import VirtualClock
+from core.monte_carlo import run_monte_carlo
+from core.synthetic_paths import generate_synthetic_path
+from core.results_sink import ResultsSink, EquityBuffer, read_columns
+from core.result_cache import ResultCache
+from core.mtm_equity import mark_to_market
+from core.metrics import compute_metrics
+from core.run_monitor import RunningMetrics, AbortRules
+from core.optimizer import SearchSpace, GeneticOptimizer, Study, COMPLETE, PRUNED, FAILED
+from core.cpcv import cpcv_splits, group_bounds, evaluate_splits, summarize
+from core.shared_data import SharedMarketData, attach_market_data
+from core.simulated_feed import SimulatedDataFeed
+from strategy_manager import StrategyManager
+
+# Longest holding period resolved with the dense (trades x window) scan
+DENSE_EXIT_WINDOW_MINUTES = 240
+
+# Bump whenever a change to the engine alters backtest results, so cached
+# results of the previous engine are no longer served
+ENGINE_VERSION = 6
+
+# Keys of the backtest config section that change the outcome of simulate()
+SIMULATION_SETTINGS = (
+    'initial_balance', 'vectorized', 'engine', 'max_holding_minutes',
+    'exit_engine', 'exit_timeframes', 'drill_down_depth'
+)
 
 class Backtest:
-    def __init__(self, config):
+    def __init__(self, config, log_file=True):
         self.config = config
-        self.setup_logging()
+        self.setup_logging(log_file)
+        # MT5 timeframe constants, None when MetaTrader5 is not installed
         self.timeframes = {
-            'M1': mt5.TIMEFRAME_M1,
-            'M5': mt5.TIMEFRAME_M5,
-            'M15': mt5.TIMEFRAME_M15,
-            'M30': mt5.TIMEFRAME_M30,
-            'H1': mt5.TIMEFRAME_H1,
-            'H2': mt5.TIMEFRAME_H2,
-            'H4': mt5.TIMEFRAME_H4,
-            'D1': mt5.TIMEFRAME_D1
+            name: getattr(mt5, f'TIMEFRAME_{name}') if mt5 is not None else None
+            for name in ('M1', 'M5', 'M15', 'M30', 'H1', 'H2', 'H4', 'D1')
         }
         self.data_dir = 'backtest/data'
+        self.symbol_spec_file = f'{self.data_dir}/symbol.json'
         self.results_dir = 'backtest/results'
+        self.state_dir = 'backtest/state'
         self.ensure_directories()
+        # Indicator arrays shared by every run and sweep point of this instance
+        self.feature_cache = FeatureCache(
+            max_bytes=self.config['backtest'].get('feature_cache_mb', 256) * 2**20,
+            logger=self.logger
+        )
+        cache_config = self.config['backtest'].get('result_cache', {})
+        self.result_cache = None
+        if cache_config.get('enabled', False):
+            self.result_cache = ResultCache(
+                directory=cache_config.get('directory', 'backtest/cache'),
+                max_bytes=cache_config.get('max_mb', 512) * 2**20,
+                logger=self.logger
+            )
 
-    def setup_logging(self):
-        log_dir = 'backtest/logs'
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
+    def setup_logging(self, log_file=True):
         self.logger = logging.getLogger('Backtest')
         self.logger.setLevel(logging.INFO)
-        fh = logging.FileHandler(f'{log_dir}/backtest_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
-        fh.setLevel(logging.INFO)
+
+        # Avoid adding handlers multiple times (one Backtest per pool worker)
+        if self.logger.handlers:
+            return
+
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        if log_file:
+            log_dir = 'backtest/logs'
+            if not os.path.exists(log_dir):
+                os.makedirs(log_dir)
+            fh = logging.FileHandler(f'{log_dir}/backtest_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
+            fh.setLevel(logging.INFO)
+            fh.setFormatter(formatter)
+            self.logger.addHandler(fh)
         ch = logging.StreamHandler()
         ch.setLevel(logging.INFO)
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        fh.setFormatter(formatter)
         ch.setFormatter(formatter)
-        self.logger.addHandler(fh)
         self.logger.addHandler(ch)
 
     def ensure_directories(self):
-        for directory in [self.data_dir, self.results_dir]:
+        for directory in [self.data_dir, self.results_dir, self.state_dir]:
             if not os.path.exists(directory):
                 os.makedirs(directory)
 
@@ -102,14 +164,24 @@ class Backtest:
 
         return ranges
                 
-    def download_data(self, days=300):
-        """Download historical data for all timeframes"""
-        if not mt5.initialize(
-            path=r"C:\Program Files\MetaTrader 5\terminal64.exe",
+    def initialize_mt5(self):
+        """Connect to the MT5 terminal configured in the mt5 section"""
+        if mt5 is None:
+            self.logger.error("MetaTrader5 package is not installed")
+            return False
+        return mt5.initialize(
+            path=self.config['mt5'].get('path', r"C:\Program Files\MetaTrader 5\terminal64.exe"),
             login=self.config['mt5']['account'],
             password=self.config['mt5']['password'],
             server=self.config['mt5']['server']
-        ):
+        )
+
+    def download_data(self, days=300):
+        """Download historical data for all timeframes"""
+        if mt5 is None:
+            self.logger.error("MetaTrader5 package is not installed, cannot download data")
+            return False
+        if not self.initialize_mt5():
             error = mt5.last_error()
             self.logger.error(f"Failed to initialize MT5. Error code: {error}")
             self.logger.error("Please make sure:")
@@ -161,6 +233,7 @@ class Backtest:
             self.logger.info(f"- Volume min: {symbol_info.volume_min}")
             self.logger.info(f"- Volume max: {symbol_info.volume_max}")
             self.logger.info(f"- Volume step: {symbol_info.volume_step}")
+            self.save_symbol_spec(symbol_info)
             
             point = symbol_info.point
             self.logger.info(f"Symbol {symbol} point value: {point}")
@@ -230,7 +303,9 @@ class Backtest:
                 self.logger.warning(f"No data file found for {tf_name}")
                 
         # Download missing timeframes if any
-        if missing_timeframes:
+        if missing_timeframes and mt5 is None:
+            self.logger.warning(f"MetaTrader5 is not installed, running without {', '.join(missing_timeframes)}")
+        elif missing_timeframes:
             self.logger.info(f"Downloading missing timeframes: {', '.join(missing_timeframes)}")
             if self.download_data():
                 # Reload all data after downloading
@@ -272,27 +347,145 @@ class Backtest:
 
         return None, None
 
-    def run_backtest(self, strategy_class=RSIStrategy):
-        """Run backtest for the strategy"""
-        # Initialize MT5 to get symbol info
-        if not mt5.initialize(
-            path=r"C:\Program Files\MetaTrader 5\terminal64.exe",
-            login=self.config['mt5']['account'],
-            password=self.config['mt5']['password'],
-            server=self.config['mt5']['server']
-        ):
+    def rsi_feature(self, data, tf, period):
+        """Memoized full-history RSI array of a timeframe"""
+        return self.feature_cache.get_or_compute(
+            tf, 'rsi_rma', (period,), data[tf],
+            lambda: calculate_rsi_rma(data[tf], period).to_numpy()
+        )
+
+    def build_exit_resolver(self, data):
+        """
+        Build the SL/TP exit resolver configured in config['backtest'].
+
+        'batch' scans the finest available of exit_timeframes (M1, else M5),
+        'hierarchical' scans coarse bars first and drills down drill_down_depth
+        levels. Both return a function (entry_times, sides, sl, tp) ->
+        (exit_price, exit_type, exit_time).
+        """
+        backtest_config = self.config['backtest']
+        exit_timeframes = backtest_config.get('exit_timeframes', ['H1', 'M15', 'M5', 'M1'])
+
+        # Holding period of a trade, null in config means no limit
+        holding_minutes = backtest_config.get('max_holding_minutes', 60)
+        holding = None if holding_minutes is None else np.timedelta64(holding_minutes, 'm')
+
+        if backtest_config.get('exit_engine', 'batch') == 'hierarchical':
+            engine = HierarchicalExitEngine(
+                data,
+                timeframes=exit_timeframes,
+                depth=backtest_config.get('drill_down_depth'),
+                holding=holding,
+                logger=self.logger
+            )
+            self.logger.info(f"Hierarchical exit engine levels: {' -> '.join(engine.levels)}")
+            return engine.resolve
+
+        available = [tf for tf in exit_timeframes if tf in data and tf in TIMEFRAME_MINUTES]
+        if not available:
+            raise ValueError(f"No data for any exit timeframe: {exit_timeframes}")
+        exit_tf = min(available, key=lambda tf: TIMEFRAME_MINUTES[tf])
+        if exit_tf != 'M1':
+            self.logger.warning(f"M1 data not available, resolving exits on {exit_tf}")
+
+        df = data[exit_tf]
+        times = df['time'].to_numpy()
+        highs = df['high'].to_numpy()
+        lows = df['low'].to_numpy()
+        closes = df['close'].to_numpy()
+
+        # Long or unlimited windows are resolved through a range-extrema index
+        exit_index = None
+        if holding_minutes is None or holding_minutes > DENSE_EXIT_WINDOW_MINUTES:
+            exit_index = RangeExtremaIndex(highs, lows)
+
+        def resolve(entry_times, sides, sl, tp):
+            return resolve_exits(
+                entry_times, sides, sl, tp,
+                times, highs, lows, closes,
+                holding=holding,
+                index=exit_index
+            )
+
+        return resolve
+
+    def save_symbol_spec(self, symbol_info):
+        """Store the specification of a symbol in the data directory's symbol.json"""
+        specs = self.load_symbol_specs()
+        specs[symbol_info.name] = {
+            'point': symbol_info.point,
+            'digits': symbol_info.digits,
+            'trade_tick_value': symbol_info.trade_tick_value,
+            'trade_tick_size': symbol_info.trade_tick_size,
+            'trade_contract_size': symbol_info.trade_contract_size,
+            'volume_min': symbol_info.volume_min,
+            'volume_max': symbol_info.volume_max,
+            'volume_step': symbol_info.volume_step,
+            'saved': datetime.now().isoformat(timespec='seconds')
+        }
+        try:
+            with open(self.symbol_spec_file, 'w') as f:
+                json.dump(specs, f, indent=4)
+            self.logger.info(f"Saved {symbol_info.name} specification to {self.symbol_spec_file}")
+        except Exception as e:
+            self.logger.error(f"Failed to save symbol specification: {str(e)}")
+
+    def load_symbol_specs(self):
+        """Symbol specifications stored by save_symbol_spec, keyed by symbol"""
+        if not os.path.exists(self.symbol_spec_file):
+            return {}
+        try:
+            with open(self.symbol_spec_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.error(f"Failed to read {self.symbol_spec_file}: {str(e)}")
+            return {}
+
+    def get_symbol_spec(self):
+        """
+        Point and tick value of the traded symbol, from symbol.json when the
+        symbol was stored there and from MT5 otherwise.
+        """
+        symbol = self.config['trading']['symbol']
+        spec = self.load_symbol_specs().get(symbol)
+        if spec is not None:
+            return spec['point'], spec['trade_tick_value']
+
+        if mt5 is None:
+            self.logger.error(f"No specification of {symbol} in {self.symbol_spec_file} and MetaTrader5 is not installed")
+            return None
+        if not self.initialize_mt5():
             self.logger.error("Failed to initialize MT5 for symbol info")
             return None
 
-        symbol_info = mt5.symbol_info(self.config['trading']['symbol'])
+        symbol_info = mt5.symbol_info(symbol)
         if symbol_info is None:
-            self.logger.error(f"Failed to get symbol info for {self.config['trading']['symbol']}")
+            self.logger.error(f"Failed to get symbol info for {symbol}")
             mt5.shutdown()
             return None
 
+        self.save_symbol_spec(symbol_info)
         point = symbol_info.point
         pip_value = symbol_info.trade_tick_value
         mt5.shutdown()
+        return point, pip_value
+
+    def load_strategy_config(self):
+        """Load the RSI strategy configuration"""
+        strategy_config_path = os.path.join(
+            self.config['strategies']['config_path'],
+            'rsi_strategy.json'
+        )
+        with open(strategy_config_path, 'r') as f:
+            return json.load(f)
+
+    def run_backtest(self, strategy_class=RSIStrategy):
+        """Run backtest for the strategy"""
+        # Initialize MT5 to get symbol info
+        spec = self.get_symbol_spec()
+        if spec is None:
+            return None
+        point, pip_value = spec
 
         # Load data
         data = self.load_data()
@@ -300,28 +493,65 @@ class Backtest:
             self.logger.error("No data available for backtest")
             return None
 
-        # Load strategy configuration
-        strategy_config_path = os.path.join(
-            self.config['strategies']['config_path'],
-            'rsi_strategy.json'
-        )
-        with open(strategy_config_path, 'r') as f:
-            strategy_config = json.load(f)
+        strategy_config = self.load_strategy_config()
 
-        # Merge configurations
-        merged_config = self.config.copy()
-        merged_config['strategy'] = strategy_config['strategy']
+        # Streaming mode: trades and equity go to disk in batches during the run
+        results_config = self.config['backtest'].get('results', {})
+        if results_config.get('stream', False):
+            if self.config['backtest'].get('mark_to_market', False):
+                self.logger.warning("Mark-to-market needs the trades in memory, skipped for streamed results")
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            sink = ResultsSink(f"{self.results_dir}/run_{timestamp}", results_config.get('batch_rows', 10000))
+            results = self.simulate(data, strategy_config, point, pip_value, strategy_class, sink=sink)
+            sink.close()
+            if results is None:
+                return None
+            self.calculate_sink_metrics(results, sink, results['metrics']['max_drawdown'])
+            with open(f"{sink.directory}/metrics.json", 'w') as f:
+                json.dump(results['metrics'], f, indent=4)
+            self.logger.info(f"Streamed backtest results to {sink.directory}")
+            return results
 
-        # Initialize strategy
-        strategy = strategy_class(merged_config)
+        results = self.simulate(data, strategy_config, point, pip_value, strategy_class)
+        if results is None:
+            return None
 
-        risk_manager = RiskManager(self.config['trading'])
-        if self.config.get("mode", "backtest") == "live":
-            trade_manager = LiveTradeManager(self.config['mt5'])
-        else:
-            trade_manager = SimulatedTradeManager(self.config['trading'])
+        if self.config['backtest'].get('mark_to_market', False):
+            self.add_mark_to_market(results, data, point, pip_value)
+        self.save_results(results)
+        return results
+
+    def add_mark_to_market(self, results, data, point, pip_value):
+        """
+        Add the mark-to-market equity curve of a finished run as
+        results['mtm_equity'] and its drawdown as metrics['max_drawdown_mtm'].
+        """
+        tf = self.config['backtest'].get('mtm_timeframe', 'M1')
+        if tf not in data:
+            self.logger.warning(f"{tf} data not available, marking to market on M5")
+            tf = 'M5'
+        bars = data[tf]
+        equity = results['equity_curve']
+        if len(equity):
+            first = np.datetime64(equity['time'].iloc[0], 'ns')
+            last = np.datetime64(equity['time'].iloc[-1], 'ns') + timeframe_delta('M5')
+            times = bars['time'].to_numpy().astype('datetime64[ns]')
+            bars = bars.iloc[np.searchsorted(times, first):np.searchsorted(times, last)]
 
-        results = {
+        curve = mark_to_market(
+            results['trades'], bars, point, pip_value, self.config['backtest']['initial_balance']
+        )
+        results['mtm_equity'] = curve
+        results['metrics']['max_drawdown_mtm'] = float(curve['drawdown'].max()) if len(curve) else 0
+        self.logger.info(
+            f"Mark-to-market on {tf}: max drawdown {results['metrics']['max_drawdown_mtm']:.2%} "
+            f"(realized {results['metrics']['max_drawdown']:.2%})"
+        )
+
+    @staticmethod
+    def new_results():
+        """Empty results structure filled by simulate() and calculate_metrics()"""
+        return {
             'trades': [],
             'equity_curve': [],
             'metrics': {
@@ -336,158 +566,339 @@ class Backtest:
             }
         }
 
+    def simulate(self, data, strategy_config, point, pip_value, strategy_class=RSIStrategy, start=None, end=None,
+                 sink=None, state=None, incremental=False, abort=None):
+        """
+        Run the backtest over already loaded data, serving the results from
+        the result cache when the same run was done before.
+
+        Arguments are those of _simulate; streaming, resumed and incremental
+        runs are never cached.
+        """
+        if self.result_cache is None or sink is not None or state is not None or incremental:
+            return self._simulate(data, strategy_config, point, pip_value, strategy_class, start, end, sink, state, incremental,
+                                  abort)
+
+        key = self.result_cache.key(data, {
+            'config': self.simulation_settings(),
+            'strategy': strategy_config,
+            'strategy_class': strategy_class.__name__,
+            'spec': [point, pip_value],
+            'range': [start, end],
+            'abort': abort.to_dict() if abort is not None else None
+        }, ENGINE_VERSION)
+        results = self.result_cache.get(key)
+        if results is not None:
+            self.logger.info(f"Loaded cached backtest results {key[:12]}")
+            return results
+
+        results = self._simulate(data, strategy_config, point, pip_value, strategy_class, start, end, abort=abort)
+        if results is not None:
+            self.result_cache.put(key, results, description=f"{strategy_class.__name__} {start or ''}:{end or ''}")
+        return results
+
+    def simulation_settings(self):
+        """
+        The parts of the config that simulate() depends on: the trading
+        section, the mode, the leverage and SIMULATION_SETTINGS of the backtest
+        section. Other settings (logging, optimize, cpcv, results, ...) do not
+        change a run's outcome.
+        """
+        backtest_config = self.config['backtest']
+        return {
+            'trading': self.config['trading'],
+            'mode': self.config.get('mode', 'backtest'),
+            'leverage': self.config['mt5']['leverage'],
+            'backtest': {name: backtest_config.get(name) for name in SIMULATION_SETTINGS}
+        }
+
+    def _simulate(self, data, strategy_config, point, pip_value, strategy_class=RSIStrategy, start=None, end=None,
+                  sink=None, state=None, incremental=False, abort=None):
+        """
+        Run the backtest loop over already loaded data and compute metrics.
+
+        start/end restrict the main-timeframe steps that are traded; bars
+        before start still serve as indicator history. With a ResultsSink,
+        closed trades and equity points are streamed to it instead of being
+        kept in the results; streamed runs always use the loop engine, and
+        their metrics hold the sink's running totals until
+        calculate_sink_metrics() is run on the closed sink.
+
+        In incremental mode, trades still open at the end are not settled and
+        the end-of-run state (strategy accumulators, open trades, balance and
+        drawdown peak) is returned under results['state']; passing it back as
+        `state` with `start` at the next step continues the run.
+
+        With AbortRules, the run stops at the first step that breaks a rule;
+        metrics then carry the 'aborted' reason and the 'progress' fraction
+        of steps simulated.
+        """
+        # Merge configurations
+        merged_config = self.config.copy()
+        merged_config['strategy'] = strategy_config
+
+        # Initialize strategy
+        strategy = strategy_class(merged_config)
+        if hasattr(strategy, 'feature_cache'):
+            strategy.feature_cache = self.feature_cache
+
+        risk_manager = RiskManager(self.config['trading'])
+        if self.config.get("mode", "backtest") == "live":
+            trade_manager = LiveTradeManager(self.config['mt5'])
+        else:
+            trade_manager = SimulatedTradeManager(self.config['trading'])
+
+        results = self.new_results()
+
         main_tf = 'M5'
         if main_tf not in data:
             self.logger.error(f"Main timeframe {main_tf} data not available")
             return None
-        m1_data = data['M1']
+        resolve_trade_exits = self.build_exit_resolver(data)
 
         initial_balance = self.config['backtest']['initial_balance']
         current_balance = initial_balance
         max_balance = initial_balance
         max_drawdown = 0
         open_trades = []
+        if state is not None:
+            current_balance = state['balance']
+            max_balance = state['max_balance']
+            max_drawdown = state['max_drawdown']
+            open_trades = [dict(t) for t in state['open_trades']]
+            risk_manager.update_open_positions(len(open_trades))
+            if hasattr(strategy, 'set_state'):
+                strategy.set_state(state['strategy'])
+        running = RunningMetrics(initial_balance, peak=max_balance, max_drawdown=max_drawdown)
 
-        main_data = data[main_tf]
-        initial_balance = self.config['backtest']['initial_balance']
-        current_balance = initial_balance
-        max_balance = initial_balance
-        max_drawdown = 0
-        open_trades = []
+        # Precompute closed-bar indices of every timeframe for each main step
+        cursor = MultiTimeframeCursor(data, main_tf)
+        min_required_bars = max(strategy.rsi_periods.values())
 
-        # Run backtest
-        for i in range(1, len(main_data)):
-            current_time = main_data.iloc[i]['time']
-            # Prepare data for current time
-            current_data = {tf: df[df['time'] <= current_time].copy() for tf, df in data.items()}
+        # Event-driven mode: only bars carrying a signal and exits are visited.
+        # It keeps its trades and equity in memory, so streamed runs use the loop.
+        use_events = self.config['backtest'].get('engine', 'loop') == 'events'
+        if use_events and sink is not None:
+            self.logger.warning("The event engine does not stream results, running the loop engine")
+        if (use_events and hasattr(strategy, 'build_signal_arrays')
+                and sink is None and state is None and not incremental):
+            engine = EventDrivenBacktest(
+                self.config, strategy, risk_manager, trade_manager,
+                resolve_trade_exits, point, pip_value, logger=self.logger
+            )
+            run = engine.run(data, cursor, min_required_bars, start=start, end=end, abort=abort)
+            self.logger.info(f"Event engine processed {engine.events_processed} events for {len(cursor)} bars")
+            results['trades'] = run['trades']
+            results['equity_curve'] = run['equity_curve']
+            self.calculate_metrics(results, run['max_drawdown'])
+            if abort is not None:
+                results['metrics']['aborted'] = run['aborted'] or ''
+                results['metrics']['progress'] = run['progress']
+            return results
 
-            min_required_bars = max(strategy.rsi_periods.values())
-            if any(len(df) < min_required_bars for df in current_data.values()):
+        # Vectorized mode: build every signal of the run in one pass
+        vectorized = (
+            self.config['backtest'].get('vectorized', False)
+            and hasattr(strategy, 'build_signal_arrays')
+        )
+        if vectorized:
+            signal_arrays = strategy.build_signal_arrays(data, cursor)
+            has_signal = np.zeros(len(cursor), dtype=bool)
+            for arrays in signal_arrays.values():
+                has_signal |= arrays['side'] != 0
+
+        # Run backtest
+        first_step = max(start or 1, 1)
+        last_step = len(cursor) if end is None else min(end, len(cursor))
+        equity = EquityBuffer(last_step - first_step, sink)
+        last_done = first_step - 1
+        aborted = None
+        for i in range(first_step, last_step):
+            current_time = cursor.time(i)
+            last_done = i
+            if any(n < min_required_bars for n in cursor.counts(i).values()):
                 continue
 
-            # Get signals
-            signals = strategy.check_signals(current_data)
-            
-            # Process new signals
-            for signal in signals:
-                price = signal['price']
-                pip_distance = abs(signal['sl'] - price) / point
-                if pip_distance == 0:
+            # Close trades whose resolved exit happened before this bar closed
+            step_close = cursor.close_times[i]
+            for trade in open_trades[:]:
+                if trade.get('exit_time') is None or trade['exit_time'] >= step_close:
                     continue
 
-                risk_amount = current_balance * (self.config['trading']['risk_per_trade'] / 100)
-                volume = min(
-                    risk_amount / (pip_distance * pip_value),
-                    self.config['trading']['max_position_size']
-                )
-                volume = max(volume, self.config['trading']['min_position_size'])
+                current_balance += self.close_trade(trade, point, pip_value)
+                running.record_trade(trade['profit'])
+                if sink is not None:
+                    sink.write_trade(trade)
+                else:
+                    results['trades'].append(trade)
+                open_trades.remove(trade)
+                risk_manager.update_open_positions(len(open_trades))
+                self.logger.info(f"Closed {trade['type']} trade ({trade['exit_type']}) @ {trade['exit_price']:.2f}, PnL={trade['profit']:.2f}, Balance={current_balance:.2f}")
 
-                if not risk_manager.can_open_position(volume, price):
-                    continue
+            # Get signals
+            if vectorized:
+                signals = strategy.signals_at(signal_arrays, i) if has_signal[i] else []
+            else:
+                # Read-only views of the bars closed at current time (no copies)
+                current_data = cursor.window(i)
+                signals = strategy.check_signals(current_data)
 
-                order_id = trade_manager.place_order(
-                    order_type=signal['type'],
-                    volume=volume,
-                    price=price,
-                    sl=signal['sl'],
-                    tp=signal['tp']
+            # Process new signals: orders fill at the close of the signal bar
+            entry_time = cursor.close_time(i)
+            for signal in signals:
+                trade = open_trade(
+                    signal, entry_time, current_balance, point, pip_value,
+                    self.config, risk_manager, trade_manager
                 )
-
-                if order_id:
-                    trade = {
-                        'order_id': order_id,
-                        'time': current_time,
-                        'type': signal['type'],
-                        'price': price,
-                        'volume': volume,
-                        'sl': signal['sl'],
-                        'tp': signal['tp'],
-                        'leverage': self.config['mt5']['leverage']
-                    }
+                if trade is not None:
                     open_trades.append(trade)
                     risk_manager.update_open_positions(len(open_trades))
-                    self.logger.info(f"Simulated trade Opened {signal['type']} @: Time={current_time}, Price={signal['price']:.2f}, Volume={volume:.2f}, SL={signal['sl']:.2f}, TP={signal['tp']:.2f}")
-
-            current_price = main_data.iloc[i]['close']
+                    self.logger.info(f"Simulated trade Opened {signal['type']} @: Time={entry_time}, Price={signal['price']:.2f}, Volume={trade['volume']:.2f}, SL={signal['sl']:.2f}, TP={signal['tp']:.2f}")
 
-            # Check open trades
-            for trade in open_trades[:]:
-                m1_slice = m1_data[(m1_data['time'] > trade['time']) & (m1_data['time'] <= trade['time'] + timedelta(minutes=60))].copy()
-
-                exit_price = None
-                exit_type = None
-
-                for _, row in m1_slice.iterrows():
-                    high = row['high']
-                    low = row['low']
-                    if trade['type'] == 'BUY':
-                        if low <= trade['sl']:
-                            exit_price, exit_type = trade['sl'], 'sl'
-                            break
-                        if high >= trade['tp']:
-                            exit_price, exit_type = trade['tp'], 'tp'
-                            break
-                    elif trade['type'] == 'SELL':
-                        if high >= trade['sl']:
-                            exit_price, exit_type = trade['sl'], 'sl'
-                            break
-                        if low <= trade['tp']:
-                            exit_price, exit_type = trade['tp'], 'tp'
-                            break
-
-                if exit_price is None and not m1_slice.empty:
-                    exit_price = m1_slice.iloc[-1]['close']
-                    exit_type = 'timeout'
-
-                if exit_price:
-                    if trade['type'] == 'BUY':
-                        profit = (exit_price - trade['price']) / point * pip_value * trade['volume']
-                    else:
-                        profit = (trade['price'] - exit_price) / point * pip_value * trade['volume']
-
-                    current_balance += profit
-                    trade.update({
-                        'exit_price': exit_price,
-                        'exit_time': current_time,
-                        'profit': profit,
-                        'exit_type': exit_type
-                    })
-                    results['trades'].append(trade)
-                    open_trades.remove(trade)
-                    risk_manager.update_open_positions(len(open_trades))
-                    self.logger.info(f"Closed {trade['type']} trade ({exit_type}) @ {exit_price:.2f}, PnL={profit:.2f}, Balance={current_balance:.2f}")
+            # Resolve SL/TP exits of all unresolved open trades in one batch
+            pending = [t for t in open_trades if t.get('exit_time') is None]
+            if pending:
+                exit_prices, exit_types, exit_times = resolve_trade_exits(
+                    np.array([t['time'] for t in pending], dtype='datetime64[ns]'),
+                    np.array([1 if t['type'] == 'BUY' else -1 for t in pending]),
+                    np.array([t['sl'] for t in pending]),
+                    np.array([t['tp'] for t in pending])
+                )
+                for trade, exit_price, exit_type, exit_time in zip(pending, exit_prices, exit_types, exit_times):
+                    if exit_type is not None:
+                        trade.update({
+                            'exit_price': float(exit_price),
+                            'exit_time': pd.Timestamp(exit_time),
+                            'exit_type': exit_type
+                        })
 
             # Cập nhật equity curve
-            results['equity_curve'].append({
-                'time': current_time,
-                'balance': current_balance
-            })
+            equity.append(current_time, current_balance)
 
             if current_balance <= 0:
                 self.logger.warning(f"Account balance depleted at {current_time}. Backtest stopped.")
                 break
 
-            max_balance = max(max_balance, current_balance)
-            max_drawdown = max(max_drawdown, (max_balance - current_balance) / max_balance if max_balance > 0 else 0)
+            running.update(current_time, current_balance)
+            if abort is not None:
+                aborted = abort.check(running)
+                if aborted:
+                    self.logger.info(f"Run aborted at {current_time}: {aborted}")
+                    break
 
-        self.calculate_metrics(results, max_drawdown)
-        self.save_results(results)
+        if incremental:
+            # Bring the strategy accumulators up to the last processed bar
+            if last_done >= first_step and hasattr(strategy, 'get_state'):
+                strategy.check_signals(cursor.window(last_done))
+            results['state'] = {
+                'last_time': pd.Timestamp(cursor.time(last_done)) if last_done >= 1 else None,
+                'balance': current_balance,
+                'max_balance': running.peak,
+                'max_drawdown': running.max_drawdown,
+                'open_trades': open_trades,
+                'strategy': strategy.get_state() if hasattr(strategy, 'get_state') else {}
+            }
+
+        elif open_trades and current_balance > 0:
+            # Settle trades still open at the close of the last simulated bar:
+            # exits resolved within it are kept, later or unresolved exits
+            # close at that bar's close price
+            end_time = cursor.close_times[last_done]
+            end_price = cursor.column(main_tf, 'close')[last_done]
+            for trade in open_trades:
+                settle_exit(trade, end_time, end_price)
+                current_balance += self.close_trade(trade, point, pip_value)
+                running.record_trade(trade['profit'])
+                if sink is not None:
+                    sink.write_trade(trade)
+                else:
+                    results['trades'].append(trade)
+            equity.append(end_time, current_balance)
+            running.update(end_time, current_balance)
+
+        equity.flush()
+        results['equity_curve'] = equity.frame()
+        self.calculate_metrics(results, running.max_drawdown, stats=sink.stats if sink is not None else None)
+        if abort is not None:
+            results['metrics']['aborted'] = aborted or ''
+            results['metrics']['progress'] = (last_done - first_step + 1) / max(last_step - first_step, 1)
         return results
 
-    def calculate_metrics(self, results, max_drawdown):
-        results['metrics']['total_trades'] = len(results['trades'])
-        results['metrics']['winning_trades'] = len([t for t in results['trades'] if t['profit'] > 0])
-        results['metrics']['losing_trades'] = len([t for t in results['trades'] if t['profit'] < 0])
-        results['metrics']['total_profit'] = sum(t['profit'] for t in results['trades'] if t['profit'] > 0)
-        results['metrics']['total_loss'] = abs(sum(t['profit'] for t in results['trades'] if t['profit'] < 0))
-        results['metrics']['win_rate'] = (
-            results['metrics']['winning_trades'] / results['metrics']['total_trades']
-            if results['metrics']['total_trades'] > 0 else 0
-        )
-        results['metrics']['profit_factor'] = (
-            results['metrics']['total_profit'] / results['metrics']['total_loss']
-            if results['metrics']['total_loss'] > 0 else float('inf')
-        )
+    def calculate_sink_metrics(self, results, sink, max_drawdown):
+        """
+        Fill results['metrics'] with the full metrics suite from the trade
+        and equity tables a closed ResultsSink wrote to disk.
+
+        Args:
+            results: Results of a streamed run
+            sink: Closed ResultsSink of the run
+            max_drawdown: Max drawdown tracked by the run
+        """
+        if sink.trades.rows_written:
+            trades = read_columns(f"{sink.directory}/trades")
+        else:
+            trades = pd.DataFrame({'profit': [], 'type': [], 'timeframe': []})
+        if sink.equity.rows_written:
+            equity = read_columns(f"{sink.directory}/equity")
+        else:
+            equity = pd.DataFrame({'time': pd.Series(dtype='datetime64[ns]'), 'balance': []})
+        self.calculate_metrics(results, max_drawdown, trades=trades, equity=equity)
+
+    @staticmethod
+    def close_trade(trade, point, pip_value):
+        """Book the PnL of a trade at its resolved exit price and return it"""
+        return close_trade(trade, point, pip_value)
+
+    def calculate_metrics(self, results, max_drawdown, stats=None, trades=None, equity=None):
+        """
+        Fill results['metrics'] with the metrics suite of core.metrics.
+
+        Args:
+            results: Results of a run
+            max_drawdown: Max drawdown tracked by the run
+            stats: Running trade totals of a ResultsSink, used when the
+                trades and equity curve were streamed out of the results
+            trades: Optional trade table (columns 'profit', 'type',
+                'timeframe'), defaults to results['trades']
+            equity: Optional equity table ('time', 'balance'), defaults to
+                results['equity_curve']
+        """
+        if stats is not None:
+            # Running totals of trades streamed to a ResultsSink
+            results['metrics'].update(stats)
+            results['metrics']['win_rate'] = (
+                results['metrics']['winning_trades'] / results['metrics']['total_trades']
+                if results['metrics']['total_trades'] > 0 else 0
+            )
+            results['metrics']['profit_factor'] = (
+                results['metrics']['total_profit'] / results['metrics']['total_loss']
+                if results['metrics']['total_loss'] > 0 else float('inf')
+            )
+            results['metrics']['max_drawdown'] = max_drawdown
+            return
+
+        if trades is None:
+            # One pass over the trade dicts into columns
+            columns = [(t['profit'], t['type'], t.get('timeframe') or '') for t in results['trades']]
+            profit, sides, timeframes = (np.array(c) for c in zip(*columns)) if columns else (np.empty(0),) * 3
+        else:
+            profit = trades['profit'].to_numpy(dtype=float)
+            sides = trades['type'].to_numpy()
+            timeframes = trades['timeframe'].to_numpy() if 'timeframe' in trades else None
+        if equity is None:
+            equity = results['equity_curve']
+        if timeframes is not None and (timeframes == '').any():
+            # Trades of the live replay carry no signal timeframe
+            timeframes = None
+
+        results['metrics'].update(compute_metrics(
+            profit,
+            equity['time'].to_numpy(),
+            equity['balance'].to_numpy(dtype=float),
+            self.config['backtest']['initial_balance'],
+            sides=sides,
+            timeframes=timeframes
+        ))
         results['metrics']['max_drawdown'] = max_drawdown
 
     def save_results(self, results):
@@ -496,17 +907,1174 @@ class Backtest:
         trades_df.to_csv(f"{self.results_dir}/trades_{timestamp}.csv", index=False)
         equity_df = pd.DataFrame(results['equity_curve'])
         equity_df.to_csv(f"{self.results_dir}/equity_{timestamp}.csv", index=False)
+        if 'mtm_equity' in results:
+            results['mtm_equity'].to_csv(f"{self.results_dir}/equity_mtm_{timestamp}.csv", index=False)
         with open(f"{self.results_dir}/metrics_{timestamp}.json", 'w') as f:
             json.dump(results['metrics'], f, indent=4)
         self.logger.info(f"Saved backtest results to {self.results_dir}")
 
+    @contextmanager
+    def worker_pool(self, data, spec, max_workers=None):
+        """
+        Process pool of backtest workers over market data placed once in
+        shared memory; workers attach to it instead of receiving a copy.
+
+        Args:
+            data: Dictionary of timeframe name to OHLC DataFrame
+            spec: (point, pip_value) of the symbol
+            max_workers: Number of worker processes (default: CPU count)
+        """
+        with SharedMarketData(data) as shared, ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self.config, shared.descriptor(), spec)
+        ) as executor:
+            yield executor
+
+    def sweep(self, grid=None, max_workers=None, rank_by='net_profit'):
+        """
+        Run one backtest per combination of a parameter grid in a process pool.
+
+        Args:
+            grid: Dictionary of dotted parameter path to candidate values,
+                defaults to the 'sweep' section of rsi_strategy.json
+            max_workers: Number of worker processes (default: CPU count)
+            rank_by: Metric column used to rank the combinations
+
+        Returns:
+            pd.DataFrame: One row per combination, best first
+        """
+        spec = self.get_symbol_spec()
+        if spec is None:
+            return None
+        data = self.load_data()
+        if not data:
+            self.logger.error("No data available for sweep")
+            return None
+
+        strategy_config = self.load_strategy_config()
+        grid = grid or strategy_config.get('sweep', {})
+        points = expand_grid(grid)
+        if not points:
+            self.logger.error("Empty parameter grid")
+            return None
+        self.logger.info(f"Sweeping {len(points)} parameter sets over {', '.join(grid.keys())}")
+
+        rows = []
+        elapsed = []
+        abort = AbortRules.from_config(self.config['backtest'].get('abort'))
+        with self.worker_pool(data, spec, max_workers) as executor:
+            futures = {
+                executor.submit(_run_sweep_point, apply_params(strategy_config, params), abort): params
+                for params in points
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                params = futures[future]
+                try:
+                    metrics = future.result()
+                except Exception as e:
+                    self.logger.error(f"Sweep point {params} failed: {str(e)}")
+                    continue
+                elapsed.append(metrics.pop('elapsed'))
+                rows.append({**params, **metrics})
+                if metrics.get('aborted'):
+                    self.logger.info(f"Sweep {done}/{len(points)}: {params} -> aborted at {metrics['progress']:.0%}: {metrics['aborted']}")
+                else:
+                    self.logger.info(f"Sweep {done}/{len(points)}: {params} -> net profit {metrics['net_profit']:.2f}")
+
+        table = pd.DataFrame(rows)
+        if table.empty:
+            return table
+        table = table.sort_values(rank_by, ascending=False)
+        if 'progress' in table:
+            self.report_aborts(table, np.array(elapsed)[table.index])
+            # Runs that completed rank ahead of aborted ones
+            table = table.sort_values('aborted', key=lambda c: c != '', kind='stable')
+        table = table.reset_index(drop=True)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        table.to_csv(f"{self.results_dir}/sweep_{timestamp}.csv", index=False)
+        self.logger.info(f"Saved sweep table to {self.results_dir}/sweep_{timestamp}.csv")
+        return table
+
+    def report_aborts(self, table, elapsed):
+        """
+        Log how much compute the abort rules saved over a set of runs.
+
+        The remaining time of an aborted run is extrapolated from the time it
+        took to simulate its completed fraction of steps.
+
+        Args:
+            table: One row per run with 'aborted' and 'progress' columns
+            elapsed: Worker seconds of every run, in the row order of table
+
+        Returns:
+            dict: Aborted runs, skipped fraction of steps and estimated seconds saved
+        """
+        progress = table['progress'].to_numpy(dtype=float)
+        aborted = (table['aborted'] != '').to_numpy()
+        remaining = np.where(progress > 0, elapsed / np.maximum(progress, 1e-9) * (1 - progress), 0)
+        report = {
+            'aborted_runs': int(aborted.sum()),
+            'skipped_steps': float((1 - progress).sum() / len(progress)),
+            'seconds_saved': float(remaining[aborted].sum())
+        }
+        self.logger.info(
+            f"Aborted {report['aborted_runs']}/{len(table)} runs early, skipping "
+            f"{report['skipped_steps']:.1%} of simulated steps: ~{report['seconds_saved']:.1f}s of worker time "
+            f"saved, {elapsed.sum():.1f}s spent"
+        )
+        return report
+
+    def optimize(self, trials=None, max_workers=None, study_name=None):
+        """
+        Optimize the strategy parameters with a steady-state genetic algorithm.
+
+        Trials run asynchronously in a process pool: whenever one finishes, it
+        is recorded in the study file and a new one is proposed. Trials that
+        break the backtest.optimize.prune rules are stopped early and recorded
+        as pruned with the objective of their partial run, which ranks them
+        below every complete trial. Trials without any trade are recorded as
+        failed. Rerunning with the same study continues where it stopped.
+
+        Args:
+            trials: Total number of trials of the study, defaults to
+                backtest.optimize.trials
+            max_workers: Number of worker processes (default: CPU count)
+            study_name: Study file name, defaults to backtest.optimize.study
+
+        Returns:
+            pd.DataFrame: One row per trial of the study, best first
+        """
+        opt_config = self.config['backtest'].get('optimize', {})
+        spec = self.get_symbol_spec()
+        if spec is None:
+            return None
+        data = self.load_data()
+        if not data:
+            self.logger.error("No data available for optimization")
+            return None
+
+        strategy_config = self.load_strategy_config()
+        space_config = strategy_config.get('optimize', {})
+        if not space_config:
+            self.logger.error("No 'optimize' search space in the strategy config")
+            return None
+        objective = opt_config.get('objective', 'sharpe_ratio')
+        maximize = opt_config.get('direction', 'maximize') == 'maximize'
+        trials = trials or opt_config.get('trials', 200)
+        path = f"{opt_config.get('directory', 'backtest/studies')}/{study_name or opt_config.get('study', 'rsi_strategy')}.jsonl"
+        try:
+            space = SearchSpace(space_config)
+            study = Study(path, space_config, objective, 'maximize' if maximize else 'minimize')
+        except (ValueError, KeyError) as e:
+            self.logger.error(f"Cannot open study: {str(e)}")
+            return None
+
+        seed = opt_config.get('seed')
+        optimizer = GeneticOptimizer(
+            space,
+            population=opt_config.get('population', 20),
+            mutation_scale=opt_config.get('mutation_scale', 0.1),
+            maximize=maximize,
+            rng=np.random.default_rng(None if seed is None else [seed, len(study.trials)])
+        )
+        for trial in study.trials:
+            optimizer.tell(trial['params'], trial['value'], pruned=trial['state'] == PRUNED)
+        prune = AbortRules.from_config(opt_config.get('prune'))
+        remaining = trials - len(study.trials)
+        if study.trials:
+            self.logger.info(f"Resuming study {path} at trial {len(study.trials)}/{trials}")
+        workers = max_workers or os.cpu_count() or 1
+
+        started = time.perf_counter()
+        stored = ['total_trades', 'net_profit', 'profit_factor', 'max_drawdown', 'sharpe_ratio',
+                  'sortino_ratio', 'calmar_ratio', 'progress', objective]
+        with self.worker_pool(data, spec, workers) as executor:
+            pending = {}
+            try:
+                while remaining > 0 or pending:
+                    while remaining > 0 and len(pending) < workers:
+                        params = optimizer.ask()
+                        optimizer.mark_pending(params)
+                        pending[executor.submit(_run_sweep_point, apply_params(strategy_config, params), prune)] = params
+                        remaining -= 1
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        params = pending.pop(future)
+                        try:
+                            metrics = future.result()
+                        except Exception as e:
+                            self.logger.error(f"Trial {params} failed: {str(e)}")
+                            study.add(params, FAILED, None, {}, 0.0)
+                            continue
+                        value = metrics.get(objective)
+                        if not metrics.get('total_trades') or value is None or np.isnan(value):
+                            # The objective of a run without trades means nothing
+                            state, value = FAILED, None
+                        else:
+                            state = PRUNED if metrics.get('aborted') else COMPLETE
+                            value = float(value)
+                        trial = study.add(
+                            params, state, value,
+                            {k: float(metrics[k]) for k in stored if k in metrics},
+                            metrics.get('elapsed', 0.0)
+                        )
+                        optimizer.tell(params, value, pruned=state == PRUNED)
+                        best = study.best(maximize)
+                        self.logger.info(
+                            f"Trial {trial['number']} {state}"
+                            + (f" {objective}={value:.4f}" if value is not None else ": no trades")
+                            + (f" at {metrics['progress']:.0%}: {metrics['aborted']}" if state == PRUNED else "")
+                            + (f", best {best['value']:.4f} (trial {best['number']})" if best else "")
+                        )
+            except KeyboardInterrupt:
+                self.logger.warning(f"Optimization interrupted, rerun to resume study {path}")
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+        table = study.table()
+        if table.empty:
+            return table
+        pruned = table[table['state'] == PRUNED]
+        self.logger.info(
+            f"Study {path}: {len(table)} trials, {len(pruned)} pruned, "
+            f"{time.perf_counter() - started:.1f}s this session"
+        )
+        best = study.best(maximize)
+        if best is not None:
+            self.logger.info(f"Best trial {best['number']}: {objective}={best['value']:.4f} {best['params']}")
+        # Complete trials first, then pruned ones by their partial objective
+        table = table.sort_values('value', ascending=not maximize, na_position='last')
+        return table.sort_values('state', key=lambda c: c != COMPLETE, kind='stable').reset_index(drop=True)
+
+    def vector_sweep(self, grid=None, rank_by='net_profit'):
+        """
+        Screen every combination of a parameter grid in one vectorized pass.
+
+        Much cheaper than sweep() but approximate: trades are sized at the
+        initial balance, the open positions limit is ignored, drawdown is
+        measured per trade and the run never stops on a depleted balance.
+        See core.vector_sweep.
+
+        Returns:
+            pd.DataFrame: One row per combination, best first
+        """
+        spec = self.get_symbol_spec()
+        if spec is None:
+            return None
+        point, pip_value = spec
+        data = self.load_data()
+        if not data or 'M5' not in data:
+            self.logger.error("No data available for vector sweep")
+            return None
+
+        strategy_config = self.load_strategy_config()
+        grid = grid or strategy_config.get('sweep', {})
+        points = expand_grid(grid)
+        self.logger.info(f"Vector sweep of {len(points)} parameter sets over {', '.join(grid.keys())}")
+
+        cursor = MultiTimeframeCursor(data, 'M5')
+        table = evaluate_param_sets(
+            data, strategy_config, points, cursor,
+            self.build_exit_resolver(data),
+            point, pip_value,
+            self.config['trading'],
+            self.config['backtest']['initial_balance'],
+            rsi_source=lambda tf, period: self.rsi_feature(data, tf, period)
+        )
+        table = table.sort_values(rank_by, ascending=False).reset_index(drop=True)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        table.to_csv(f"{self.results_dir}/vector_sweep_{timestamp}.csv", index=False)
+        self.logger.info(f"Saved vector sweep table to {self.results_dir}/vector_sweep_{timestamp}.csv")
+        return table
+
+    def walk_forward(self, grid=None, folds=None, in_sample_ratio=None, rank_by='net_profit', max_workers=None):
+        """
+        Walk-forward analysis over rolling in-sample/out-of-sample windows.
+
+        Every fold screens the grid on its in-sample window with the
+        vectorized evaluator, then backtests the winner on the following
+        out-of-sample window. Folds run in parallel on the data loaded once
+        in this process. The out-of-sample equity curves are stitched by
+        chaining their PnL, each fold being sized from the initial balance.
+
+        Args:
+            grid: Parameter grid, defaults to the 'sweep' section of rsi_strategy.json
+            folds: Number of folds (default: backtest.walk_forward.folds)
+            in_sample_ratio: In-sample share of a fold window
+            rank_by: Metric used to pick the in-sample winner
+            max_workers: Number of worker processes
+
+        Returns:
+            dict: 'folds' summary table, stitched 'equity_curve' and OOS 'trades'
+        """
+        wf_config = self.config['backtest'].get('walk_forward', {})
+        folds = folds or wf_config.get('folds', 10)
+        in_sample_ratio = in_sample_ratio or wf_config.get('in_sample_ratio', 0.75)
+
+        spec = self.get_symbol_spec()
+        if spec is None:
+            return None
+        data = self.load_data()
+        if not data or 'M5' not in data:
+            self.logger.error("No data available for walk-forward analysis")
+            return None
+
+        strategy_config = self.load_strategy_config()
+        points = expand_grid(grid or strategy_config.get('sweep', {}))
+
+        # Rolling windows: each fold advances by one out-of-sample length
+        n_bars = len(data['M5'])
+        oos_len = int(n_bars / (folds + in_sample_ratio / (1 - in_sample_ratio)))
+        is_len = int(oos_len * in_sample_ratio / (1 - in_sample_ratio))
+        windows = []
+        for k in range(folds):
+            is_start = k * oos_len
+            is_end = is_start + is_len
+            oos_end = n_bars if k == folds - 1 else is_end + oos_len
+            windows.append(((is_start, is_end), (is_end, oos_end)))
+        self.logger.info(f"Walk-forward: {folds} folds, {is_len} in-sample / {oos_len} out-of-sample M5 bars, {len(points)} parameter sets")
+
+        fold_results = [None] * folds
+        with self.worker_pool(data, spec, max_workers) as executor:
+            futures = {
+                executor.submit(_run_walk_forward_fold, strategy_config, points, is_range, oos_range, rank_by): k
+                for k, (is_range, oos_range) in enumerate(windows)
+            }
+            for future in as_completed(futures):
+                k = futures[future]
+                fold_results[k] = future.result()
+                self.logger.info(f"Fold {k + 1}/{folds}: {fold_results[k]['params']} -> OOS net profit {fold_results[k]['oos_metrics']['net_profit']:.2f}")
+
+        times = data['M5']['time']
+        initial_balance = self.config['backtest']['initial_balance']
+        offset = 0.0
+        rows, curves, trades = [], [], []
+        for k, ((is_start, is_end), (oos_start, oos_end)) in enumerate(windows):
+            fold = fold_results[k]
+            curve = pd.DataFrame(fold['equity_curve'])
+            if not curve.empty:
+                curve['balance'] += offset
+                curve['fold'] = k
+                curves.append(curve)
+                offset = curve['balance'].iloc[-1] - initial_balance
+            trades.extend(dict(t, fold=k) for t in fold['trades'])
+            rows.append({
+                'fold': k,
+                'is_start': times.iloc[is_start],
+                'is_end': times.iloc[is_end - 1],
+                'oos_start': times.iloc[oos_start],
+                'oos_end': times.iloc[oos_end - 1],
+                **fold['params'],
+                f'is_{rank_by}': fold['is_score'],
+                **{f'oos_{name}': value for name, value in fold['oos_metrics'].items()}
+            })
+
+        table = pd.DataFrame(rows)
+        equity = pd.concat(curves, ignore_index=True) if curves else pd.DataFrame(columns=['time', 'balance', 'fold'])
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        table.to_csv(f"{self.results_dir}/walk_forward_folds_{timestamp}.csv", index=False)
+        equity.to_csv(f"{self.results_dir}/walk_forward_equity_{timestamp}.csv", index=False)
+        pd.DataFrame(trades).to_csv(f"{self.results_dir}/walk_forward_trades_{timestamp}.csv", index=False)
+        self.logger.info(f"Saved walk-forward results to {self.results_dir}")
+
+        return {'folds': table, 'equity_curve': equity, 'trades': trades}
+
+    def cpcv(self, grid=None, groups=None, test_groups=None, max_workers=None):
+        """
+        Combinatorial purged cross-validation of a parameter grid.
+
+        Every parameter set is backtested once over the full history in a
+        worker process, which then scores it on all C(groups, test_groups)
+        splits with purging and embargo (see core.cpcv).
+
+        Args:
+            grid: Parameter grid, defaults to the 'sweep' section of rsi_strategy.json
+            groups: Number of groups N (default: backtest.cpcv.groups)
+            test_groups: Test groups per split k (default: backtest.cpcv.test_groups)
+            max_workers: Number of worker processes
+
+        Returns:
+            dict: Per-split 'splits' table, per-parameter-set 'summary' of the
+                out-of-sample distributions and the probability of backtest
+                overfitting 'pbo'
+        """
+        cpcv_config = self.config['backtest'].get('cpcv', {})
+        groups = groups or cpcv_config.get('groups', 6)
+        test_groups = test_groups or cpcv_config.get('test_groups', 2)
+        embargo = np.timedelta64(int(cpcv_config.get('embargo_minutes', 1440)), 'm')
+
+        spec = self.get_symbol_spec()
+        if spec is None:
+            return None
+        data = self.load_data()
+        if not data or 'M5' not in data:
+            self.logger.error("No data available for CPCV")
+            return None
+
+        strategy_config = self.load_strategy_config()
+        grid = grid or strategy_config.get('sweep', {})
+        points = expand_grid(grid)
+        if not points:
+            self.logger.error("Empty parameter grid")
+            return None
+        try:
+            splits = cpcv_splits(groups, test_groups)
+        except ValueError as e:
+            self.logger.error(f"Invalid CPCV configuration: {str(e)}")
+            return None
+
+        times = data['M5']['time'].to_numpy().astype('datetime64[ns]')
+        bounds = group_bounds(times, groups)
+        day_times = np.unique(times.astype('datetime64[D]'))
+        self.logger.info(
+            f"CPCV: {groups} groups, {test_groups} test groups, {len(splits)} splits, "
+            f"{len(points)} parameter sets, embargo {embargo}"
+        )
+
+        tables = []
+        with self.worker_pool(data, spec, max_workers) as executor:
+            futures = {
+                executor.submit(_run_cpcv_point, apply_params(strategy_config, params), bounds, splits, embargo, day_times): (k, params)
+                for k, params in enumerate(points)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                k, params = futures[future]
+                try:
+                    table = future.result()
+                except Exception as e:
+                    self.logger.error(f"CPCV of {params} failed: {str(e)}")
+                    continue
+                tables.append(table.assign(param_set=k, **params))
+                self.logger.info(f"CPCV {done}/{len(points)}: {params} -> median OOS Sharpe {table['oos_sharpe'].median():.2f}")
+
+        if not tables:
+            return None
+        splits_table = pd.concat(tables, ignore_index=True).sort_values(['param_set', 'split']).reset_index(drop=True)
+        summary, pbo = summarize(splits_table, list(grid.keys()))
+        self.logger.info(f"CPCV probability of backtest overfitting: {pbo:.1%}")
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        splits_table.to_csv(f"{self.results_dir}/cpcv_splits_{timestamp}.csv", index=False)
+        summary.to_csv(f"{self.results_dir}/cpcv_summary_{timestamp}.csv", index=False)
+        self.logger.info(f"Saved CPCV results to {self.results_dir}")
+        return {'splits': splits_table, 'summary': summary, 'pbo': pbo}
+
+    def run_sharded(self, shards=None, warmup_bars=None, max_workers=None):
+        """
+        Single-config backtest with the timeline split into parallel shards.
+
+        Every worker computes the signals of its shard from the shard's bars
+        plus `warmup_bars` bars of indicator warm-up per timeframe and
+        resolves their SL/TP exits. A serial fix-up pass then replays the
+        candidates in time order to apply position sizing, the risk limits
+        and the balance, including trades that cross shard boundaries.
+
+        Returns:
+            dict: Same structure as run_backtest
+        """
+        shard_config = self.config['backtest'].get('sharding', {})
+        shards = shards or shard_config.get('shards', os.cpu_count() or 1)
+        warmup_bars = warmup_bars or shard_config.get('warmup_bars', 500)
+
+        spec = self.get_symbol_spec()
+        if spec is None:
+            return None
+        point, pip_value = spec
+        data = self.load_data()
+        if not data or 'M5' not in data:
+            self.logger.error("No data available for sharded backtest")
+            return None
+        strategy_config = self.load_strategy_config()
+
+        n_steps = len(data['M5'])
+        bounds = np.linspace(1, n_steps, shards + 1).astype(int)
+        ranges = [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        self.logger.info(f"Sharded backtest: {len(ranges)} shards, {warmup_bars} warm-up bars per timeframe")
+
+        candidates = []
+        with self.worker_pool(data, spec, max_workers) as executor:
+            for shard in executor.map(_run_shard, [strategy_config] * len(ranges), ranges, [warmup_bars] * len(ranges)):
+                candidates.extend(shard)
+
+        min_required_bars = max(strategy_config['parameters']['rsi_periods'].values())
+        results = self.replay_candidates(
+            candidates, MultiTimeframeCursor(data, 'M5'), min_required_bars, point, pip_value
+        )
+        self.save_results(results)
+        return results
+
+    def run_incremental(self):
+        """
+        Continue the backtest over bars appended to backtest/data since the
+        previous call, from the state saved at the end of that call.
+
+        Trades and equity points are appended to the columnar tables of
+        backtest/results/incremental. The saved state is discarded and the run
+        starts over when the configs changed or the already processed bars
+        differ from the stored data.
+
+        Only the backtest loop is incremental: the data files are loaded in
+        full and, with backtest.vectorized, the signal arrays are rebuilt over
+        the whole history on every call.
+
+        Returns:
+            dict: Results of the new bars, with metrics over the whole history.
+                Without new bars (or after a depleted balance) no trades and
+                the metrics saved by the previous call.
+        """
+        spec = self.get_symbol_spec()
+        if spec is None:
+            return None
+        point, pip_value = spec
+        data = self.load_data()
+        if not data or 'M5' not in data:
+            self.logger.error("No data available for incremental backtest")
+            return None
+        strategy_config = self.load_strategy_config()
+
+        state_path = f"{self.state_dir}/rsi_strategy.pkl"
+        output_dir = f"{self.results_dir}/incremental"
+        config_hash = hashlib.blake2b(
+            json.dumps([ENGINE_VERSION, strategy_config, self.simulation_settings()], sort_keys=True, default=str).encode(),
+            digest_size=16
+        ).hexdigest()
+
+        state = self.load_state(state_path)
+        main_times = data['M5']['time'].to_numpy()
+        if state is not None:
+            processed = int(np.searchsorted(main_times, np.datetime64(state['last_time']), side='right'))
+            if state['config_hash'] != config_hash:
+                self.logger.warning("Configuration changed since the saved state, restarting from the first bar")
+                state = None
+            elif data_fingerprint(data['M5'].iloc[:processed]) != state['data_fingerprint']:
+                self.logger.warning("Processed bars changed since the saved state, restarting from the first bar")
+                state = None
+        if state is None and os.path.exists(output_dir):
+            shutil.rmtree(output_dir)
+
+        start = 1 if state is None else processed
+        if start >= len(main_times):
+            self.logger.info("No new bars since the last incremental run")
+            return self.load_incremental_results(output_dir)
+        if state is not None and state['balance'] <= 0:
+            self.logger.warning("Account balance depleted in a previous run, nothing to continue")
+            return self.load_incremental_results(output_dir)
+
+        results_config = self.config['backtest'].get('results', {})
+        sink = ResultsSink(output_dir, results_config.get('batch_rows', 10000))
+        started = time.perf_counter()
+        results = self.simulate(
+            data, strategy_config, point, pip_value,
+            start=start, sink=sink, state=state, incremental=True
+        )
+        sink.close()
+        if results is None:
+            return None
+
+        new_state = results['state']
+        processed = int(np.searchsorted(main_times, np.datetime64(new_state['last_time']), side='right'))
+        new_state['config_hash'] = config_hash
+        new_state['data_fingerprint'] = data_fingerprint(data['M5'].iloc[:processed])
+        with open(state_path, 'wb') as f:
+            pickle.dump(new_state, f)
+
+        # Metrics over every trade of the history
+        new_trades = results['metrics']['total_trades']
+        results['trades'] = []
+        self.calculate_sink_metrics(results, sink, new_state['max_drawdown'])
+        with open(f"{output_dir}/metrics.json", 'w') as f:
+            json.dump(results['metrics'], f, indent=4)
+
+        self.logger.info(
+            f"Incremental backtest: {len(main_times) - start} new bars, {new_trades} new trades "
+            f"in {time.perf_counter() - started:.1f}s, {len(new_state['open_trades'])} trades still open"
+        )
+        return results
+
+    def load_incremental_results(self, output_dir):
+        """Results without new trades, carrying the metrics of the previous incremental run"""
+        results = self.new_results()
+        results['equity_curve'] = pd.DataFrame({'time': pd.Series(dtype='datetime64[ns]'), 'balance': []})
+        try:
+            with open(f"{output_dir}/metrics.json", 'r') as f:
+                results['metrics'].update(json.load(f))
+        except Exception as e:
+            self.logger.error(f"Failed to read the previous incremental metrics: {str(e)}")
+        return results
+
+    def load_state(self, path):
+        """Saved incremental state, None when missing or unreadable"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            self.logger.error(f"Failed to load backtest state {path}: {str(e)}")
+            return None
+
+    def monte_carlo(self, results=None, paths=None, max_workers=None):
+        """
+        Monte Carlo robustness analysis of a backtest's trade sequence.
+
+        Args:
+            results: Output of run_backtest, runs the backtest when None
+            paths: Number of paths per method, defaults to backtest.monte_carlo.paths
+            max_workers: Worker processes, defaults to the CPU count
+
+        Returns:
+            pd.DataFrame: One row of distribution statistics per method
+        """
+        mc_config = self.config['backtest'].get('monte_carlo', {})
+        results = results or self.run_backtest()
+        if results is None:
+            return None
+        if not results['trades']:
+            self.logger.error("No trades to analyse")
+            return None
+
+        trades = sorted(results['trades'], key=lambda t: t['exit_time'])
+        started = time.perf_counter()
+        mc = run_monte_carlo(
+            [t['profit'] for t in trades],
+            self.config['backtest']['initial_balance'],
+            n_paths=paths or mc_config.get('paths', 20000),
+            methods=mc_config.get('methods', ['shuffle', 'bootstrap']),
+            ruin_fraction=mc_config.get('ruin_fraction', 0.5),
+            seed=mc_config.get('seed'),
+            max_workers=max_workers
+        )
+        summary = mc['summary']
+        self.logger.info(f"Monte Carlo: {summary['paths'].sum()} paths in {time.perf_counter() - started:.1f}s")
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        summary.to_csv(f"{self.results_dir}/monte_carlo_{timestamp}.csv", index=False)
+        self.logger.info(f"Saved Monte Carlo results to {self.results_dir}")
+        return summary
+
+    def stress_test(self, paths=None, max_workers=None):
+        """
+        Run the strategy over synthetic block-bootstrapped price paths in a
+        process pool. Every worker generates its paths in memory from the
+        loaded history, so no CSVs are written.
+
+        Args:
+            paths: Number of synthetic paths, defaults to backtest.stress.paths
+            max_workers: Worker processes, defaults to the CPU count
+
+        Returns:
+            pd.DataFrame: One row of metrics per path
+        """
+        stress_config = self.config['backtest'].get('stress', {})
+        paths = paths or stress_config.get('paths', 100)
+
+        spec = self.get_symbol_spec()
+        if spec is None:
+            return None
+        data = self.load_data()
+        if not data or 'M5' not in data:
+            self.logger.error("No data available for stress test")
+            return None
+        strategy_config = self.load_strategy_config()
+
+        base_timeframe = 'M1' if 'M1' in data else 'M5'
+        block_bars = max(1, stress_config.get('block_minutes', 1440) // TIMEFRAME_MINUTES[base_timeframe])
+        timeframes = sorted(
+            {base_timeframe, 'M5', *strategy_config['timeframes'], *self.config['backtest'].get('exit_timeframes', [])} & set(data),
+            key=lambda tf: TIMEFRAME_MINUTES[tf]
+        )
+        base_data = {tf: data[tf] for tf in timeframes}
+        seeds = np.random.SeedSequence(stress_config.get('seed')).spawn(paths)
+        self.logger.info(
+            f"Stress test: {paths} paths, {block_bars}-bar {base_timeframe} blocks, timeframes {', '.join(timeframes)}"
+        )
+
+        rows = []
+        started = time.perf_counter()
+        with self.worker_pool(base_data, spec, max_workers) as executor:
+            futures = {
+                executor.submit(_run_synthetic_path, strategy_config, timeframes, block_bars, base_timeframe, seed): k
+                for k, seed in enumerate(seeds)
+            }
+            for future in as_completed(futures):
+                rows.append({'path': futures[future], **future.result()})
+
+        table = pd.DataFrame(rows).sort_values('path').reset_index(drop=True)
+        self.logger.info(f"Stress test finished in {time.perf_counter() - started:.1f}s")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        table.to_csv(f"{self.results_dir}/stress_{timestamp}.csv", index=False)
+        self.logger.info(f"Saved stress test results to {self.results_dir}")
+        return table
+
+    def replay_live(self, days=None):
+        """
+        Replay the live trading path (StrategyManager -> RSIStrategy ->
+        RiskManager/SimulatedTradeManager) over the last `days` of loaded data
+        on a virtual clock, so every 60 s cycle runs without waiting.
+
+        Orders follow the live rules (signal volume, broker-side SL/TP without
+        a holding limit), so the figures measure the live code rather than
+        reproduce simulate(). As in simulate(), no exit after the bar that
+        depleted the balance is booked.
+
+        Returns:
+            dict: Same structure as run_backtest
+        """
+        replay_config = self.config['backtest'].get('replay', {})
+        days = days or replay_config.get('days', 30)
+
+        spec = self.get_symbol_spec()
+        if spec is None:
+            return None
+        point, pip_value = spec
+        data = self.load_data()
+        if not data or 'M5' not in data:
+            self.logger.error("No data available for live replay")
+            return None
+
+        exit_timeframe = replay_config.get('exit_timeframe', 'M1')
+        if exit_timeframe not in data:
+            self.logger.warning(f"No {exit_timeframe} data, detecting SL/TP on M5")
+            exit_timeframe = 'M5'
+
+        main_close = data['M5']['time'] + timeframe_delta('M5')
+        end = main_close.iloc[-1]
+        start = max(end - timedelta(days=days), main_close.iloc[0])
+        clock = VirtualClock(start.to_pydatetime())
+        feed = SimulatedDataFeed(data, clock, logger=self.logger)
+
+        trade_manager = SimulatedTradeManager(self.config['trading'], clock=clock)
+        manager = StrategyManager(
+            self.config,
+            clock=clock,
+            data_manager=feed,
+            trade_manager=trade_manager,
+            risk_manager=RiskManager(self.config['trading'])
+        )
+        manager.add_strategy('rsi_strategy')
+
+        # Per-cycle logs of the live components would dominate the run time
+        quiet = ['StrategyManager', 'RSIStrategy', 'RiskManager', 'SimulatedTradeManager']
+        levels = {name: logging.getLogger(name).level for name in quiet}
+        for name in quiet:
+            logging.getLogger(name).setLevel(replay_config.get('log_level', 'ERROR'))
+        started = time.perf_counter()
+        try:
+            cycles = manager.replay(end.to_pydatetime(), exit_timeframe=exit_timeframe)
+        finally:
+            for name, level in levels.items():
+                logging.getLogger(name).setLevel(level)
+        elapsed = time.perf_counter() - started
+
+        results = self.new_results()
+        balance = self.config['backtest']['initial_balance']
+        max_balance = balance
+        max_drawdown = 0
+        last_close = None
+        for position in sorted(trade_manager.closed_positions, key=lambda p: p['close_time']):
+            # As in simulate(), every exit of the bar that depleted the balance
+            # is booked and nothing after it
+            if balance <= 0 and position['close_time'] != last_close:
+                break
+            last_close = position['close_time']
+            trade = {
+                'order_id': position['id'],
+                'time': pd.Timestamp(position['open_time']),
+                'type': position['type'],
+                'price': position['price_open'],
+                'volume': position['volume'],
+                'sl': position['sl'],
+                'tp': position['tp'],
+                'exit_price': position['price_close'],
+                'exit_time': pd.Timestamp(position['close_time']),
+                'exit_type': position['exit_type']
+            }
+            balance += self.close_trade(trade, point, pip_value)
+            results['trades'].append(trade)
+            results['equity_curve'].append({'time': trade['exit_time'], 'balance': balance})
+            if balance > 0:
+                max_balance = max(max_balance, balance)
+                max_drawdown = max(max_drawdown, (max_balance - balance) / max_balance if max_balance > 0 else 0)
+        if balance <= 0:
+            self.logger.warning(f"Account balance depleted at {pd.Timestamp(last_close)}. Replay stopped.")
+        results['equity_curve'] = pd.DataFrame(results['equity_curve'], columns=['time', 'balance'])
+        self.calculate_metrics(results, max_drawdown)
+
+        self.logger.info(
+            f"Live replay: {cycles} cycles over {end - start} in {elapsed:.1f}s "
+            f"({(end - start).total_seconds() / max(elapsed, 1e-9):.0f}x real time), "
+            f"{len(trade_manager.positions)} positions still open"
+        )
+        self.save_results(results)
+        return results
+
+    def replay_candidates(self, candidates, cursor, min_required_bars, point, pip_value):
+        """
+        Serial accounting pass over pre-resolved trade candidates.
+
+        Applies the same rules as simulate(): due exits close before new
+        signals of a step, volume is sized from the current balance, and
+        RiskManager limits which candidates are opened. Only steps that open
+        or close trades are visited.
+        """
+        risk_manager = RiskManager(self.config['trading'])
+        trade_manager = SimulatedTradeManager(self.config['trading'])
+        results = self.new_results()
+
+        # First step at which every timeframe has enough closed bars
+        ready = np.ones(len(cursor), dtype=bool)
+        for ends in cursor.ends.values():
+            ready &= ends >= min_required_bars
+        ready[0] = False
+        if not ready.any():
+            self.calculate_metrics(results, 0)
+            return results
+        first_step = int(ready.argmax())
+
+        by_step = {}
+        for candidate in candidates:
+            if candidate['step'] >= first_step:
+                by_step.setdefault(candidate['step'], []).append(candidate)
+
+        initial_balance = self.config['backtest']['initial_balance']
+        current_balance = initial_balance
+        max_balance = initial_balance
+        max_drawdown = 0
+        open_trades = []
+        closing = []  # heap of (close step, sequence, trade)
+        balance_steps, balances = [], []
+        last_step = len(cursor) - 1
+        sequence = 0
+
+        steps = sorted(by_step)
+        pos = 0
+        while pos < len(steps) or closing:
+            step = min(steps[pos] if pos < len(steps) else len(cursor), closing[0][0] if closing else len(cursor))
+            if step >= len(cursor):
+                break
+            current_time = cursor.time(step)
+
+            while closing and closing[0][0] == step:
+                _, _, trade = heapq.heappop(closing)
+                current_balance += self.close_trade(trade, point, pip_value)
+                results['trades'].append(trade)
+                open_trades.remove(trade)
+                risk_manager.update_open_positions(len(open_trades))
+
+            if pos < len(steps) and steps[pos] == step:
+                for candidate in by_step[step]:
+                    trade = open_trade(
+                        candidate, cursor.close_time(step), current_balance, point, pip_value,
+                        self.config, risk_manager, trade_manager
+                    )
+                    if trade is None:
+                        continue
+
+                    open_trades.append(trade)
+                    risk_manager.update_open_positions(len(open_trades))
+                    if candidate['exit_type'] is not None:
+                        trade.update({
+                            'exit_price': candidate['exit_price'],
+                            'exit_time': candidate['exit_time'],
+                            'exit_type': candidate['exit_type']
+                        })
+                        # Closed on the first later step whose bar closes after the exit
+                        close_step = int(np.searchsorted(cursor.close_times, np.datetime64(candidate['exit_time']), side='right'))
+                        close_step = max(close_step, step + 1)
+                        if close_step <= last_step:
+                            heapq.heappush(closing, (close_step, sequence, trade))
+                            sequence += 1
+                pos += 1
+
+            balance_steps.append(step)
+            balances.append(current_balance)
+            if current_balance <= 0:
+                self.logger.warning(f"Account balance depleted at {current_time}. Backtest stopped.")
+                last_step = step
+                break
+
+            max_balance = max(max_balance, current_balance)
+            max_drawdown = max(max_drawdown, (max_balance - current_balance) / max_balance if max_balance > 0 else 0)
+
+        # Forward-fill the balance over every traded step
+        all_steps = np.arange(first_step, last_step + 1)
+        idx = np.searchsorted(np.array(balance_steps, dtype=np.int64), all_steps, side='right') - 1
+        balance = np.where(idx >= 0, np.array(balances + [initial_balance])[idx], initial_balance)
+        results['equity_curve'] = pd.DataFrame({
+            'time': cursor.main_times[all_steps].astype('datetime64[ns]'), 'balance': balance
+        })
+
+        # Settle trades still open at the close of the last step, as simulate() does
+        if open_trades and current_balance > 0:
+            end_time = cursor.close_times[last_step]
+            end_price = cursor.column('M5', 'close')[last_step]
+            for trade in open_trades:
+                settle_exit(trade, end_time, end_price)
+                current_balance += self.close_trade(trade, point, pip_value)
+                results['trades'].append(trade)
+            results['equity_curve'] = pd.concat([
+                results['equity_curve'],
+                pd.DataFrame({'time': np.array([end_time], dtype='datetime64[ns]'), 'balance': [current_balance]})
+            ], ignore_index=True)
+            max_balance = max(max_balance, current_balance)
+            max_drawdown = max(max_drawdown, (max_balance - current_balance) / max_balance if max_balance > 0 else 0)
+
+        self.calculate_metrics(results, max_drawdown)
+        return results
+
+
+# Per-process state of pool workers, set once by _init_worker
+_WORKER = {}
+
+
+def _init_worker(config, shared_data, spec):
+    """
+    Process pool initializer: keep one Backtest per worker and attach to the
+    market data in shared memory (descriptor of a SharedMarketData)
+    """
+    logging.disable(logging.INFO)
+    # Workers log through the parent's handlers when forked; never open a log file of their own
+    _WORKER['backtest'] = Backtest(config, log_file=False)
+    _WORKER['blocks'], _WORKER['data'] = attach_market_data(shared_data)
+    _WORKER['spec'] = spec
+
+
+def _run_sweep_point(strategy_config, abort=None):
+    """
+    Backtest one strategy config inside a pool worker and return its metrics,
+    stopping early on the optional AbortRules. 'elapsed' is the worker time
+    of the run in seconds.
+    """
+    point, pip_value = _WORKER['spec']
+    backtest = _WORKER['backtest']
+    started = time.perf_counter()
+    results = backtest.simulate(_WORKER['data'], strategy_config, point, pip_value, abort=abort)
+    metrics = dict(results['metrics'])
+    metrics['net_profit'] = metrics['total_profit'] - metrics['total_loss']
+    metrics['elapsed'] = time.perf_counter() - started
+    return metrics
+
+
+def _run_cpcv_point(strategy_config, bounds, splits, embargo, day_times):
+    """Backtest one strategy config over the full history and score it on every CPCV split"""
+    point, pip_value = _WORKER['spec']
+    backtest = _WORKER['backtest']
+    results = backtest.simulate(_WORKER['data'], strategy_config, point, pip_value)
+    trades = results['trades']
+    entry_times = np.array([t['time'] for t in trades], dtype='datetime64[ns]')
+    exit_times = np.array([t['exit_time'] for t in trades], dtype='datetime64[ns]')
+    profits = np.array([t['profit'] for t in trades], dtype=float)
+
+    # Balance at entry: last equity point before the entry step
+    equity = results['equity_curve']
+    idx = np.searchsorted(equity['time'].to_numpy().astype('datetime64[ns]'), entry_times, side='left')
+    balances = np.concatenate([[backtest.config['backtest']['initial_balance']], equity['balance'].to_numpy(dtype=float)])[idx]
+    return evaluate_splits(entry_times, exit_times, profits / balances, day_times, bounds, splits, embargo)
+
+
+def _run_synthetic_path(strategy_config, timeframes, block_bars, base_timeframe, seed):
+    """Generate one synthetic path inside a pool worker and backtest it"""
+    point, pip_value = _WORKER['spec']
+    path = generate_synthetic_path(
+        _WORKER['data'], timeframes, block_bars, np.random.default_rng(seed), base_timeframe
+    )
+    results = _WORKER['backtest'].simulate(path, strategy_config, point, pip_value)
+    metrics = dict(results['metrics'])
+    metrics['net_profit'] = metrics['total_profit'] - metrics['total_loss']
+    metrics['final_balance'] = results['equity_curve']['balance'].iloc[-1] if len(results['equity_curve']) else None
+    return metrics
+
+
+def _run_walk_forward_fold(strategy_config, points, is_range, oos_range, rank_by):
+    """Optimize one walk-forward fold in-sample and backtest the winner out-of-sample"""
+    backtest = _WORKER['backtest']
+    data = _WORKER['data']
+    point, pip_value = _WORKER['spec']
+    if 'cursor' not in _WORKER:
+        _WORKER['cursor'] = MultiTimeframeCursor(data, 'M5')
+        _WORKER['resolve_exits'] = backtest.build_exit_resolver(data)
+    cursor = _WORKER['cursor']
+
+    in_sample = np.zeros(len(cursor), dtype=bool)
+    in_sample[is_range[0]:is_range[1]] = True
+    table = evaluate_param_sets(
+        data, strategy_config, points, cursor,
+        _WORKER['resolve_exits'],
+        point, pip_value,
+        backtest.config['trading'],
+        backtest.config['backtest']['initial_balance'],
+        step_mask=in_sample,
+        rsi_source=lambda tf, period: backtest.rsi_feature(data, tf, period)
+    )
+    best = int(table[rank_by].to_numpy().argmax())
+    params = points[best]
+
+    results = backtest.simulate(
+        data, apply_params(strategy_config, params), point, pip_value,
+        start=oos_range[0], end=oos_range[1]
+    )
+    oos_metrics = dict(results['metrics'])
+    oos_metrics['net_profit'] = oos_metrics['total_profit'] - oos_metrics['total_loss']
+    return {
+        'params': params,
+        'is_score': float(table[rank_by].iloc[best]),
+        'oos_metrics': oos_metrics,
+        'trades': results['trades'],
+        'equity_curve': results['equity_curve']
+    }
+
+
+def _run_shard(strategy_config, step_range, warmup_bars):
+    """
+    Signals and resolved exits of one shard of main steps.
+
+    Only the shard's bars plus warmup_bars bars per timeframe are given to
+    the strategy, and the exit timeframes run on past the shard end by the
+    holding period so that trades crossing the boundary resolve.
+    """
+    backtest = _WORKER['backtest']
+    data = _WORKER['data']
+    main_times = data['M5']['time'].to_numpy()
+    shard_start = main_times[step_range[0]]
+    shard_end = main_times[step_range[1] - 1] + timeframe_delta('M5')
+
+    holding_minutes = backtest.config['backtest'].get('max_holding_minutes', 60)
+    horizon_end = None if holding_minutes is None else shard_end + np.timedelta64(holding_minutes, 'm')
+
+    shard_data = {}
+    for tf, df in data.items():
+        times = df['time'].to_numpy()
+        first = max(int(np.searchsorted(times, shard_start)) - warmup_bars, 0)
+        last = len(df) if horizon_end is None else int(np.searchsorted(times, horizon_end, side='right'))
+        shard_data[tf] = df.iloc[first:last]
+
+    merged_config = backtest.config.copy()
+    merged_config['strategy'] = strategy_config
+    strategy = RSIStrategy(merged_config)
+    cursor = MultiTimeframeCursor(shard_data, 'M5')
+    signal_arrays = strategy.build_signal_arrays(shard_data, cursor)
+
+    # Local step j of the shard cursor is global step offset + j
+    offset = int(np.searchsorted(main_times, cursor.main_times[0]))
+    min_required_bars = max(strategy.rsi_periods.values())
+    local = np.arange(len(cursor))
+    active = (local + offset >= step_range[0]) & (local + offset < step_range[1])
+    for ends in cursor.ends.values():
+        active &= ends >= min_required_bars
+    has_signal = np.zeros(len(cursor), dtype=bool)
+    for arrays in signal_arrays.values():
+        has_signal |= arrays['side'] != 0
+
+    candidates = []
+    for j in np.flatnonzero(active & has_signal):
+        for signal in strategy.signals_at(signal_arrays, j):
+            candidates.append(dict(signal, step=int(j + offset), time=cursor.close_times[j]))
+    if not candidates:
+        return candidates
+
+    exit_prices, exit_types, exit_times = backtest.build_exit_resolver(shard_data)(
+        np.array([c['time'] for c in candidates], dtype='datetime64[ns]'),
+        np.array([1 if c['type'] == 'BUY' else -1 for c in candidates]),
+        np.array([c['sl'] for c in candidates]),
+        np.array([c['tp'] for c in candidates])
+    )
+    for candidate, exit_price, exit_type, exit_time in zip(candidates, exit_prices, exit_types, exit_times):
+        candidate['exit_type'] = exit_type
+        candidate['exit_price'] = float(exit_price)
+        candidate['exit_time'] = pd.Timestamp(exit_time) if exit_type is not None else None
+    return candidates
+
+
 def main():
+    parser = argparse.ArgumentParser(description='XAU bot backtest')
+    parser.add_argument('mode', nargs='?', default='run', choices=['run', 'sweep', 'optimize', 'vector-sweep', 'walk-forward', 'cpcv', 'sharded', 'replay', 'monte-carlo', 'stress', 'incremental'])
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for parallel modes')
+    parser.add_argument('--trials', type=int, default=None, help='optimize: total trials of the study')
+    parser.add_argument('--study', default=None, help='optimize: study name, resumed when it exists')
+    args = parser.parse_args()
+
     with open('config/config.json', 'r') as f:
         config = json.load(f)
     config['trading']['symbol'] = 'XAUUSDm'
     backtest = Backtest(config)
+
+    if args.mode == 'sweep':
+        backtest.logger.info("Starting parameter sweep...")
+        table = backtest.sweep(max_workers=args.workers)
+        if table is not None and not table.empty:
+            backtest.logger.info(f"Best parameter sets:\n{table.head(10).to_string()}")
+        else:
+            backtest.logger.error("Sweep failed")
+        return
+
+    if args.mode == 'optimize':
+        backtest.logger.info("Starting parameter optimization...")
+        table = backtest.optimize(trials=args.trials, max_workers=args.workers, study_name=args.study)
+        if table is not None and not table.empty:
+            backtest.logger.info(f"Best trials:\n{table.head(10).to_string()}")
+        else:
+            backtest.logger.error("Optimization failed")
+        return
+
+    if args.mode == 'vector-sweep':
+        backtest.logger.info("Starting vectorized parameter sweep...")
+        table = backtest.vector_sweep()
+        if table is not None and not table.empty:
+            backtest.logger.info(f"Best parameter sets:\n{table.head(10).to_string()}")
+        else:
+            backtest.logger.error("Vector sweep failed")
+        return
+
+    if args.mode == 'walk-forward':
+        backtest.logger.info("Starting walk-forward analysis...")
+        wf = backtest.walk_forward(max_workers=args.workers)
+        if wf is not None:
+            backtest.logger.info(f"Walk-forward folds:\n{wf['folds'].to_string()}")
+        else:
+            backtest.logger.error("Walk-forward analysis failed")
+        return
+
+    if args.mode == 'cpcv':
+        backtest.logger.info("Starting combinatorial purged cross-validation...")
+        cv = backtest.cpcv(max_workers=args.workers)
+        if cv is not None:
+            backtest.logger.info(f"Out-of-sample distributions:\n{cv['summary'].head(10).to_string()}")
+        else:
+            backtest.logger.error("CPCV failed")
+        return
+
+    if args.mode == 'monte-carlo':
+        backtest.logger.info("Starting Monte Carlo analysis...")
+        summary = backtest.monte_carlo(max_workers=args.workers)
+        if summary is not None:
+            backtest.logger.info(f"Monte Carlo summary:\n{summary.T.to_string()}")
+        else:
+            backtest.logger.error("Monte Carlo analysis failed")
+        return
+
+    if args.mode == 'stress':
+        backtest.logger.info("Starting synthetic path stress test...")
+        table = backtest.stress_test(max_workers=args.workers)
+        if table is not None and not table.empty:
+            backtest.logger.info(f"Outcome distribution:\n{table.drop(columns='path').describe(percentiles=[0.05, 0.5, 0.95]).to_string()}")
+        else:
+            backtest.logger.error("Stress test failed")
+        return
+
     backtest.logger.info("Starting backtest...")
-    results = backtest.run_backtest()
+    if args.mode == 'sharded':
+        results = backtest.run_sharded(max_workers=args.workers)
+    elif args.mode == 'replay':
+        results = backtest.replay_live()
+    elif args.mode == 'incremental':
+        results = backtest.run_incremental()
+    else:
+        results = backtest.run_backtest()
     if results:
         backtest.logger.info("Backtest completed successfully")
         backtest.logger.info(f"Total trades: {results['metrics']['total_trades']}")
@@ -5,6 +5,7 @@ from datetime import datetime
 import os
 from typing import Optional, Dict, List, Tuple
 from .data_manager import DataManager
+from .clock import SystemClock
 
 class BaseTradingStrategy(ABC):
     def __init__(self, config):
@@ -14,6 +15,10 @@ class BaseTradingStrategy(ABC):
         self.timeframes = config.get("strategy", {}).get("timeframes", [])
         self.symbol = config.get("trading", {}).get("symbol", "XAUUSD")
         self.support_timeframes = config.get("support_timeframes", {})
+        # Set by StrategyManager when the strategy is added
+        self.clock = SystemClock()
+        self.trade_manager = None
+        self.risk_manager = None
         self.data_manager = DataManager(
             symbol=self.symbol,
             timeframes=self.support_timeframes,
@@ -24,6 +29,8 @@ class BaseTradingStrategy(ABC):
         """Setup logger for the strategy"""
         logger = logging.getLogger(self.__class__.__name__)
         logger.setLevel(logging.INFO)
+        if logger.handlers:
+            return logger
         
         # Create logs directory if it doesn't exist
         if not os.path.exists('logs'):
@@ -74,7 +81,7 @@ class BaseTradingStrategy(ABC):
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
             
-        filename = f'{log_dir}/{self.__class__.__name__}_{datetime.now().strftime("%Y%m%d")}.csv'
+        filename = f'{log_dir}/{self.__class__.__name__}_{self.clock.now().strftime("%Y%m%d")}.csv'
         df = pd.DataFrame(self.trade_log)
         df.to_csv(filename, index=False)
         self.logger.info(f"Trade log saved to {filename}")
@@ -85,8 +92,8 @@ class BaseTradingStrategy(ABC):
         pass
     
     @abstractmethod
-    def run_strategy(self):
-        """Run the trading strategy"""
+    def run_strategy(self, data=None):
+        """Run the trading strategy on data, fetching it when None"""
         pass
     
     def calculate_priority(self, signal):
@@ -96,7 +103,7 @@ class BaseTradingStrategy(ABC):
     
     def add_trade_log(self, trade_info):
         """Add a trade to the log"""
-        trade_info['timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        trade_info['timestamp'] = self.clock.now().strftime("%Y-%m-%d %H:%M:%S")
         trade_info['strategy'] = self.__class__.__name__
         self.trade_log.append(trade_info)
         self.logger.info(f"Trade logged: {trade_info}")
@@ -0,0 +1,53 @@
+"""
+Clocks for the live trading loop.
+
+StrategyManager reads the time and waits between cycles through a clock
+object. SystemClock is the wall clock used in live trading; VirtualClock
+jumps forward instead of sleeping, so the live code path can be replayed
+over historical bars as fast as the CPU allows.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+
+class SystemClock:
+    """
+    Wall clock.
+    """
+
+    def now(self) -> datetime:
+        """Current local time"""
+        return datetime.now()
+
+    def sleep(self, seconds: float):
+        """Block the calling thread for `seconds`"""
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Simulated clock whose sleep() advances the time without waiting.
+    """
+
+    def __init__(self, start: datetime):
+        """
+        Initialize the clock.
+
+        Args:
+            start: Initial simulated time
+        """
+        self._now = start
+
+    def now(self) -> datetime:
+        """Current simulated time"""
+        return self._now
+
+    def sleep(self, seconds: float):
+        """Advance the simulated time by `seconds`"""
+        self._now = self._now + timedelta(seconds=seconds)
+
+    def advance_to(self, when: datetime):
+        """Move the simulated time forward to `when`, never backwards"""
+        if when > self._now:
+            self._now = when
@@ -0,0 +1,201 @@
+"""
+Combinatorial purged cross-validation (CPCV).
+
+The traded history is cut into N contiguous groups and every combination of
+k groups is used once as the test set, so each parameter set gets C(N, k)
+out-of-sample results instead of one backtest number. Train trades whose
+holding interval overlaps a test group are purged, and train trades opened
+within the embargo after a test group are dropped, so in-sample selection
+never sees information that leaks into the test groups.
+
+Splits are evaluated from the trades of one full-history backtest per
+parameter set: trade returns (PnL over the balance at entry) are assigned to
+the groups of their entry times, and daily returns, Sharpe and compounded
+drawdown are computed per split with numpy.
+"""
+
+import itertools
+import numpy as np
+import pandas as pd
+from typing import List, Sequence, Tuple
+
+from core.metrics import TRADING_DAYS_PER_YEAR
+
+
+def cpcv_splits(n_groups: int, test_groups: int) -> List[Tuple[int, ...]]:
+    """
+    Test group combinations of a CPCV.
+
+    Args:
+        n_groups: Number of groups N
+        test_groups: Groups per test set k
+
+    Returns:
+        List[Tuple[int, ...]]: The C(N, k) test group index tuples
+    """
+    if not 0 < test_groups < n_groups:
+        raise ValueError("test_groups must be between 1 and n_groups - 1")
+    return list(itertools.combinations(range(n_groups), test_groups))
+
+
+def group_bounds(times: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Boundaries of N groups of about equally many bars.
+
+    Boundaries fall on midnight, so every trading day belongs to exactly
+    one group and trades and days are grouped by the same rule.
+
+    Args:
+        times: Sorted bar times of the traded range
+        n_groups: Number of groups
+
+    Returns:
+        np.ndarray: N + 1 boundary times; group g is [bounds[g], bounds[g + 1])
+    """
+    times = np.asarray(times, dtype='datetime64[ns]')
+    edges = np.linspace(0, len(times), n_groups + 1).astype(int)
+    bounds = np.empty(n_groups + 1, dtype='datetime64[ns]')
+    bounds[:-1] = times[edges[:-1]].astype('datetime64[D]')
+    bounds[-1] = times[-1] + np.timedelta64(1, 'ns')
+    return bounds
+
+
+def split_masks(entry_times: np.ndarray, exit_times: np.ndarray, bounds: np.ndarray,
+                test: Sequence[int], embargo: np.timedelta64) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Train and test trades of one split.
+
+    Args:
+        entry_times: Entry time of every trade
+        exit_times: Exit time of every trade
+        bounds: Group boundaries from group_bounds
+        test: Test group indices
+        embargo: Time after the end of a test group in which train trades are dropped
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Boolean train and test masks over the trades
+    """
+    groups = np.searchsorted(bounds, entry_times, side='right') - 1
+    in_range = (groups >= 0) & (groups < len(bounds) - 1)
+    is_test = in_range & np.isin(groups, test)
+    train = in_range & ~is_test
+    for g in test:
+        start, end = bounds[g], bounds[g + 1]
+        # Purge: holding interval overlaps the test group
+        train &= ~((entry_times < end) & (exit_times >= start))
+        # Embargo: opened shortly after the test group
+        train &= ~((entry_times >= end) & (entry_times < end + embargo))
+    return train, is_test
+
+
+def daily_sharpe(exit_days: np.ndarray, returns: np.ndarray, days: np.ndarray) -> float:
+    """
+    Annualized Sharpe ratio of the daily sums of trade returns.
+
+    Every return counts on the day of its exit; trades exiting on a day
+    outside the evaluated days are left out.
+
+    Args:
+        exit_days: Exit day of every trade
+        returns: Return of every trade
+        days: Sorted trading days of the evaluated period, days without
+            trades count as 0
+    """
+    if len(days) < 2:
+        return 0.0
+    idx = np.minimum(np.searchsorted(days, exit_days), len(days) - 1)
+    on_day = days[idx] == exit_days
+    daily = np.zeros(len(days))
+    np.add.at(daily, idx[on_day], returns[on_day])
+    std = daily.std(ddof=1)
+    return float(daily.mean() / std * np.sqrt(TRADING_DAYS_PER_YEAR)) if std > 0 else 0.0
+
+
+def compounded_drawdown(returns: np.ndarray) -> float:
+    """Max drawdown of the equity compounded from a sequence of returns"""
+    if len(returns) == 0:
+        return 0.0
+    equity = np.cumprod(1 + returns)
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0))
+    return float(((peak - equity) / peak).max())
+
+
+def evaluate_splits(entry_times: np.ndarray, exit_times: np.ndarray, returns: np.ndarray,
+                    day_times: np.ndarray, bounds: np.ndarray, splits: List[Tuple[int, ...]],
+                    embargo: np.timedelta64) -> pd.DataFrame:
+    """
+    In-sample and out-of-sample results of one parameter set on every split.
+
+    Args:
+        entry_times: Entry time of every trade
+        exit_times: Exit time of every trade
+        returns: Return of every trade on the balance at its entry
+        day_times: Sorted trading days of the traded range (datetime64[D])
+        bounds: Group boundaries from group_bounds
+        splits: Test group tuples from cpcv_splits
+        embargo: Embargo after each test group
+
+    Returns:
+        pd.DataFrame: One row per split with 'split', 'test_groups',
+            'is_sharpe', 'is_trades', 'oos_sharpe', 'oos_max_drawdown',
+            'oos_return' and 'oos_trades'
+    """
+    entry_times = np.asarray(entry_times, dtype='datetime64[ns]')
+    exit_times = np.asarray(exit_times, dtype='datetime64[ns]')
+    returns = np.asarray(returns, dtype=float)
+    order = np.argsort(exit_times, kind='stable')
+    entry_times, exit_times, returns = entry_times[order], exit_times[order], returns[order]
+    exit_days = exit_times.astype('datetime64[D]')
+    # Same rule as the trades: the group whose [start, end) holds the day's start
+    day_groups = np.searchsorted(bounds, day_times.astype('datetime64[ns]'), side='right') - 1
+
+    rows = []
+    for number, test in enumerate(splits):
+        train, is_test = split_masks(entry_times, exit_times, bounds, test, embargo)
+        test_days = np.isin(day_groups, test)
+        rows.append({
+            'split': number,
+            'test_groups': '-'.join(str(g) for g in test),
+            'is_sharpe': daily_sharpe(exit_days[train], returns[train], day_times[~test_days]),
+            'is_trades': int(train.sum()),
+            'oos_sharpe': daily_sharpe(exit_days[is_test], returns[is_test], day_times[test_days]),
+            'oos_max_drawdown': compounded_drawdown(returns[is_test]),
+            'oos_return': float(np.prod(1 + returns[is_test]) - 1),
+            'oos_trades': int(is_test.sum())
+        })
+    return pd.DataFrame(rows)
+
+
+def summarize(table: pd.DataFrame, param_columns: List[str]) -> Tuple[pd.DataFrame, float]:
+    """
+    Out-of-sample distribution per parameter set and the probability of
+    backtest overfitting.
+
+    Args:
+        table: Concatenated evaluate_splits outputs with a 'param_set' column
+            and the parameter columns
+        param_columns: Names of the parameter columns
+
+    Returns:
+        Tuple[pd.DataFrame, float]: One row per parameter set (OOS Sharpe
+            mean/median/std/5th percentile, OOS drawdown mean/95th percentile,
+            splits it was selected in-sample), and the fraction of splits whose
+            in-sample best set ranks in the lower half out-of-sample
+    """
+    grouped = table.groupby('param_set')
+    summary = grouped[param_columns].first()
+    summary['oos_sharpe_mean'] = grouped['oos_sharpe'].mean()
+    summary['oos_sharpe_median'] = grouped['oos_sharpe'].median()
+    summary['oos_sharpe_std'] = grouped['oos_sharpe'].std()
+    summary['oos_sharpe_p5'] = grouped['oos_sharpe'].quantile(0.05)
+    summary['oos_max_drawdown_mean'] = grouped['oos_max_drawdown'].mean()
+    summary['oos_max_drawdown_p95'] = grouped['oos_max_drawdown'].quantile(0.95)
+    summary['oos_return_mean'] = grouped['oos_return'].mean()
+
+    # Parameter set chosen in-sample on every split and its out-of-sample rank
+    table = table.copy()
+    table['oos_rank'] = table.groupby('split')['oos_sharpe'].rank(pct=True)
+    chosen = table.loc[table.groupby('split')['is_sharpe'].idxmax()]
+    summary['selected_splits'] = chosen['param_set'].value_counts().reindex(summary.index, fill_value=0)
+    pbo = float((chosen['oos_rank'] <= 0.5).mean()) if len(chosen) and table['param_set'].nunique() > 1 else float('nan')
+    return summary.reset_index().sort_values('oos_sharpe_median', ascending=False).reset_index(drop=True), pbo
@@ -6,11 +6,15 @@ data fetching, preprocessing, and technical analysis.
 """
 
 import logging
-import MetaTrader5 as mt5
 import pandas as pd
 from typing import Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
 
+try:
+    import MetaTrader5 as mt5
+except ImportError:  # Backtests and replays run from stored data
+    mt5 = None
+
 
 class DataManager:
     """
@@ -36,6 +40,9 @@ class DataManager:
         self.logger = logger or logging.getLogger(__name__)
 
     def fetch_all(self, bars=1000) -> dict:
+        if mt5 is None:
+            self.logger.error("MetaTrader5 package is not installed")
+            return {}
         if not mt5.initialize():
             if self.logger:
                 self.logger.error("Failed to initialize MT5")
@@ -75,6 +82,9 @@ class DataManager:
             Optional[pd.DataFrame]: DataFrame containing market data
         """
         try:
+            if mt5 is None:
+                self.logger.error("MetaTrader5 package is not installed")
+                return None
             if timeframe not in self.timeframes:
                 self.logger.error(f"Invalid timeframe: {timeframe}")
                 return None
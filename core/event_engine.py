@@ -0,0 +1,311 @@
+"""
+Event-driven backtest core.
+
+This module replays a backtest as a heap of timestamped events instead of
+visiting every main-timeframe bar: bar-close events of a timeframe whose
+closed bar carries a signal, and exit events on the step that reaches the
+predicted first-touch time of each open trade. The cost scales with the
+number of events rather than with bars times open trades.
+"""
+
+import heapq
+import logging
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Optional
+
+from core.exit_resolver import settle_exit
+from core.run_monitor import RunningMetrics
+from core.trade_accounting import open_trade, close_trade
+
+
+# Event kinds, in processing order for events with the same timestamp.
+# simulate() closes a trade on the first step whose bar closes strictly after
+# its exit. Exit events are keyed at the open of that step, after the bar
+# closes of the previous step, and run in the order the trades were opened,
+# which is the order simulate() books them in.
+BAR_CLOSE = 0
+EXIT = 1
+
+
+class EventDrivenBacktest:
+    """
+    Heap-ordered backtest engine.
+
+    Plugs in the strategy (through build_signal_arrays/signals_at), the
+    RiskManager and the trade manager unchanged and reproduces the
+    accounting rules of Backtest.simulate().
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        strategy,
+        risk_manager,
+        trade_manager,
+        resolve_exits: Callable,
+        point: float,
+        pip_value: float,
+        logger: Optional[logging.Logger] = None
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            config: Main config (trading, backtest and mt5 sections)
+            strategy: Strategy with build_signal_arrays and signals_at
+            risk_manager: RiskManager instance
+            trade_manager: Trade manager implementing place_order
+            resolve_exits: Function (entry_times, sides, sl, tp) -> (price, type, time)
+            point: Symbol point size
+            pip_value: Value of one point for one lot
+            logger: Optional logger instance
+        """
+        self.config = config
+        self.strategy = strategy
+        self.risk_manager = risk_manager
+        self.trade_manager = trade_manager
+        self.resolve_exits = resolve_exits
+        self.point = point
+        self.pip_value = pip_value
+        self.logger = logger or logging.getLogger(__name__)
+        self.events_processed = 0
+
+    def run(
+        self,
+        data: Dict[str, pd.DataFrame],
+        cursor,
+        min_required_bars: int,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        abort=None
+    ) -> dict:
+        """
+        Run the event loop over loaded data.
+
+        Args:
+            data: Dictionary of timeframe name to OHLC DataFrame
+            cursor: MultiTimeframeCursor over data
+            min_required_bars: Bars every timeframe needs before trading
+            start: First main step allowed to trade
+            end: Main step at which trading stops (exclusive)
+            abort: Optional AbortRules checked after every event
+
+        Returns:
+            dict: 'trades', 'equity_curve', 'max_drawdown', the 'aborted'
+                reason (None when the run completed) and the 'progress'
+                fraction of the steps from start to end simulated
+        """
+        initial_balance = self.config['backtest']['initial_balance']
+
+        ready = np.ones(len(cursor), dtype=bool)
+        for ends in cursor.ends.values():
+            ready &= ends >= min_required_bars
+        ready[0] = False
+        ready[:start or 0] = False
+        if end is not None:
+            ready[end:] = False
+
+        # Bar-close events: one per timeframe and main step on which that
+        # timeframe's last closed bar carries a signal
+        events = []
+        sequence = 0
+        signal_arrays = self.strategy.build_signal_arrays(data, cursor)
+        for tf_order, tf in enumerate(self.strategy.timeframes):
+            if tf not in signal_arrays:
+                continue
+            for step in np.flatnonzero((signal_arrays[tf]['side'] != 0) & ready):
+                events.append((cursor.close_times[step], BAR_CLOSE, tf_order, sequence, (tf, int(step))))
+                sequence += 1
+        heapq.heapify(events)
+
+        current_balance = initial_balance
+        running = RunningMetrics(initial_balance)
+        if ready.any():
+            running.start_time = cursor.time(int(ready.argmax()))
+        first_step = max(start or 1, 1)
+        last_step = len(cursor) if end is None else min(end, len(cursor))
+        progress = 1.0
+        aborted = None
+        settle_step = last_step - 1
+        open_trades = []
+        closed = []
+        # Steps on which trades were booked and the balance after each booking
+        balance_steps = []
+        balances = []
+        self.events_processed = 0
+
+        # Steps simulate() visits, checked for the abort rules at every step end
+        traded = np.flatnonzero(ready)
+        first_ready, end_ready = (int(traded[0]), int(traded[-1]) + 1) if len(traded) else (0, 0)
+        current_step = None
+        while events:
+            event_time, kind, _, _, payload = heapq.heappop(events)
+
+            # Main step simulate() handles the event on: exits close on the
+            # first step whose bar closes strictly after them
+            step = int(np.searchsorted(cursor.close_times, event_time, side='left' if kind == BAR_CLOSE else 'right'))
+            if step != current_step:
+                if current_balance <= 0:
+                    # simulate() books every exit of the step the balance ran out on, then stops
+                    break
+                if current_step is None or current_step < end_ready:
+                    aborted, abort_step = self._finish_steps(
+                        running, abort, cursor, current_step, first_ready, min(step, end_ready), current_balance
+                    )
+                    if aborted:
+                        self.logger.info(f"Run aborted at {cursor.time(abort_step)}: {aborted}")
+                        ready[abort_step + 1:] = False
+                        progress = (abort_step - first_step + 1) / max(last_step - first_step, 1)
+                        settle_step = abort_step
+                        break
+                current_step = step
+            if step >= last_step:
+                # Exits after the simulated range are settled below
+                break
+            self.events_processed += 1
+
+            if kind == EXIT:
+                trade = payload
+                current_balance += self._book(trade)
+                running.record_trade(trade['profit'])
+                closed.append(trade)
+                balance_steps.append(step)
+                balances.append(current_balance)
+                open_trades.remove(trade)
+                self.risk_manager.update_open_positions(len(open_trades))
+            else:
+                tf, step = payload
+                entry_time = cursor.close_time(step)
+                opened = []
+                for signal in self.strategy.signals_at({tf: signal_arrays[tf]}, step):
+                    trade = open_trade(
+                        signal, entry_time, current_balance, self.point, self.pip_value,
+                        self.config, self.risk_manager, self.trade_manager
+                    )
+                    if trade is not None:
+                        trade['step'] = step
+                        open_trades.append(trade)
+                        opened.append(trade)
+                        self.risk_manager.update_open_positions(len(open_trades))
+
+                sequence = self._schedule_exits(opened, events, cursor, sequence)
+
+        if current_balance <= 0:
+            self.logger.warning(f"Account balance depleted at {cursor.time(current_step)}. Backtest stopped.")
+            ready[current_step + 1:] = False
+
+        if not aborted and current_balance > 0 and (current_step is None or current_step < end_ready):
+            aborted, abort_step = self._finish_steps(
+                running, abort, cursor, current_step, first_ready, end_ready, current_balance
+            )
+            if aborted:
+                self.logger.info(f"Run aborted at {cursor.time(abort_step)}: {aborted}")
+                ready[abort_step + 1:] = False
+                progress = (abort_step - first_step + 1) / max(last_step - first_step, 1)
+                settle_step = abort_step
+
+        equity_curve = self._equity_curve(balance_steps, balances, cursor, ready, initial_balance)
+
+        # Settle trades still open at the close of the last simulated step,
+        # as simulate() does
+        if open_trades and current_balance > 0:
+            end_time = cursor.close_times[settle_step]
+            end_price = cursor.column(cursor.main_tf, 'close')[settle_step]
+            for trade in open_trades:
+                settle_exit(trade, end_time, end_price)
+                current_balance += self._book(trade)
+                running.record_trade(trade['profit'])
+                closed.append(trade)
+            equity_curve = pd.concat([
+                equity_curve,
+                pd.DataFrame({'time': np.array([end_time], dtype='datetime64[ns]'), 'balance': [current_balance]})
+            ], ignore_index=True)
+            running.update(end_time, current_balance)
+        for trade in closed + open_trades:
+            trade.pop('step', None)
+
+        return {
+            'trades': closed,
+            'equity_curve': equity_curve,
+            'max_drawdown': running.max_drawdown,
+            'aborted': aborted,
+            'progress': progress
+        }
+
+    @staticmethod
+    def _finish_steps(running, abort, cursor, step, first_quiet, next_step, balance):
+        """
+        Record the balance at the end of a step with events and of the quiet
+        steps up to the next one, checking the abort rules like the per-step
+        loop of simulate().
+
+        Args:
+            running: RunningMetrics of the run
+            abort: AbortRules or None
+            cursor: MultiTimeframeCursor of the run
+            step: Last step with events, None before the first one
+            first_quiet: First tradable step, used when step is None
+            next_step: Next step with events (exclusive bound of the quiet steps)
+            balance: Balance after step
+
+        Returns:
+            tuple: Abort reason (None to continue) and the step it applies to
+        """
+        if step is not None:
+            running.update(cursor.time(step), balance)
+            aborted = abort.check(running) if abort is not None else None
+            if aborted:
+                return aborted, step
+            first_quiet = step + 1
+        if next_step <= first_quiet:
+            return None, None
+
+        # Only the trade count deadline can pass on steps without events
+        running.update(cursor.time(next_step - 1), balance)
+        if abort is None or not abort.check(running):
+            return None, None
+        deadline = np.datetime64(running.trades_deadline, 'ns')
+        quiet_step = min(max(int(np.searchsorted(cursor.main_times, deadline, side='left')), first_quiet), next_step - 1)
+        running.update(cursor.time(quiet_step), balance)
+        return abort.check(running), quiet_step
+
+    def _schedule_exits(self, trades, events, cursor, sequence) -> int:
+        """Resolve the exits of newly opened trades and push their exit events"""
+        if not trades:
+            return sequence
+        exit_prices, exit_types, exit_times = self.resolve_exits(
+            np.array([t['time'] for t in trades], dtype='datetime64[ns]'),
+            np.array([1 if t['type'] == 'BUY' else -1 for t in trades]),
+            np.array([t['sl'] for t in trades]),
+            np.array([t['tp'] for t in trades])
+        )
+        for trade, exit_price, exit_type, exit_time in zip(trades, exit_prices, exit_types, exit_times):
+            if exit_type is None:
+                continue
+            trade.update({
+                'exit_price': float(exit_price),
+                'exit_time': pd.Timestamp(exit_time),
+                'exit_type': exit_type
+            })
+            # Booked on the first step closing after the exit, never on the entry step
+            close_step = max(int(np.searchsorted(cursor.close_times, exit_time, side='right')), trade['step'] + 1)
+            event_time = cursor.close_times[close_step - 1]
+            heapq.heappush(events, (event_time, EXIT, 0, sequence, trade))
+            sequence += 1
+        return sequence
+
+    def _book(self, trade) -> float:
+        """PnL of a trade at its resolved exit"""
+        return close_trade(trade, self.point, self.pip_value)
+
+    @staticmethod
+    def _equity_curve(balance_steps, balances, cursor, ready, initial_balance) -> pd.DataFrame:
+        """Realized balance of every traded main step, forward-filled from the bookings"""
+        if not ready.any():
+            return pd.DataFrame({'time': np.array([], dtype='datetime64[ns]'), 'balance': np.array([], dtype=float)})
+        traded = np.flatnonzero(ready)
+        steps = np.arange(traded[0], traded[-1] + 1)
+        idx = np.searchsorted(np.array(balance_steps, dtype=np.int64), steps, side='right') - 1
+        balance = np.where(idx >= 0, np.array(balances + [initial_balance])[idx], initial_balance)
+        return pd.DataFrame({'time': cursor.main_times[steps].astype('datetime64[ns]'), 'balance': balance})
@@ -0,0 +1,185 @@
+"""
+Batch SL/TP exit resolution.
+
+This module resolves the exits of many trades at once from the high/low
+arrays of a lower timeframe (M1 by default) instead of walking bars row by
+row for every trade.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+
+from core.range_extrema import RangeExtremaIndex
+
+
+def resolve_exits(
+    entry_times: np.ndarray,
+    sides: np.ndarray,
+    sl: np.ndarray,
+    tp: np.ndarray,
+    bar_times: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    holding: Optional[np.timedelta64] = np.timedelta64(60, 'm'),
+    index: Optional[RangeExtremaIndex] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the first bar that touches SL or TP for every trade.
+
+    Only bars opened at or after the entry time and before `entry + holding`
+    are scanned, so with entries at the close of the signal bar no price
+    action before the entry is used. When a bar touches both levels the stop
+    loss wins. Trades without a touch time out at the close of the last bar
+    of their window, or at the last close before the entry when a market
+    closure leaves the window without bars; trades whose window is not fully
+    covered by the data yet stay unresolved.
+
+    With a RangeExtremaIndex the first touch is found by binary lifting in
+    O(log n) per trade, which also allows an unlimited holding period
+    (holding=None). Without an index a dense (trades x window) matrix is
+    scanned, which is only practical for short windows.
+
+    Args:
+        entry_times: Entry times (datetime64), the close of the signal bar
+        sides: 1 for BUY, -1 for SELL
+        sl: Stop loss prices
+        tp: Take profit prices
+        bar_times: Bar open times of the scanned timeframe, sorted
+        highs: Bar highs
+        lows: Bar lows
+        closes: Bar closes
+        holding: Maximum holding period, None for no limit (requires index)
+        index: Optional range-extrema index built over highs and lows
+
+    Returns:
+        tuple: (exit_price, exit_type, exit_time) arrays. exit_type holds
+        'sl', 'tp', 'timeout' or None, unresolved trades have a NaN price
+        and NaT time.
+    """
+    entry_times = np.asarray(entry_times, dtype='datetime64[ns]')
+    bar_times = np.asarray(bar_times, dtype='datetime64[ns]')
+    sides = np.asarray(sides)
+    sl = np.asarray(sl, dtype=float)
+    tp = np.asarray(tp, dtype=float)
+    n = len(entry_times)
+
+    exit_price = np.full(n, np.nan)
+    exit_type = np.full(n, None, dtype=object)
+    exit_time = np.full(n, np.datetime64('NaT'), dtype='datetime64[ns]')
+    if n == 0 or len(bar_times) == 0:
+        return exit_price, exit_type, exit_time
+
+    if index is not None:
+        return _resolve_indexed(
+            entry_times, sides, sl, tp, bar_times, closes, holding, index,
+            exit_price, exit_type, exit_time
+        )
+    if holding is None:
+        raise ValueError("An unlimited holding period requires a RangeExtremaIndex")
+
+    window_end = entry_times + holding
+    start = np.searchsorted(bar_times, entry_times, side='left')
+    stop = np.searchsorted(bar_times, window_end, side='left')
+
+    # (trades x window) matrix of bar indices, masked outside each window
+    width = max(int((stop - start).max()), 1)
+    idx = start[:, None] + np.arange(width)
+    in_window = idx < stop[:, None]
+    idx = np.minimum(idx, len(bar_times) - 1)
+
+    high = highs[idx]
+    low = lows[idx]
+    buy = (sides > 0)[:, None]
+    sl_hit = np.where(buy, low <= sl[:, None], high >= sl[:, None]) & in_window
+    tp_hit = np.where(buy, high >= tp[:, None], low <= tp[:, None]) & in_window
+    hit = sl_hit | tp_hit
+
+    rows = np.arange(n)
+    first = hit.argmax(axis=1)
+    touched = hit[rows, first]
+    first_is_sl = sl_hit[rows, first]
+    complete = bar_times[-1] >= window_end
+    timed_out = ~touched & complete
+
+    touch_idx = idx[rows, first]
+    exit_price[touched] = np.where(first_is_sl, sl, tp)[touched]
+    exit_time[touched] = bar_times[touch_idx[touched]]
+    exit_type[touched & first_is_sl] = 'sl'
+    exit_type[touched & ~first_is_sl] = 'tp'
+
+    last_idx = np.maximum(stop - 1, 0)
+    exit_price[timed_out] = closes[last_idx[timed_out]]
+    exit_time[timed_out] = np.maximum(bar_times[last_idx], entry_times)[timed_out]
+    exit_type[timed_out] = 'timeout'
+
+    return exit_price, exit_type, exit_time
+
+
+def _resolve_indexed(entry_times, sides, sl, tp, bar_times, closes, holding, index,
+                     exit_price, exit_type, exit_time):
+    """resolve_exits backend that binary-searches the first touch with the index"""
+    start = np.searchsorted(bar_times, entry_times, side='left')
+    if holding is None:
+        stop = np.full(len(entry_times), len(bar_times))
+        complete = np.zeros(len(entry_times), dtype=bool)
+    else:
+        window_end = entry_times + holding
+        stop = np.searchsorted(bar_times, window_end, side='left')
+        complete = bar_times[-1] >= window_end
+
+    buy = sides > 0
+    # BUY: SL is hit by lows and TP by highs, SELL the other way round
+    sl_idx = np.where(
+        buy,
+        index.first_low_at_or_below(start, stop, sl),
+        index.first_high_at_or_above(start, stop, sl)
+    )
+    tp_idx = np.where(
+        buy,
+        index.first_high_at_or_above(start, stop, tp),
+        index.first_low_at_or_below(start, stop, tp)
+    )
+
+    first_is_sl = sl_idx <= tp_idx
+    touch_idx = np.minimum(sl_idx, tp_idx)
+    touched = touch_idx < stop
+    timed_out = ~touched & complete
+
+    exit_price[touched] = np.where(first_is_sl, sl, tp)[touched]
+    exit_time[touched] = bar_times[touch_idx[touched]]
+    exit_type[touched & first_is_sl] = 'sl'
+    exit_type[touched & ~first_is_sl] = 'tp'
+
+    last_idx = np.maximum(stop - 1, 0)
+    exit_price[timed_out] = closes[last_idx[timed_out]]
+    exit_time[timed_out] = np.maximum(bar_times[last_idx], entry_times)[timed_out]
+    exit_type[timed_out] = 'timeout'
+
+    return exit_price, exit_type, exit_time
+
+
+def settle_exit(trade: dict, end_time, end_price: float) -> dict:
+    """
+    Exit of a trade still open when a run ends.
+
+    A resolved exit before end_time (the close of the last simulated bar) is
+    kept. Any other trade closes at end_price at end_time with exit type
+    'end', so no PnL from after the simulated range is booked.
+
+    Args:
+        trade: Trade dict, updated in place
+        end_time: Close time of the last simulated bar
+        end_price: Close price of the last simulated bar
+
+    Returns:
+        dict: The trade
+    """
+    if trade.get('exit_time') is None or trade['exit_time'] >= end_time:
+        trade.update({
+            'exit_price': float(end_price),
+            'exit_time': pd.Timestamp(end_time),
+            'exit_type': 'end'
+        })
+    return trade
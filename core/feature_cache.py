@@ -0,0 +1,116 @@
+"""
+Memoized indicator features.
+
+This module provides an LRU cache of indicator arrays keyed by
+(timeframe, indicator, params, data fingerprint), so each distinct indicator
+series is computed once per dataset across repeated runs and sweep points.
+"""
+
+import hashlib
+import logging
+import weakref
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Sequence
+
+
+def data_fingerprint(df: pd.DataFrame, columns: Sequence[str] = ('close',)) -> str:
+    """
+    Content fingerprint of an OHLC DataFrame (bar times and price columns).
+
+    Args:
+        df: DataFrame with a 'time' column and the fingerprinted columns
+        columns: Price columns hashed along with the times, the closes by default
+
+    Returns:
+        str: Hex digest identifying the series
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(len(df)).encode())
+    digest.update(np.ascontiguousarray(df['time'].to_numpy().astype('datetime64[ns]')).tobytes())
+    for column in columns:
+        digest.update(np.ascontiguousarray(df[column].to_numpy(dtype=float)).tobytes())
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """
+    Size-bounded LRU cache of read-only indicator arrays.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20, logger: Optional[logging.Logger] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Upper bound of the total size of cached arrays
+            logger: Optional logger instance
+        """
+        self.max_bytes = max_bytes
+        self.logger = logger or logging.getLogger(__name__)
+        self._entries = OrderedDict()
+        self._fingerprints = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, df: pd.DataFrame) -> str:
+        """Fingerprint of df, hashed once per DataFrame object"""
+        entry = self._fingerprints.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        fp = data_fingerprint(df)
+        # Forget DataFrames that no longer exist before adding a new one
+        self._fingerprints = {k: v for k, v in self._fingerprints.items() if v[0]() is not None}
+        self._fingerprints[id(df)] = (weakref.ref(df), fp)
+        return fp
+
+    def get_or_compute(
+        self,
+        timeframe: str,
+        indicator: str,
+        params: Hashable,
+        df: pd.DataFrame,
+        compute: Callable[[], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Return the cached indicator array or compute and store it.
+
+        Args:
+            timeframe: Timeframe name
+            indicator: Indicator name, e.g. 'rsi_rma'
+            params: Hashable indicator parameters, e.g. (14,)
+            df: Source data, used for the fingerprint
+            compute: Function returning the indicator array for df
+
+        Returns:
+            np.ndarray: Read-only indicator array aligned with df
+        """
+        key = (timeframe, indicator, params, self.fingerprint(df))
+        values = self._entries.get(key)
+        if values is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return values
+
+        self.misses += 1
+        values = np.asarray(compute())
+        values.flags.writeable = False
+        self._entries[key] = values
+        self.size += values.nbytes
+        self._evict()
+        return values
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            key, values = self._entries.popitem(last=False)
+            self.size -= values.nbytes
+            self.logger.debug(f"Evicted feature {key[:3]}")
+
+    def clear(self):
+        """Remove every cached feature"""
+        self._entries.clear()
+        self._fingerprints.clear()
+        self.size = 0
@@ -0,0 +1,151 @@
+"""
+Coarse-to-fine exit detection.
+
+This module resolves SL/TP exits by scanning coarse bars (H1, M15) first and
+drilling down to finer timeframes (M5, then M1) only inside the coarse bars
+whose range reaches the SL or TP level.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional, Tuple
+
+from core.timeframe_cursor import TIMEFRAME_MINUTES, timeframe_delta
+
+
+class HierarchicalExitEngine:
+    """
+    Multi-resolution SL/TP exit engine.
+
+    A coarse bar that reaches neither level cannot contain a touch at any
+    finer resolution, so only coarse bars with a touch are expanded. The
+    result has the resolution of the finest level used. Timeframes missing
+    from the data are skipped, and when a finer timeframe has no bars inside
+    a coarse bar the touch is resolved at the coarse resolution.
+    """
+
+    def __init__(
+        self,
+        data: Dict[str, pd.DataFrame],
+        timeframes: Iterable[str] = ('H1', 'M15', 'M5', 'M1'),
+        depth: Optional[int] = None,
+        holding: Optional[np.timedelta64] = np.timedelta64(60, 'm'),
+        logger: Optional[logging.Logger] = None
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            data: Dictionary of timeframe name to OHLC DataFrame
+            timeframes: Candidate timeframes, any order
+            depth: Number of drill-down steps below the coarsest level,
+                None to use every available finer level
+            holding: Maximum holding period, None for no limit
+            logger: Optional logger instance
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.holding = holding
+
+        levels = sorted(
+            (tf for tf in timeframes if tf in TIMEFRAME_MINUTES),
+            key=lambda tf: TIMEFRAME_MINUTES[tf],
+            reverse=True
+        )
+        missing = [tf for tf in levels if tf not in data or data[tf].empty]
+        if missing:
+            self.logger.warning(f"Exit engine: no data for {', '.join(missing)}, skipping")
+        levels = [tf for tf in levels if tf not in missing]
+        if not levels:
+            raise ValueError("Exit engine needs at least one timeframe with data")
+        if depth is not None:
+            levels = levels[:depth + 1]
+        self.levels = levels
+
+        self.times = {tf: data[tf]['time'].to_numpy().astype('datetime64[ns]') for tf in levels}
+        self.highs = {tf: data[tf]['high'].to_numpy() for tf in levels}
+        self.lows = {tf: data[tf]['low'].to_numpy() for tf in levels}
+        self.closes = {tf: data[tf]['close'].to_numpy() for tf in levels}
+        self.finest = levels[-1]
+        self.finest_delta = timeframe_delta(self.finest)
+
+    def resolve(self, entry_times, sides, sl, tp) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Resolve exits with the same contract as core.exit_resolver.resolve_exits,
+        at the resolution of the finest level used.
+        """
+        entry_times = np.asarray(entry_times, dtype='datetime64[ns]')
+        n = len(entry_times)
+        exit_price = np.full(n, np.nan)
+        exit_type = np.full(n, None, dtype=object)
+        exit_time = np.full(n, np.datetime64('NaT'), dtype='datetime64[ns]')
+
+        finest_times = self.times[self.finest]
+        last_time = finest_times[-1]
+
+        for k in range(n):
+            buy = sides[k] > 0
+            lo = entry_times[k]
+            hi = last_time + self.finest_delta if self.holding is None else lo + self.holding
+
+            touch = self._scan(0, lo, hi, buy, sl[k], tp[k])
+            if touch is not None:
+                kind, when = touch
+                exit_type[k] = kind
+                exit_price[k] = sl[k] if kind == 'sl' else tp[k]
+                exit_time[k] = when
+            elif self.holding is not None and last_time >= hi:
+                last = max(np.searchsorted(finest_times, hi, side='left') - 1, 0)
+                exit_type[k] = 'timeout'
+                exit_price[k] = self.closes[self.finest][last]
+                exit_time[k] = max(finest_times[last], lo)
+
+        return exit_price, exit_type, exit_time
+
+    def _scan(self, level: int, lo, hi, buy: bool, sl: float, tp: float):
+        """
+        First touch among finest bars opened in [lo, hi), scanning level
+        `level` and drilling into the bars that reach a level.
+
+        Returns:
+            Optional[tuple]: ('sl' | 'tp', bar time) or None
+        """
+        tf = self.levels[level]
+        times = self.times[tf]
+        delta = timeframe_delta(tf)
+
+        # Bars of tf that overlap finest bars opened in [lo, hi)
+        a = np.searchsorted(times, lo - delta + self.finest_delta, side='left')
+        b = np.searchsorted(times, hi, side='left')
+        if a >= b:
+            return None
+
+        high = self.highs[tf][a:b]
+        low = self.lows[tf][a:b]
+        sl_hit = low <= sl if buy else high >= sl
+        tp_hit = high >= tp if buy else low <= tp
+
+        for j in np.flatnonzero(sl_hit | tp_hit):
+            bar_time = times[a + j]
+            is_finest = level == len(self.levels) - 1
+            if not is_finest:
+                sub_lo = max(lo, bar_time)
+                sub_hi = min(hi, bar_time + delta)
+                touch = self._scan(level + 1, sub_lo, sub_hi, buy, sl, tp)
+                if touch is not None:
+                    return touch
+                if self._covered(level + 1, bar_time, delta):
+                    continue
+                # No finer bars inside this bar: resolve at this resolution
+            if bar_time < lo:
+                # Opened before the entry: its touch may predate the trade
+                continue
+            return ('sl' if sl_hit[j] else 'tp'), bar_time
+
+        return None
+
+    def _covered(self, level: int, bar_time, delta) -> bool:
+        """Whether level has any bar inside [bar_time, bar_time + delta)"""
+        times = self.times[self.levels[level]]
+        a = np.searchsorted(times, bar_time, side='left')
+        return a < len(times) and times[a] < bar_time + delta
@@ -91,6 +91,93 @@ def calculate_rsi(df: pd.DataFrame, period: int = 14, column: str = 'close') ->
     
     return rsi
 
+def calculate_rsi_rma(df: pd.DataFrame, period: int = 14, column: str = 'close') -> pd.Series:
+    """
+    Calculate RSI with Wilder's RMA smoothing (same as Pine Script ta.rsi)
+    
+    Args:
+        df (pd.DataFrame): DataFrame containing price data
+        period (int): Period for RSI calculation (default: 14)
+        column (str): Column name to calculate RSI for (default: 'close')
+        
+    Returns:
+        pd.Series: Series containing RSI values
+    """
+    change = df[column].diff()
+    ups = np.where(change > 0, change, 0)
+    downs = np.where(change < 0, -change, 0)
+    ups_rma = pd.Series(ups).ewm(alpha=1 / period, min_periods=period).mean()
+    downs_rma = pd.Series(downs).ewm(alpha=1 / period, min_periods=period).mean()
+    rs = ups_rma / downs_rma
+    rsi = np.where(downs_rma == 0, 100, np.where(ups_rma == 0, 0, 100 - (100 / (1 + rs))))
+    return pd.Series(rsi, index=df.index)
+
+class IncrementalRSI:
+    """
+    Streaming form of calculate_rsi_rma: one O(1) update per new close.
+
+    Keeps the running state of the two ewm means (weighted value and weight
+    sum, updated in the same order of operations as pandas) so that feeding
+    the closes of a series one by one reproduces calculate_rsi_rma on it.
+    """
+
+    def __init__(self, period: int = 14):
+        """
+        Args:
+            period (int): Period for RSI calculation (default: 14)
+        """
+        self.period = period
+        self.decay = 1 - 1 / period
+        self.count = 0
+        self.last_close = np.nan
+        self.up = 0.0
+        self.down = 0.0
+        self.weight = 1.0
+
+    def copy(self) -> 'IncrementalRSI':
+        """Independent copy of the current state"""
+        other = IncrementalRSI.__new__(IncrementalRSI)
+        other.__dict__.update(self.__dict__)
+        return other
+
+    def update(self, close: float) -> float:
+        """
+        Add the next close.
+
+        Args:
+            close (float): Close of the next bar
+
+        Returns:
+            float: RSI after this bar, NaN until `period` bars were seen
+        """
+        change = close - self.last_close
+        up = change if change > 0 else 0.0
+        down = -change if change < 0 else 0.0
+        self.last_close = close
+
+        if self.count == 0:
+            self.up, self.down = up, down
+        else:
+            self.weight *= self.decay
+            if self.up != up:
+                self.up = (self.weight * self.up + up) / (self.weight + 1.0)
+            if self.down != down:
+                self.down = (self.weight * self.down + down) / (self.weight + 1.0)
+            self.weight += 1.0
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self) -> float:
+        """Current RSI, NaN until `period` bars were seen"""
+        if self.count < self.period:
+            return np.nan
+        if self.down == 0:
+            return 100.0
+        if self.up == 0:
+            return 0.0
+        return 100 - (100 / (1 + self.up / self.down))
+
 def calculate_bollinger_bands(
     df: pd.DataFrame,
     period: int = 20,
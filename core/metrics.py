@@ -0,0 +1,170 @@
+"""
+Vectorized performance metrics.
+
+This module computes the metrics of a backtest from columnar trade and
+equity arrays with numpy: trade statistics, risk-adjusted returns of the
+daily equity, drawdown depth and duration, and per-timeframe and per-side
+breakdowns. It is cheap enough to run on every sweep point.
+"""
+
+import numpy as np
+from typing import Dict, Optional
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def trade_metrics(profit: np.ndarray) -> Dict[str, float]:
+    """
+    Statistics of a set of trade PnLs.
+
+    Args:
+        profit: PnL of every trade
+
+    Returns:
+        Dict[str, float]: Counts, win rate, profit factor, totals and expectancy
+    """
+    profit = np.asarray(profit, dtype=float)
+    wins = profit > 0
+    losses = profit < 0
+    total_profit = float(profit[wins].sum())
+    total_loss = abs(float(profit[losses].sum()))
+    n = len(profit)
+    n_wins = int(wins.sum())
+    n_losses = int(losses.sum())
+    return {
+        'total_trades': n,
+        'winning_trades': n_wins,
+        'losing_trades': n_losses,
+        'win_rate': n_wins / n if n > 0 else 0,
+        'profit_factor': total_profit / total_loss if total_loss > 0 else float('inf'),
+        'total_profit': total_profit,
+        'total_loss': total_loss,
+        'net_profit': total_profit - total_loss,
+        'expectancy': float(profit.mean()) if n > 0 else 0.0,
+        'average_win': total_profit / n_wins if n_wins > 0 else 0.0,
+        'average_loss': total_loss / n_losses if n_losses > 0 else 0.0
+    }
+
+
+def equity_metrics(times: np.ndarray, balance: np.ndarray, initial_balance: float) -> Dict[str, float]:
+    """
+    Risk metrics of an equity curve.
+
+    Sharpe and Sortino are annualized from the returns between the last
+    points of consecutive days, Calmar is the compound annual growth rate
+    over the max drawdown, and the drawdown duration is the longest time
+    spent below a previous peak.
+
+    Args:
+        times: Time of every equity point
+        balance: Balance (or equity) at every point
+        initial_balance: Starting balance
+
+    Returns:
+        Dict[str, float]: sharpe_ratio, sortino_ratio, calmar_ratio, cagr,
+            max_drawdown, max_drawdown_duration_days
+    """
+    result = {
+        'sharpe_ratio': 0.0,
+        'sortino_ratio': 0.0,
+        'calmar_ratio': 0.0,
+        'cagr': 0.0,
+        'max_drawdown': 0.0,
+        'max_drawdown_duration_days': 0.0
+    }
+    times = np.asarray(times, dtype='datetime64[ns]')
+    balance = np.asarray(balance, dtype=float)
+    if len(balance) == 0:
+        return result
+
+    # Drawdown depth and time under water
+    peak = np.maximum.accumulate(np.maximum(balance, initial_balance))
+    drawdown = np.where(peak > 0, (peak - balance) / peak, 0)
+    at_peak = balance >= peak
+    last_peak = np.maximum.accumulate(np.where(at_peak, np.arange(len(balance)), 0))
+    under_water = np.where(at_peak, np.timedelta64(0, 'ns'), times - times[last_peak])
+    result['max_drawdown'] = float(drawdown.max())
+    result['max_drawdown_duration_days'] = float(under_water.max() / np.timedelta64(1, 'D'))
+
+    # Daily returns from the last point of every day
+    days = times.astype('datetime64[D]')
+    day_end = np.append(np.flatnonzero(days[1:] != days[:-1]), len(days) - 1)
+    daily = np.concatenate([[initial_balance], balance[day_end]])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(daily) / daily[:-1]
+    returns = returns[np.isfinite(returns)]
+    if len(returns) > 1:
+        mean = returns.mean()
+        std = returns.std(ddof=1)
+        downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2))
+        scale = np.sqrt(TRADING_DAYS_PER_YEAR)
+        result['sharpe_ratio'] = float(mean / std * scale) if std > 0 else 0.0
+        result['sortino_ratio'] = float(mean / downside * scale) if downside > 0 else 0.0
+
+    years = (times[-1] - times[0]) / np.timedelta64(1, 'D') / 365.25
+    if years > 0 and balance[-1] > 0 and initial_balance > 0:
+        result['cagr'] = float((balance[-1] / initial_balance) ** (1 / years) - 1)
+    if result['max_drawdown'] > 0:
+        result['calmar_ratio'] = result['cagr'] / result['max_drawdown']
+    return result
+
+
+def breakdown(profit: np.ndarray, groups: np.ndarray, prefix: str) -> Dict[str, float]:
+    """
+    Trades, win rate, profit factor and net profit per group, flattened as
+    '<prefix>_<group>_<metric>' keys.
+
+    Args:
+        profit: PnL of every trade
+        groups: Group label of every trade, e.g. its timeframe or side
+        prefix: Key prefix, e.g. 'tf' or 'side'
+    """
+    profit = np.asarray(profit, dtype=float)
+    labels, index = np.unique(np.asarray(groups).astype(str), return_inverse=True)
+    index = np.asarray(index).ravel()
+    k = len(labels)
+    count = np.bincount(index, minlength=k)
+    wins = np.bincount(index, weights=profit > 0, minlength=k)
+    gross_profit = np.bincount(index, weights=np.where(profit > 0, profit, 0), minlength=k)
+    gross_loss = np.abs(np.bincount(index, weights=np.where(profit < 0, profit, 0), minlength=k))
+
+    result = {}
+    for j, label in enumerate(labels):
+        key = f"{prefix}_{label}"
+        result[f"{key}_trades"] = int(count[j])
+        result[f"{key}_win_rate"] = float(wins[j] / count[j]) if count[j] else 0.0
+        result[f"{key}_profit_factor"] = float(gross_profit[j] / gross_loss[j]) if gross_loss[j] > 0 else float('inf')
+        result[f"{key}_net_profit"] = float(gross_profit[j] - gross_loss[j])
+    return result
+
+
+def compute_metrics(
+    profit: np.ndarray,
+    equity_times: np.ndarray,
+    equity_balance: np.ndarray,
+    initial_balance: float,
+    sides: Optional[np.ndarray] = None,
+    timeframes: Optional[np.ndarray] = None
+) -> Dict[str, float]:
+    """
+    Full metrics suite of a backtest.
+
+    Args:
+        profit: PnL of every closed trade
+        equity_times: Time of every equity point
+        equity_balance: Balance at every equity point
+        initial_balance: Starting balance
+        sides: Optional 'BUY'/'SELL' of every trade, for the per-side breakdown
+        timeframes: Optional signal timeframe of every trade, for the
+            per-timeframe breakdown
+
+    Returns:
+        Dict[str, float]: Flat dictionary of metrics
+    """
+    metrics = trade_metrics(profit)
+    metrics.update(equity_metrics(equity_times, equity_balance, initial_balance))
+    if sides is not None and len(profit):
+        metrics.update(breakdown(profit, sides, 'side'))
+    if timeframes is not None and len(profit):
+        metrics.update(breakdown(profit, timeframes, 'tf'))
+    return metrics
@@ -0,0 +1,140 @@
+"""
+Monte Carlo robustness analysis of backtest trades.
+
+This module reorders ('shuffle') or resamples with replacement ('bootstrap')
+the PnL sequence of a backtest many times and reports the distributions of
+max drawdown and final balance, and the risk of ruin. Paths are generated in
+(paths x trades) numpy blocks, and blocks are spread over a process pool
+with independent random streams.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional, Sequence
+
+# Upper bound of (paths x trades) elements simulated in one array block
+BLOCK_ELEMENTS = 4_000_000
+
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+
+def simulate_paths(
+    profits: np.ndarray,
+    n_paths: int,
+    initial_balance: float,
+    ruin_balance: float,
+    method: str = 'shuffle',
+    rng: Optional[np.random.Generator] = None
+) -> dict:
+    """
+    Simulate equity paths from a trade PnL sequence.
+
+    Args:
+        profits: PnL of every trade, in account currency
+        n_paths: Number of paths
+        initial_balance: Starting balance
+        ruin_balance: A path is ruined once its balance falls to this level
+        method: 'shuffle' (permutation) or 'bootstrap' (with replacement)
+        rng: Random generator
+
+    Returns:
+        dict: 'max_drawdown', 'final_balance' and 'ruined' arrays, one value per path
+    """
+    if method not in ('shuffle', 'bootstrap'):
+        raise ValueError(f"Unknown Monte Carlo method: {method}")
+    rng = rng or np.random.default_rng()
+    profits = np.asarray(profits, dtype=float)
+    n_trades = len(profits)
+
+    max_drawdown = np.zeros(n_paths)
+    final_balance = np.full(n_paths, float(initial_balance))
+    ruined = np.zeros(n_paths, dtype=bool)
+    if n_trades == 0:
+        return {'max_drawdown': max_drawdown, 'final_balance': final_balance, 'ruined': ruined}
+
+    block = max(1, BLOCK_ELEMENTS // n_trades)
+    for a in range(0, n_paths, block):
+        b = min(a + block, n_paths)
+        if method == 'shuffle':
+            index = rng.permuted(np.broadcast_to(np.arange(n_trades), (b - a, n_trades)), axis=1)
+        else:
+            index = rng.integers(0, n_trades, size=(b - a, n_trades))
+
+        balance = initial_balance + np.cumsum(profits[index], axis=1)
+        peak = np.maximum.accumulate(np.maximum(balance, initial_balance), axis=1)
+        drawdown = np.where(peak > 0, (peak - balance) / peak, 0)
+
+        max_drawdown[a:b] = drawdown.max(axis=1)
+        final_balance[a:b] = balance[:, -1]
+        ruined[a:b] = balance.min(axis=1) <= ruin_balance
+
+    return {'max_drawdown': max_drawdown, 'final_balance': final_balance, 'ruined': ruined}
+
+
+def _simulate_chunk(profits, n_paths, initial_balance, ruin_balance, method, seed):
+    """Process pool task: one chunk of paths with its own random stream"""
+    return simulate_paths(profits, n_paths, initial_balance, ruin_balance, method, np.random.default_rng(seed))
+
+
+def run_monte_carlo(
+    profits: Sequence[float],
+    initial_balance: float,
+    n_paths: int = 20000,
+    methods: Iterable[str] = ('shuffle', 'bootstrap'),
+    ruin_fraction: float = 0.5,
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = None
+) -> dict:
+    """
+    Monte Carlo analysis of a trade PnL sequence, parallelized across cores.
+
+    Args:
+        profits: PnL of every trade in execution order
+        initial_balance: Starting balance
+        n_paths: Number of paths per method
+        methods: Resampling methods to run, 'shuffle' and/or 'bootstrap'
+        ruin_fraction: Fraction of the initial balance lost that counts as ruin
+        seed: Seed of the root random sequence, None for a random run
+        max_workers: Worker processes, defaults to the CPU count
+
+    Returns:
+        dict: 'summary' DataFrame with one row per method and the raw
+            per-path arrays under 'paths'
+    """
+    profits = np.asarray(profits, dtype=float)
+    ruin_balance = initial_balance * (1 - ruin_fraction)
+    methods = list(methods)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # One chunk per worker and method, each with an independent stream
+    chunks = np.array_split(np.arange(n_paths), max_workers)
+    chunk_sizes = [len(c) for c in chunks if len(c)]
+    streams = iter(np.random.SeedSequence(seed).spawn(len(methods) * len(chunk_sizes)))
+
+    paths = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            method: [
+                executor.submit(_simulate_chunk, profits, size, initial_balance, ruin_balance, method, next(streams))
+                for size in chunk_sizes
+            ]
+            for method in methods
+        }
+        for method, parts in futures.items():
+            parts = [f.result() for f in parts]
+            paths[method] = {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+    rows = []
+    for method, result in paths.items():
+        row = {'method': method, 'paths': n_paths, 'trades': len(profits)}
+        for key in ('max_drawdown', 'final_balance'):
+            row[f'{key}_mean'] = result[key].mean()
+            for q, value in zip(PERCENTILES, np.percentile(result[key], PERCENTILES)):
+                row[f'{key}_p{q}'] = value
+        row['risk_of_ruin'] = result['ruined'].mean()
+        row['probability_of_loss'] = (result['final_balance'] < initial_balance).mean()
+        rows.append(row)
+
+    return {'summary': pd.DataFrame(rows), 'paths': paths}
@@ -0,0 +1,263 @@
+"""
+Evolutionary parameter optimization with resumable on-disk studies.
+
+The search space maps dotted strategy parameter paths (see core.param_grid)
+to either a list of choices or a numeric range {'low', 'high', 'step'}.
+GeneticOptimizer is a steady-state genetic algorithm with an ask/tell
+interface: every finished trial immediately updates the population, so a
+pool of workers is kept busy without waiting for generations. Study appends
+one JSON line per finished trial, so an interrupted optimization resumes
+from its file.
+"""
+
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional
+
+# Trial states
+COMPLETE = 'complete'
+PRUNED = 'pruned'
+FAILED = 'failed'
+
+# Attempts at proposing parameters that were not evaluated yet
+MAX_PROPOSALS = 50
+
+
+class SearchSpace:
+    """
+    Parameter space of an optimization.
+    """
+
+    def __init__(self, space: Dict[str, Any]):
+        """
+        Args:
+            space: Dictionary of dotted parameter path to a list of choices or
+                {'low', 'high', 'step'}; a range is integer when low, high
+                and step are integers
+        """
+        self.space = space
+        self.names = list(space)
+        for name, spec in space.items():
+            if isinstance(spec, dict):
+                if spec['high'] < spec['low']:
+                    raise ValueError(f"Empty range for {name}")
+            elif not spec:
+                raise ValueError(f"No choices for {name}")
+
+    def is_choice(self, name: str) -> bool:
+        """Whether a parameter is a list of choices rather than a range"""
+        return not isinstance(self.space[name], dict)
+
+    def _snap(self, name: str, value: float):
+        """Clip a numeric value to its range and round it to the step"""
+        spec = self.space[name]
+        value = min(max(value, spec['low']), spec['high'])
+        step = spec.get('step')
+        integer = all(isinstance(spec.get(k, 1), int) for k in ('low', 'high', 'step'))
+        if step:
+            value = spec['low'] + round((value - spec['low']) / step) * step
+            value = min(value, spec['high'])
+        if integer:
+            return int(round(value))
+        return round(float(value), 10)
+
+    def sample(self, rng: np.random.Generator) -> Dict[str, Any]:
+        """Uniformly random parameters"""
+        params = {}
+        for name in self.names:
+            spec = self.space[name]
+            if self.is_choice(name):
+                params[name] = spec[int(rng.integers(len(spec)))]
+            else:
+                params[name] = self._snap(name, rng.uniform(spec['low'], spec['high']))
+        return params
+
+    def mutate(self, name: str, value, scale: float, rng: np.random.Generator):
+        """Random neighbour of one parameter value"""
+        spec = self.space[name]
+        if self.is_choice(name):
+            return spec[int(rng.integers(len(spec)))]
+        width = spec['high'] - spec['low']
+        mutated = self._snap(name, value + rng.normal(0, scale * width))
+        if mutated == value and width > 0:
+            # Move by at least one step so integer parameters do not stall
+            step = spec.get('step') or (1 if isinstance(value, int) else scale * width)
+            mutated = self._snap(name, value + step * (1 if rng.random() < 0.5 else -1))
+        return mutated
+
+    def key(self, params: Dict[str, Any]) -> str:
+        """Hashable identity of a parameter set"""
+        return json.dumps([params[name] for name in self.names])
+
+
+class GeneticOptimizer:
+    """
+    Steady-state genetic algorithm.
+
+    The population is the best `population` scored trials; complete trials
+    rank above pruned ones, which are ranked by the objective of their
+    partial run. A proposal is a uniform crossover of two tournament-selected
+    parents followed by per-parameter mutation; until the population is
+    full, proposals are random samples.
+    """
+
+    def __init__(self, space: SearchSpace, population: int = 20, mutation_rate: Optional[float] = None,
+                 mutation_scale: float = 0.1, tournament: int = 3, maximize: bool = True,
+                 rng: Optional[np.random.Generator] = None):
+        """
+        Args:
+            space: SearchSpace to optimize over
+            population: Number of best trials bred from
+            mutation_rate: Probability to mutate each parameter, defaults to
+                1 / number of parameters
+            mutation_scale: Standard deviation of numeric mutations as a
+                fraction of the range width
+            tournament: Candidates per parent selection
+            maximize: Maximize the objective, minimize when False
+            rng: Random generator
+        """
+        self.space = space
+        self.population = population
+        self.mutation_rate = mutation_rate if mutation_rate is not None else 1 / max(len(space.names), 1)
+        self.mutation_scale = mutation_scale
+        self.tournament = tournament
+        self.sign = 1 if maximize else -1
+        self.rng = rng or np.random.default_rng()
+        self.scored = []  # (complete, signed value, params), best first
+        self.seen = set()
+
+    def tell(self, params: Dict[str, Any], value: Optional[float], pruned: bool = False):
+        """
+        Record a finished trial.
+
+        Args:
+            params: Parameters of the trial
+            value: Objective value, None for failed trials
+            pruned: Whether value is the objective of a run stopped early;
+                pruned trials rank below every complete trial
+        """
+        self.seen.add(self.space.key(params))
+        if value is not None and np.isfinite(value):
+            self.scored.append((not pruned, self.sign * value, params))
+            self.scored.sort(key=lambda item: item[:2], reverse=True)
+            del self.scored[self.population:]
+
+    def mark_pending(self, params: Dict[str, Any]):
+        """Reserve parameters being evaluated so they are not proposed again"""
+        self.seen.add(self.space.key(params))
+
+    def ask(self) -> Dict[str, Any]:
+        """Parameters of the next trial"""
+        for _ in range(MAX_PROPOSALS):
+            if len(self.scored) < self.population:
+                params = self.space.sample(self.rng)
+            else:
+                params = self._breed()
+            if self.space.key(params) not in self.seen:
+                return params
+        return self.space.sample(self.rng)
+
+    def _select(self) -> Dict[str, Any]:
+        """Tournament selection from the population"""
+        picks = self.rng.integers(len(self.scored), size=self.tournament)
+        return self.scored[int(picks.min())][2]
+
+    def _breed(self) -> Dict[str, Any]:
+        """Mutated crossover of two selected parents"""
+        first, second = self._select(), self._select()
+        child = {}
+        for name in self.space.names:
+            value = first[name] if self.rng.random() < 0.5 else second[name]
+            if self.rng.random() < self.mutation_rate:
+                value = self.space.mutate(name, value, self.mutation_scale, self.rng)
+            child[name] = value
+        return child
+
+
+class Study:
+    """
+    Append-only JSON lines record of an optimization.
+
+    The first line describes the study (objective and space); every further
+    line is one finished trial. A line cut short by an interruption is
+    ignored on load.
+    """
+
+    def __init__(self, path: str, space: Dict[str, Any], objective: str, direction: str = 'maximize'):
+        """
+        Open a study, resuming the trials of an existing file.
+
+        Args:
+            path: JSONL file of the study
+            space: Search space definition
+            objective: Metric optimized
+            direction: 'maximize' or 'minimize'
+
+        Raises:
+            ValueError: When the file belongs to a different space or objective
+        """
+        self.path = path
+        self.trials = []
+        header = {'type': 'study', 'objective': objective, 'direction': direction, 'space': space}
+
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                lines = f.read().splitlines()
+            records = []
+            truncated = False
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    truncated = True
+            stored = records[0] if records and records[0].get('type') == 'study' else None
+            if stored is None or {k: stored.get(k) for k in header} != json.loads(json.dumps(header)):
+                raise ValueError(f"Study {path} was created with a different objective or search space")
+            self.trials = [r for r in records[1:] if r.get('type') == 'trial']
+            # Drop a partially written line before appending
+            if truncated:
+                with open(path, 'w') as f:
+                    f.write('\n'.join(json.dumps(r) for r in records) + '\n')
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(json.dumps(header) + '\n')
+
+    def add(self, params: Dict[str, Any], state: str, value: Optional[float], metrics: dict,
+            elapsed: float) -> dict:
+        """Append one finished trial to the file"""
+        trial = {
+            'type': 'trial',
+            'number': len(self.trials),
+            'params': params,
+            'state': state,
+            'value': value,
+            'metrics': metrics,
+            'elapsed': elapsed,
+            'finished': time.time()
+        }
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(trial, default=float) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.trials.append(trial)
+        return trial
+
+    def table(self) -> pd.DataFrame:
+        """One row per trial: number, state, value (partial for pruned trials) and parameters"""
+        rows = [
+            {'number': t['number'], 'state': t['state'], 'value': t['value'], **t['params']}
+            for t in self.trials
+        ]
+        return pd.DataFrame(rows)
+
+    def best(self, maximize: bool = True) -> Optional[dict]:
+        """Best complete trial"""
+        complete = [t for t in self.trials if t['state'] == COMPLETE and t['value'] is not None]
+        if not complete:
+            return None
+        return (max if maximize else min)(complete, key=lambda t: t['value'])
+
@@ -0,0 +1,56 @@
+"""
+Parameter grids for strategy optimization.
+
+Grid keys are dotted paths into the 'parameters' section of a strategy
+config, e.g. 'rsi_levels.short.overbought' or
+'risk_management.stop_loss_pips'.
+"""
+
+import copy
+import itertools
+from typing import Any, Dict, List
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Expand a grid into the list of all parameter combinations.
+
+    Args:
+        grid: Dictionary of dotted parameter path to candidate values
+
+    Returns:
+        List[Dict[str, Any]]: One {path: value} dict per combination
+    """
+    keys = list(grid.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def apply_params(strategy_config: dict, params: Dict[str, Any]) -> dict:
+    """
+    Return a copy of a strategy config with dotted-path parameters replaced.
+
+    Args:
+        strategy_config: Strategy config as loaded from config/strategies
+        params: Dictionary of dotted parameter path to value
+
+    Returns:
+        dict: New strategy config, the input is left untouched
+    """
+    config = copy.deepcopy(strategy_config)
+    for path, value in params.items():
+        node = config['parameters']
+        keys = path.split('.')
+        for key in keys[:-1]:
+            node = node[key]
+        if keys[-1] not in node:
+            raise KeyError(f"Unknown strategy parameter: {path}")
+        node[keys[-1]] = value
+    return config
+
+
+def get_param(strategy_config: dict, path: str) -> Any:
+    """Read a dotted-path parameter from a strategy config"""
+    node = strategy_config['parameters']
+    for key in path.split('.'):
+        node = node[key]
+    return node
@@ -0,0 +1,96 @@
+"""
+Range-extrema index.
+
+This module provides a sparse table of range maxima of highs and range
+minima of lows, used to find the first bar that crosses a price level with
+binary lifting in O(log n) per query instead of scanning bars forward.
+"""
+
+import numpy as np
+
+
+class RangeExtremaIndex:
+    """
+    Sparse table over the highs and lows of one timeframe.
+
+    Level k stores, for every bar j, the max(high) and min(low) of the bars
+    [j, j + 2**k). Building takes O(n log n) time and memory, every range
+    query is O(1) and every first-crossing query is O(log n).
+    """
+
+    def __init__(self, highs: np.ndarray, lows: np.ndarray):
+        """
+        Build the index.
+
+        Args:
+            highs: Bar highs
+            lows: Bar lows
+        """
+        highs = np.asarray(highs, dtype=float)
+        lows = np.asarray(lows, dtype=float)
+        self.size = len(highs)
+        levels = max(int(self.size).bit_length(), 1)
+
+        # Rows past the end of the series are padded so they never match
+        self.max_table = np.full((levels, self.size), -np.inf)
+        self.min_table = np.full((levels, self.size), np.inf)
+        self.max_table[0] = highs
+        self.min_table[0] = lows
+        for k in range(1, levels):
+            half = 1 << (k - 1)
+            width = self.size - (1 << k) + 1
+            self.max_table[k, :width] = np.maximum(self.max_table[k - 1, :width], self.max_table[k - 1, half:half + width])
+            self.min_table[k, :width] = np.minimum(self.min_table[k - 1, :width], self.min_table[k - 1, half:half + width])
+
+    def range_max(self, start, stop) -> np.ndarray:
+        """max(high) over bars [start, stop), stop > start"""
+        k, start, stop = self._levels(start, stop)
+        return np.maximum(self.max_table[k, start], self.max_table[k, stop - (1 << k)])
+
+    def range_min(self, start, stop) -> np.ndarray:
+        """min(low) over bars [start, stop), stop > start"""
+        k, start, stop = self._levels(start, stop)
+        return np.minimum(self.min_table[k, start], self.min_table[k, stop - (1 << k)])
+
+    @staticmethod
+    def _levels(start, stop):
+        start = np.asarray(start, dtype=np.int64)
+        stop = np.asarray(stop, dtype=np.int64)
+        k = np.floor(np.log2(stop - start)).astype(np.int64)
+        return k, start, stop
+
+    def first_high_at_or_above(self, start, stop, level) -> np.ndarray:
+        """
+        Index of the first bar in [start, stop) whose high is >= level.
+
+        All arguments broadcast, the lifting runs vectorized over queries.
+        Queries without a crossing return stop.
+        """
+        return self._first_crossing(self.max_table, start, stop, level, above=True)
+
+    def first_low_at_or_below(self, start, stop, level) -> np.ndarray:
+        """
+        Index of the first bar in [start, stop) whose low is <= level.
+
+        Queries without a crossing return stop.
+        """
+        return self._first_crossing(self.min_table, start, stop, level, above=False)
+
+    def _first_crossing(self, table, start, stop, level, above: bool) -> np.ndarray:
+        start, stop, level = np.broadcast_arrays(
+            np.asarray(start, dtype=np.int64),
+            np.asarray(stop, dtype=np.int64),
+            np.asarray(level, dtype=float)
+        )
+        pos = start.copy()
+        stop = np.minimum(stop, self.size)
+
+        # Skip the largest blocks that contain no crossing, largest first
+        for k in range(table.shape[0] - 1, -1, -1):
+            block = 1 << k
+            fits = pos + block <= stop
+            values = table[k, np.where(fits, pos, 0)]
+            clear = values < level if above else values > level
+            pos = np.where(fits & clear, pos + block, pos)
+
+        return np.minimum(pos, stop)
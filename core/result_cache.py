@@ -0,0 +1,224 @@
+"""
+Content-addressed cache of backtest results.
+
+Results are stored under a key hashing the market data, the merged configs
+and the engine version, so an identical rerun or a repeated sweep point is
+read back instead of simulated. The cache is bounded in size and evicts the
+least recently used runs first.
+
+Usage:
+    python -m core.result_cache list
+    python -m core.result_cache purge [--older-than DAYS]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+import uuid
+import weakref
+import pandas as pd
+from typing import Dict, Optional
+
+from core.feature_cache import data_fingerprint
+
+# Columns that determine a backtest outcome
+FINGERPRINT_COLUMNS = ('open', 'high', 'low', 'close')
+
+
+class ResultCache:
+    """
+    Size-bounded on-disk cache of backtest results.
+
+    Every run is a directory holding results.pkl and meta.json. Entries are
+    written to a temporary directory and renamed into place, so pool workers
+    can share one cache directory.
+    """
+
+    def __init__(self, directory: str = 'backtest/cache', max_bytes: int = 512 * 2**20,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Cache directory
+            max_bytes: Upper bound of the total size of cached runs
+            logger: Optional logger instance
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.logger = logger or logging.getLogger(__name__)
+        self._fingerprints = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _fingerprint(self, df: pd.DataFrame) -> str:
+        """Fingerprint of df, hashed once per DataFrame object"""
+        entry = self._fingerprints.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        fp = data_fingerprint(df, FINGERPRINT_COLUMNS)
+        self._fingerprints = {k: v for k, v in self._fingerprints.items() if v[0]() is not None}
+        self._fingerprints[id(df)] = (weakref.ref(df), fp)
+        return fp
+
+    def key(self, data: Dict[str, pd.DataFrame], config: dict, engine_version) -> str:
+        """
+        Cache key of a run.
+
+        Args:
+            data: Dictionary of timeframe name to OHLC DataFrame
+            config: Everything else the run depends on (merged configs,
+                symbol spec, range), JSON serializable
+            engine_version: Version of the backtest engine
+
+        Returns:
+            str: Hex key
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(str(engine_version).encode())
+        for tf in sorted(data):
+            digest.update(tf.encode())
+            digest.update(self._fingerprint(data[tf]).encode())
+        digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Cached results of a key, None on a miss"""
+        path = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(path, 'results.pkl'), 'rb') as f:
+                results = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Dropping unreadable cached run {key}: {str(e)}")
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+        self._touch(path)
+        return results
+
+    def put(self, key: str, results: dict, description: str = ''):
+        """Store the results of a run and evict old runs beyond max_bytes"""
+        path = os.path.join(self.directory, key)
+        tmp = os.path.join(self.directory, f".tmp-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(tmp)
+            with open(os.path.join(tmp, 'results.pkl'), 'wb') as f:
+                pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(os.path.join(tmp, 'results.pkl'))
+            now = time.time()
+            with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+                json.dump({
+                    'created': now,
+                    'accessed': now,
+                    'size': size,
+                    'description': description,
+                    'metrics': results.get('metrics', {})
+                }, f, indent=4, default=float)
+            os.replace(tmp, path)
+        except OSError as e:
+            # Another process stored the same run first
+            self.logger.debug(f"Cache store skipped for {key}: {str(e)}")
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self.evict()
+
+    def _touch(self, path: str):
+        """Record an access for LRU eviction"""
+        meta_path = os.path.join(path, 'meta.json')
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            meta['accessed'] = time.time()
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f, indent=4)
+        except (OSError, ValueError):
+            pass
+
+    def entries(self) -> pd.DataFrame:
+        """Table of cached runs, most recently used first"""
+        rows = []
+        for key in os.listdir(self.directory):
+            if key.startswith('.'):
+                continue
+            try:
+                with open(os.path.join(self.directory, key, 'meta.json'), 'r') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            rows.append({
+                'key': key,
+                'size': meta['size'],
+                'created': pd.Timestamp(meta['created'], unit='s'),
+                'accessed': pd.Timestamp(meta['accessed'], unit='s'),
+                'description': meta.get('description', ''),
+                'total_trades': meta.get('metrics', {}).get('total_trades')
+            })
+        table = pd.DataFrame(rows, columns=['key', 'size', 'created', 'accessed', 'description', 'total_trades'])
+        return table.sort_values('accessed', ascending=False).reset_index(drop=True)
+
+    def evict(self):
+        """Remove least recently used runs until the cache fits max_bytes"""
+        table = self.entries()
+        total = table['size'].sum()
+        for _, row in table.iloc[::-1].iterrows():
+            if total <= self.max_bytes:
+                break
+            self.remove(row['key'])
+            total -= row['size']
+
+    def remove(self, key: str):
+        """Remove one cached run"""
+        shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+        self.logger.debug(f"Evicted cached run {key}")
+
+    def purge(self, older_than: Optional[float] = None) -> int:
+        """
+        Remove cached runs.
+
+        Args:
+            older_than: Only remove runs not used for this many days,
+                None to remove everything
+
+        Returns:
+            int: Number of removed runs
+        """
+        table = self.entries()
+        if older_than is not None:
+            table = table[table['accessed'] < pd.Timestamp(time.time() - older_than * 86400, unit='s')]
+        for key in table['key']:
+            self.remove(key)
+        return len(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest result cache')
+    parser.add_argument('command', choices=['list', 'purge'])
+    parser.add_argument('--dir', default=None, help='Cache directory, defaults to backtest.result_cache.directory')
+    parser.add_argument('--older-than', type=float, default=None, help='purge: only runs unused for DAYS days')
+    args = parser.parse_args()
+
+    directory = args.dir
+    if directory is None:
+        with open('config/config.json', 'r') as f:
+            config = json.load(f)
+        directory = config['backtest'].get('result_cache', {}).get('directory', 'backtest/cache')
+    cache = ResultCache(directory)
+
+    if args.command == 'list':
+        table = cache.entries()
+        if table.empty:
+            print("Cache is empty")
+        else:
+            print(table.to_string(index=False))
+            print(f"{len(table)} runs, {table['size'].sum() / 2**20:.1f} MB")
+    else:
+        print(f"Removed {cache.purge(args.older_than)} cached runs")
+
+
+if __name__ == "__main__":
+    main()
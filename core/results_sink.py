@@ -0,0 +1,212 @@
+"""
+Streaming backtest results.
+
+This module writes trades and equity points in batches to an append-friendly
+columnar layout: one directory per table holding a schema.json and one raw
+binary file per column. Appending a batch only appends bytes to each column
+file, so a run's memory stays bounded by the batch size however long the
+backtest is, and read_columns() loads the table back with numpy.fromfile.
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+TRADE_COLUMNS = {
+    'order_id': 'U36',
+    'time': 'datetime64[ns]',
+    'type': 'U4',
+    'price': 'f8',
+    'volume': 'f8',
+    'sl': 'f8',
+    'tp': 'f8',
+    'leverage': 'f8',
+    'timeframe': 'U3',
+    'exit_price': 'f8',
+    'exit_time': 'datetime64[ns]',
+    'exit_type': 'U7',
+    'profit': 'f8'
+}
+
+EQUITY_COLUMNS = {
+    'time': 'datetime64[ns]',
+    'balance': 'f8'
+}
+
+
+class ColumnarWriter:
+    """
+    Batched writer of one table as per-column binary append files.
+    """
+
+    def __init__(self, path: str, columns: Dict[str, str], batch_rows: int = 10000):
+        """
+        Initialize the writer, appending to an existing table with the same schema.
+
+        Args:
+            path: Directory of the table
+            columns: Column name to numpy dtype string
+            batch_rows: Buffered rows before a flush
+        """
+        self.path = path
+        self.columns = columns
+        self.batch_rows = batch_rows
+        self.rows_written = 0
+        self._buffer = {name: [] for name in columns}
+
+        os.makedirs(path, exist_ok=True)
+        schema_path = os.path.join(path, 'schema.json')
+        if os.path.exists(schema_path):
+            with open(schema_path, 'r') as f:
+                schema = json.load(f)
+            if schema['columns'] != columns:
+                raise ValueError(f"Schema mismatch for {path}")
+            self.rows_written = schema['rows']
+        else:
+            self._write_schema()
+
+    def _write_schema(self):
+        with open(os.path.join(self.path, 'schema.json'), 'w') as f:
+            json.dump({'columns': self.columns, 'rows': self.rows_written}, f, indent=4)
+
+    def append(self, row: dict):
+        """Buffer one row, flushing when the batch is full. Missing keys are left empty."""
+        for name in self.columns:
+            self._buffer[name].append(row.get(name))
+        if len(self._buffer[next(iter(self.columns))]) >= self.batch_rows:
+            self.flush()
+
+    def append_arrays(self, **arrays):
+        """Write equally long column arrays directly, after the buffered rows"""
+        self.flush()
+        self._write({name: arrays[name] for name in self.columns})
+
+    def flush(self):
+        """Write the buffered rows"""
+        if not self._buffer[next(iter(self.columns))]:
+            return
+        self._write(self._buffer)
+        self._buffer = {name: [] for name in self.columns}
+
+    def _write(self, columns: dict):
+        n = None
+        for name, dtype in self.columns.items():
+            values = columns[name]
+            if dtype.startswith('datetime64'):
+                values = [np.datetime64('NaT') if v is None else v for v in values] if isinstance(values, list) else values
+            elif dtype.startswith('U'):
+                values = ['' if v is None else str(v) for v in values]
+            elif isinstance(values, list):
+                values = [np.nan if v is None else v for v in values]
+            array = np.asarray(values, dtype=dtype)
+            n = len(array)
+            with open(os.path.join(self.path, f'{name}.bin'), 'ab') as f:
+                array.tofile(f)
+        self.rows_written += n or 0
+        self._write_schema()
+
+
+def read_columns(path: str) -> pd.DataFrame:
+    """
+    Load a table written by ColumnarWriter.
+
+    Args:
+        path: Directory of the table
+
+    Returns:
+        pd.DataFrame: All rows of the table
+    """
+    with open(os.path.join(path, 'schema.json'), 'r') as f:
+        schema = json.load(f)
+    return pd.DataFrame({
+        name: np.fromfile(os.path.join(path, f'{name}.bin'), dtype=dtype, count=schema['rows'])
+        for name, dtype in schema['columns'].items()
+    })
+
+
+class ResultsSink:
+    """
+    Streaming destination of a backtest's trades and equity curve, keeping
+    the running trade totals needed by Backtest.calculate_metrics.
+    """
+
+    def __init__(self, directory: str, batch_rows: int = 10000):
+        """
+        Args:
+            directory: Output directory, holding 'trades' and 'equity' tables
+            batch_rows: Buffered rows per table before a flush
+        """
+        self.directory = directory
+        self.trades = ColumnarWriter(os.path.join(directory, 'trades'), TRADE_COLUMNS, batch_rows)
+        self.equity = ColumnarWriter(os.path.join(directory, 'equity'), EQUITY_COLUMNS, batch_rows)
+        self.stats = {
+            'total_trades': 0,
+            'winning_trades': 0,
+            'losing_trades': 0,
+            'total_profit': 0,
+            'total_loss': 0
+        }
+
+    def write_trade(self, trade: dict):
+        """Stream one closed trade"""
+        self.trades.append(trade)
+        profit = trade['profit']
+        self.stats['total_trades'] += 1
+        if profit > 0:
+            self.stats['winning_trades'] += 1
+            self.stats['total_profit'] += profit
+        elif profit < 0:
+            self.stats['losing_trades'] += 1
+            self.stats['total_loss'] += -profit
+
+    def close(self):
+        """Flush every buffered row"""
+        self.trades.flush()
+        self.equity.flush()
+
+
+class EquityBuffer:
+    """
+    Preallocated equity curve of (time, balance) points.
+
+    Without a sink it holds the whole curve in two numpy arrays. With a sink
+    the arrays are a fixed-size batch that is written out when full.
+    """
+
+    def __init__(self, capacity: int, sink: Optional[ResultsSink] = None):
+        """
+        Args:
+            capacity: Number of points held, the run length without a sink
+            sink: Optional ResultsSink receiving full batches
+        """
+        self.sink = sink
+        if sink is not None:
+            capacity = min(capacity, sink.equity.batch_rows)
+        self.times = np.empty(max(capacity, 1), dtype='datetime64[ns]')
+        self.balances = np.empty(max(capacity, 1))
+        self.size = 0
+
+    def append(self, time, balance: float):
+        """Record the balance at a step"""
+        if self.size == len(self.times):
+            if self.sink is None:
+                # Only reached when the capacity was underestimated
+                self.times = np.concatenate([self.times, np.empty_like(self.times)])
+                self.balances = np.concatenate([self.balances, np.empty_like(self.balances)])
+            else:
+                self.flush()
+        self.times[self.size] = np.datetime64(time, 'ns')
+        self.balances[self.size] = balance
+        self.size += 1
+
+    def flush(self):
+        """Write the held points to the sink and start a new batch"""
+        if self.sink is not None and self.size:
+            self.sink.equity.append_arrays(time=self.times[:self.size], balance=self.balances[:self.size])
+            self.size = 0
+
+    def frame(self) -> pd.DataFrame:
+        """Held points as a DataFrame with 'time' and 'balance' columns"""
+        return pd.DataFrame({'time': self.times[:self.size], 'balance': self.balances[:self.size]})
@@ -16,6 +16,8 @@ class RiskManager:
         """Setup logger for risk manager"""
         logger = logging.getLogger('RiskManager')
         logger.setLevel(logging.INFO)
+        if logger.handlers:
+            return logger
         
         # Create file handler
         fh = logging.FileHandler(f'logs/risk_manager_{datetime.now().strftime("%Y%m%d")}.log')
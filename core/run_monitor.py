@@ -0,0 +1,133 @@
+"""
+Online metrics and early abort of backtest runs.
+
+RunningMetrics keeps the running balance, drawdown, PnL and trade count of
+a run as the backtest loop advances. AbortRules checks them after every step
+so hopeless parameter sets of a sweep stop early instead of being simulated
+to the end.
+"""
+
+import pandas as pd
+from typing import Optional
+
+
+class RunningMetrics:
+    """
+    Online accumulators of a backtest run.
+    """
+
+    def __init__(self, initial_balance: float, peak: Optional[float] = None, max_drawdown: float = 0):
+        """
+        Args:
+            initial_balance: Starting balance
+            peak: Balance peak so far, when resuming a run
+            max_drawdown: Max drawdown so far, when resuming a run
+        """
+        self.initial_balance = initial_balance
+        self.balance = initial_balance
+        self.peak = initial_balance if peak is None else peak
+        self.max_drawdown = max_drawdown
+        self.drawdown = 0.0
+        self.net_profit = 0.0
+        self.trades = 0
+        self.winning_trades = 0
+        self.start_time = None
+        self.time = None
+        self.trades_deadline = None
+
+    def record_trade(self, profit: float):
+        """Account one closed trade"""
+        self.trades += 1
+        self.net_profit += profit
+        if profit > 0:
+            self.winning_trades += 1
+
+    def update(self, time, balance: float):
+        """Record the balance at the end of a step"""
+        if self.start_time is None:
+            self.start_time = time
+        self.time = time
+        self.balance = balance
+        self.peak = max(self.peak, balance)
+        self.drawdown = (self.peak - balance) / self.peak if self.peak > 0 else 0
+        self.max_drawdown = max(self.max_drawdown, self.drawdown)
+
+
+class AbortRules:
+    """
+    Conditions under which a run is stopped early.
+    """
+
+    def __init__(self, max_drawdown: Optional[float] = None, min_balance: Optional[float] = None,
+                 min_trades: Optional[int] = None, min_trades_after_days: Optional[float] = None,
+                 min_trades_date: Optional[str] = None):
+        """
+        Args:
+            max_drawdown: Abort once the drawdown exceeds this fraction
+            min_balance: Abort once the balance falls to this level or below
+            min_trades: Abort when fewer trades were closed by the deadline
+            min_trades_after_days: Deadline of min_trades in days after the first step
+            min_trades_date: Absolute deadline of min_trades
+        """
+        self.max_drawdown = max_drawdown
+        self.min_balance = min_balance
+        self.min_trades = min_trades
+        self.min_trades_after = pd.Timedelta(days=min_trades_after_days) if min_trades_after_days is not None else None
+        self.min_trades_date = pd.Timestamp(min_trades_date) if min_trades_date is not None else None
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> Optional['AbortRules']:
+        """
+        Rules of a backtest.abort config section, None when disabled.
+
+        Args:
+            config: {'enabled', 'max_drawdown', 'min_balance',
+                'min_trades': {'count', 'after_days', 'date'}}
+        """
+        if not config or not config.get('enabled', False):
+            return None
+        min_trades = config.get('min_trades') or {}
+        return cls(
+            max_drawdown=config.get('max_drawdown'),
+            min_balance=config.get('min_balance'),
+            min_trades=min_trades.get('count'),
+            min_trades_after_days=min_trades.get('after_days'),
+            min_trades_date=min_trades.get('date')
+        )
+
+    def to_dict(self) -> dict:
+        """JSON serializable form, part of the result cache key"""
+        return {
+            'max_drawdown': self.max_drawdown,
+            'min_balance': self.min_balance,
+            'min_trades': self.min_trades,
+            'min_trades_after': str(self.min_trades_after),
+            'min_trades_date': str(self.min_trades_date)
+        }
+
+    def check(self, running: RunningMetrics) -> Optional[str]:
+        """
+        Reason to abort the run, None to continue.
+
+        Args:
+            running: Online metrics of the run
+        """
+        if self.max_drawdown is not None and running.drawdown > self.max_drawdown:
+            return f"drawdown {running.drawdown:.1%} above {self.max_drawdown:.1%}"
+        if self.min_balance is not None and running.balance <= self.min_balance:
+            return f"balance {running.balance:.2f} at or below {self.min_balance:.2f}"
+        if self.min_trades is not None and running.trades < self.min_trades:
+            if running.trades_deadline is None:
+                running.trades_deadline = self._trades_deadline(running)
+            if running.time >= running.trades_deadline:
+                return f"{running.trades} trades by {pd.Timestamp(running.time)}, fewer than {self.min_trades}"
+        return None
+
+    def _trades_deadline(self, running: RunningMetrics) -> pd.Timestamp:
+        """Time by which min_trades must be reached, pd.Timestamp.max without a deadline"""
+        deadlines = [pd.Timestamp.max]
+        if self.min_trades_after is not None:
+            deadlines.append(pd.Timestamp(running.start_time) + self.min_trades_after)
+        if self.min_trades_date is not None:
+            deadlines.append(self.min_trades_date)
+        return min(deadlines)
@@ -0,0 +1,147 @@
+"""
+Market data in shared memory for backtest worker processes.
+
+SharedMarketData copies the time and numeric columns of every timeframe
+once into one multiprocessing.shared_memory block per timeframe. Its
+descriptor is a small picklable dict; workers attach to the blocks by name
+and get DataFrames whose columns are views of the shared memory, so the data
+is neither copied into every worker nor parsed again.
+
+Block layout of a timeframe with n rows: the times as n int64, then the
+float columns as a (columns x n) float64 array, then the integer columns as
+a (columns x n) int64 array. Every column is contiguous.
+"""
+
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+
+class SharedMarketData:
+    """
+    Owner of the shared memory blocks of a market data dictionary.
+
+    Use as a context manager around the process pool; the blocks are
+    released on exit. Workers keep a segment mapped until they exit even
+    after the owner unlinked it.
+    """
+
+    def __init__(self, data: Dict[str, pd.DataFrame]):
+        """
+        Copy the market data into shared memory.
+
+        Args:
+            data: Dictionary of timeframe name to DataFrame with a 'time'
+                column and numeric columns
+
+        Raises:
+            ValueError: For a column that is neither numeric nor the time
+        """
+        self.blocks = {}
+        self._descriptor = {}
+        try:
+            for tf, df in data.items():
+                self._share(tf, df)
+        except Exception:
+            self.close()
+            raise
+
+    def _share(self, tf: str, df: pd.DataFrame):
+        """Copy one timeframe into a new block"""
+        float_columns, int_columns = [], []
+        for column in df.columns:
+            if column == 'time':
+                continue
+            if pd.api.types.is_float_dtype(df[column]):
+                float_columns.append(column)
+            elif pd.api.types.is_integer_dtype(df[column]) or pd.api.types.is_bool_dtype(df[column]):
+                int_columns.append(column)
+            else:
+                raise ValueError(f"Cannot share column {column} of {tf} with dtype {df[column].dtype}")
+
+        n = len(df)
+        size = 8 * n * (1 + len(float_columns) + len(int_columns))
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.blocks[tf] = block
+
+        times, floats, ints = _views(block.buf, n, len(float_columns), len(int_columns))
+        time_values = df['time'].to_numpy()
+        times[:] = time_values.view(np.int64)
+        for j, column in enumerate(float_columns):
+            floats[j] = df[column].to_numpy(dtype=np.float64)
+        for j, column in enumerate(int_columns):
+            ints[j] = df[column].to_numpy(dtype=np.int64)
+
+        self._descriptor[tf] = {
+            'name': block.name,
+            'rows': n,
+            'columns': list(df.columns),
+            'time_dtype': str(time_values.dtype),
+            'float_columns': float_columns,
+            'int_columns': int_columns,
+            'int_dtypes': [str(df[column].dtype) for column in int_columns]
+        }
+
+    def descriptor(self) -> dict:
+        """Picklable description of the blocks, passed to attach_market_data"""
+        return self._descriptor
+
+    def close(self):
+        """Release and unlink every block"""
+        for block in self.blocks.values():
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self.blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _views(buf, n: int, n_float: int, n_int: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Times, float and integer arrays laid out in a block buffer"""
+    times = np.ndarray((n,), dtype=np.int64, buffer=buf)
+    floats = np.ndarray((n_float, n), dtype=np.float64, buffer=buf, offset=8 * n)
+    ints = np.ndarray((n_int, n), dtype=np.int64, buffer=buf, offset=8 * n * (1 + n_float))
+    return times, floats, ints
+
+
+def attach_market_data(descriptor: dict) -> Tuple[List[shared_memory.SharedMemory], Dict[str, pd.DataFrame]]:
+    """
+    Attach to the blocks of a SharedMarketData.
+
+    The returned DataFrames are read-only views of the shared memory; the
+    returned blocks must be kept referenced as long as the DataFrames are used.
+
+    Args:
+        descriptor: SharedMarketData.descriptor()
+
+    Returns:
+        Tuple[List[SharedMemory], Dict[str, pd.DataFrame]]: Attached blocks
+            and the market data dictionary
+    """
+    blocks, data = [], {}
+    for tf, desc in descriptor.items():
+        block = shared_memory.SharedMemory(name=desc['name'])
+        blocks.append(block)
+        n = desc['rows']
+        times, floats, ints = _views(block.buf, n, len(desc['float_columns']), len(desc['int_columns']))
+        for array in (times, floats, ints):
+            array.flags.writeable = False
+
+        columns = {'time': times.view(desc['time_dtype'])}
+        columns.update(zip(desc['float_columns'], floats))
+        columns.update({
+            column: ints[j].astype(dtype, copy=False)
+            for j, (column, dtype) in enumerate(zip(desc['int_columns'], desc['int_dtypes']))
+        })
+        # Unconsolidated: every column stays a view of the block
+        df = pd.DataFrame({column: columns[column] for column in desc['columns']}, copy=False)
+        data[tf] = df
+    return blocks, data
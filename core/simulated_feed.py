@@ -0,0 +1,97 @@
+"""
+Simulated market data feed.
+
+This module serves historical bars through the same fetch_all() interface as
+DataManager, as of the time of a clock. Used with a VirtualClock it lets
+StrategyManager run its live loop over recorded data.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+from core.timeframe_cursor import timeframe_delta
+
+
+class SimulatedDataFeed:
+    """
+    Historical bars visible at the current time of a clock.
+
+    Only closed bars are returned: a bar opened at t is visible once the clock
+    reaches t plus its timeframe duration, the same rule the backtest uses.
+    """
+
+    def __init__(
+        self,
+        data: Dict[str, pd.DataFrame],
+        clock,
+        logger: Optional[logging.Logger] = None
+    ):
+        """
+        Initialize the feed.
+
+        Args:
+            data: Dictionary of timeframe name to OHLC DataFrame sorted by time
+            clock: Clock providing now()
+            logger: Optional logger instance
+        """
+        self.clock = clock
+        self.logger = logger or logging.getLogger(__name__)
+        self.data = {tf: df.reset_index(drop=True) for tf, df in data.items()}
+        self.close_times = {
+            tf: (df['time'].to_numpy().astype('datetime64[ns]') + timeframe_delta(tf))
+            for tf, df in self.data.items()
+        }
+        # Last slice served per timeframe, reused while no new bar closes
+        self._served = {}
+
+    def _visible(self, tf: str, when) -> int:
+        """Number of bars of tf closed at `when`"""
+        return int(np.searchsorted(self.close_times[tf], np.datetime64(pd.Timestamp(when), 'ns'), side='right'))
+
+    def fetch_all(self, bars=1000) -> dict:
+        """
+        Last `bars` closed bars of every timeframe at the clock's time.
+
+        Returns:
+            dict: Dictionary of timeframe name to DataFrame
+        """
+        now = self.clock.now()
+        data = {}
+        for tf, df in self.data.items():
+            end = self._visible(tf, now)
+            if end == 0:
+                self.logger.warning(f"No data for {tf}")
+                continue
+            key = (end, bars)
+            served = self._served.get(tf)
+            if served is None or served[0] != key:
+                served = (key, df.iloc[max(end - bars, 0):end])
+                self._served[tf] = served
+            data[tf] = served[1]
+        return data
+
+    def bars_between(self, tf: str, start, end) -> pd.DataFrame:
+        """
+        Bars of tf that closed in (start, end].
+
+        Args:
+            tf: Timeframe name
+            start: Exclusive lower bound of the bar close time
+            end: Inclusive upper bound of the bar close time
+
+        Returns:
+            pd.DataFrame: Slice of the timeframe's bars
+        """
+        if tf not in self.data:
+            return pd.DataFrame()
+        return self.data[tf].iloc[self._visible(tf, start):self._visible(tf, end)]
+
+    def first_close_time(self, tf: str) -> pd.Timestamp:
+        """Close time of the first bar of tf"""
+        return pd.Timestamp(self.close_times[tf][0])
+
+    def last_close_time(self, tf: str) -> pd.Timestamp:
+        """Close time of the last bar of tf"""
+        return pd.Timestamp(self.close_times[tf][-1])
@@ -1,13 +1,18 @@
 import uuid
 import logging
-from datetime import datetime
+import numpy as np
+import pandas as pd
 from core.base_trade_manager import BaseTradeManager
+from core.clock import SystemClock
+from core.timeframe_cursor import timeframe_delta
 
 class SimulatedTradeManager(BaseTradeManager):
-    def __init__(self, config):
+    def __init__(self, config, clock=None):
         super().__init__(config)
         self.logger = self._setup_logger()
+        self.clock = clock or SystemClock()
         self.positions = []
+        self.closed_positions = []
 
     def _setup_logger(self):
         logger = logging.getLogger('SimulatedTradeManager')
@@ -23,7 +28,7 @@ class SimulatedTradeManager(BaseTradeManager):
             'price_open': price,
             'sl': sl,
             'tp': tp,
-            'open_time': datetime.now(),
+            'open_time': self.clock.now(),
         }
         self.positions.append(position)
         self.logger.info(f"[SIM] Order placed: {order_type} @ {price} Vol={volume}")
@@ -36,3 +41,51 @@ class SimulatedTradeManager(BaseTradeManager):
 
     def get_open_positions(self):
         return self.positions
+
+    def process_bars(self, bars, timeframe='M1'):
+        """
+        Close open positions whose SL or TP is touched by `bars`, as the
+        broker would. A position is only tested against bars that opened at
+        or after its entry, so a bar already forming when the order was
+        placed never closes it; when one bar touches both levels the SL is
+        assumed to be hit first. Exits are stamped at the close of the
+        touching bar.
+
+        Args:
+            bars: Bars of `timeframe` with time, high and low columns
+            timeframe: Timeframe of the bars
+
+        Returns:
+            list: Positions closed by these bars
+        """
+        if bars is None or bars.empty or not self.positions:
+            return []
+
+        times = bars['time'].to_numpy().astype('datetime64[ns]')
+        highs = bars['high'].to_numpy()
+        lows = bars['low'].to_numpy()
+        closed = []
+        for position in self.positions:
+            buy = position['type'] == 'BUY'
+            sl, tp = position['sl'], position['tp']
+            after_entry = times >= pd.Timestamp(position['open_time']).to_datetime64()
+            sl_hit = np.zeros(len(bars), dtype=bool) if not sl else (lows <= sl if buy else highs >= sl)
+            tp_hit = np.zeros(len(bars), dtype=bool) if not tp else (highs >= tp if buy else lows <= tp)
+            hits = np.flatnonzero((sl_hit | tp_hit) & after_entry)
+            if len(hits) == 0:
+                continue
+            j = hits[0]
+            position.update({
+                'exit_type': 'sl' if sl_hit[j] else 'tp',
+                'price_close': sl if sl_hit[j] else tp,
+                'close_time': pd.Timestamp(times[j] + timeframe_delta(timeframe))
+            })
+            closed.append(position)
+
+        if closed:
+            ids = {p['id'] for p in closed}
+            self.positions = [p for p in self.positions if p['id'] not in ids]
+            self.closed_positions.extend(closed)
+            for position in closed:
+                self.logger.info(f"[SIM] {position['exit_type'].upper()} hit for {position['id']} @ {position['price_close']}")
+        return closed
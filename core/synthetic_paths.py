@@ -0,0 +1,89 @@
+"""
+Synthetic price paths for stress testing.
+
+This module builds alternative price histories by block-bootstrapping the
+bars of the finest stored timeframe. Each bar is taken as its open, high, low
+and close relative to the previous close, so sampled blocks chain into a
+continuous series that keeps intrabar shapes and short-range dependence.
+The higher timeframes are resampled from that series in memory, which keeps
+every timeframe of a path consistent with the others.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+from core.timeframe_cursor import TIMEFRAME_MINUTES
+
+
+def generate_synthetic_path(
+    data: Dict[str, pd.DataFrame],
+    timeframes: Iterable[str],
+    block_bars: int,
+    rng: np.random.Generator,
+    base_timeframe: Optional[str] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Generate one synthetic multi-timeframe path.
+
+    Args:
+        data: Historical data, dictionary of timeframe name to OHLC DataFrame
+        timeframes: Timeframes to build, each a multiple of the base timeframe
+        block_bars: Length of the bootstrapped blocks, in base bars
+        rng: Random generator
+        base_timeframe: Timeframe to bootstrap, defaults to M1 when loaded
+            and M5 otherwise
+
+    Returns:
+        Dict[str, pd.DataFrame]: Synthetic bars per timeframe on the time grid
+            of the historical base timeframe
+    """
+    base_timeframe = base_timeframe or ('M1' if 'M1' in data else 'M5')
+    base = data[base_timeframe]
+    n = len(base)
+    block_bars = max(1, min(block_bars, n - 1))
+
+    close = base['close'].to_numpy(dtype=float)
+    prev_close = close[:-1]
+    # Bar i+1 relative to the close of bar i
+    relative = np.column_stack([
+        base[column].to_numpy(dtype=float)[1:] / prev_close
+        for column in ('open', 'high', 'low', 'close')
+    ])
+    volume = base['tick_volume'].to_numpy()[1:] if 'tick_volume' in base else np.zeros(n - 1)
+
+    n_blocks = -(-(n - 1) // block_bars)
+    starts = rng.integers(0, n - block_bars, size=n_blocks)
+    index = (starts[:, None] + np.arange(block_bars)).ravel()[:n - 1]
+
+    sampled = relative[index]
+    closes = close[0] * np.concatenate([[1.0], np.cumprod(sampled[:, 3])])
+    anchor = closes[:-1, None]
+
+    path = pd.DataFrame({
+        'time': base['time'].to_numpy(),
+        'open': np.concatenate([[base['open'].iloc[0]], anchor[:, 0] * sampled[:, 0]]),
+        'high': np.concatenate([[base['high'].iloc[0]], anchor[:, 0] * sampled[:, 1]]),
+        'low': np.concatenate([[base['low'].iloc[0]], anchor[:, 0] * sampled[:, 2]]),
+        'close': closes,
+        'tick_volume': np.concatenate([[volume[0] if len(volume) else 0], volume[index]])
+    })
+
+    result = {}
+    base_minutes = TIMEFRAME_MINUTES[base_timeframe]
+    for tf in timeframes:
+        if tf == base_timeframe:
+            result[tf] = path
+            continue
+        if TIMEFRAME_MINUTES[tf] < base_minutes or TIMEFRAME_MINUTES[tf] % base_minutes:
+            continue
+        bars = path.resample(f"{TIMEFRAME_MINUTES[tf]}min", on='time', label='left', closed='left').agg({
+            'open': 'first',
+            'high': 'max',
+            'low': 'min',
+            'close': 'last',
+            'tick_volume': 'sum'
+        })
+        result[tf] = bars.dropna(subset=['open']).reset_index()
+
+    return result
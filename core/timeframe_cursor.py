@@ -0,0 +1,104 @@
+"""
+Multi-timeframe cursor.
+
+This module provides a cursor that walks the main backtest timeframe and
+exposes, for every step, the bars of all other timeframes that are already
+closed at that point in time, without copying any data.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+
+TIMEFRAME_MINUTES = {
+    'M1': 1,
+    'M5': 5,
+    'M15': 15,
+    'M30': 30,
+    'H1': 60,
+    'H2': 120,
+    'H4': 240,
+    'D1': 1440
+}
+
+
+def timeframe_delta(timeframe: str) -> np.timedelta64:
+    """Return the duration of one bar of the given timeframe"""
+    return np.timedelta64(TIMEFRAME_MINUTES[timeframe], 'm')
+
+
+class MultiTimeframeCursor:
+    """
+    Precomputed index of the last closed bar of every timeframe for each
+    step of the main timeframe.
+
+    A bar is considered closed at `time + duration`. At main step `i` the
+    reference time is the close of main bar `i`, so the main timeframe always
+    exposes bars `[0, i]` and higher timeframes only expose bars that have
+    fully closed by then (no lookahead into a forming H1 bar).
+    """
+
+    def __init__(self, data: Dict[str, pd.DataFrame], main_tf: str = 'M5'):
+        """
+        Initialize the cursor.
+
+        Args:
+            data: Dictionary of timeframe name to OHLC DataFrame sorted by time
+            main_tf: Timeframe that drives the backtest steps
+        """
+        self.data = data
+        self.main_tf = main_tf
+        self.main_times = data[main_tf]['time'].to_numpy()
+        self.close_times = self.main_times + timeframe_delta(main_tf)
+
+        # ends[tf][i] = number of closed bars of tf at main step i
+        self.ends = {}
+        for tf, df in data.items():
+            bar_close = df['time'].to_numpy() + timeframe_delta(tf)
+            self.ends[tf] = np.searchsorted(bar_close, self.close_times, side='right')
+
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.main_times)
+
+    def time(self, i: int) -> pd.Timestamp:
+        """Open time of main bar i"""
+        return pd.Timestamp(self.main_times[i])
+
+    def close_time(self, i: int) -> pd.Timestamp:
+        """Close time of main bar i, when the signals of step i are known"""
+        return pd.Timestamp(self.close_times[i])
+
+    def end(self, tf: str, i: int) -> int:
+        """Number of closed bars of timeframe tf at main step i"""
+        return int(self.ends[tf][i])
+
+    def counts(self, i: int) -> Dict[str, int]:
+        """Number of closed bars of every timeframe at main step i"""
+        return {tf: int(ends[i]) for tf, ends in self.ends.items()}
+
+    def window(self, i: int, timeframes: Optional[Iterable[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Closed bars of every timeframe at main step i.
+
+        The returned DataFrames are positional slices of the loaded data and
+        share its memory, so callers must treat them as read-only.
+        """
+        timeframes = self.data.keys() if timeframes is None else timeframes
+        return {tf: self.data[tf].iloc[:self.ends[tf][i]] for tf in timeframes}
+
+    def column(self, tf: str, name: str) -> np.ndarray:
+        """Read-only numpy view of a full column of timeframe tf"""
+        key = (tf, name)
+        if key not in self._columns:
+            values = self.data[tf][name].to_numpy().view()
+            values.flags.writeable = False
+            self._columns[key] = values
+        return self._columns[key]
+
+    def arrays(self, i: int, tf: str, columns: Iterable[str] = ('time', 'open', 'high', 'low', 'close')) -> Dict[str, np.ndarray]:
+        """Read-only array slices of the closed bars of timeframe tf at main step i"""
+        end = self.ends[tf][i]
+        return {name: self.column(tf, name)[:end] for name in columns}
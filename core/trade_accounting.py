@@ -0,0 +1,94 @@
+"""
+Trade accounting shared by the backtest engines.
+
+The per-step loop of Backtest.simulate, the event-driven engine and the
+candidate replay of sharded runs all open trades from signals and book them
+at their exits through these functions, so the position sizing, the risk
+check and the trade record are the same in every engine.
+"""
+
+from typing import Optional
+
+
+def size_volume(balance: float, price: float, sl: float, point: float, pip_value: float,
+                trading_config: dict) -> Optional[float]:
+    """
+    Volume risking trading.risk_per_trade percent of the balance at the stop loss.
+
+    Args:
+        balance: Current balance
+        price: Entry price
+        sl: Stop loss price
+        point: Symbol point size
+        pip_value: Value of one point for one lot
+        trading_config: 'trading' section of the main config
+
+    Returns:
+        Optional[float]: Volume clipped to the position size limits, None
+            when the stop loss is at the entry price
+    """
+    pip_distance = abs(sl - price) / point
+    if pip_distance == 0:
+        return None
+    risk_amount = balance * (trading_config['risk_per_trade'] / 100)
+    volume = min(risk_amount / (pip_distance * pip_value), trading_config['max_position_size'])
+    return max(volume, trading_config['min_position_size'])
+
+
+def open_trade(signal: dict, time, balance: float, point: float, pip_value: float, config: dict,
+               risk_manager, trade_manager) -> Optional[dict]:
+    """
+    Size the order of a signal, check it against the risk limits and place it.
+
+    The caller adds the returned trade to its open trades and updates the
+    RiskManager's open position count.
+
+    Args:
+        signal: Signal with 'type', 'price', 'sl', 'tp' and optional 'timeframe'
+        time: Entry time of the trade
+        balance: Current balance
+        point: Symbol point size
+        pip_value: Value of one point for one lot
+        config: Main config (trading and mt5 sections)
+        risk_manager: RiskManager instance
+        trade_manager: Trade manager implementing place_order
+
+    Returns:
+        Optional[dict]: The opened trade, None when the signal was skipped
+    """
+    price = signal['price']
+    volume = size_volume(balance, price, signal['sl'], point, pip_value, config['trading'])
+    if volume is None or not risk_manager.can_open_position(volume, price):
+        return None
+
+    order_id = trade_manager.place_order(
+        order_type=signal['type'],
+        volume=volume,
+        price=price,
+        sl=signal['sl'],
+        tp=signal['tp']
+    )
+    if not order_id:
+        return None
+
+    return {
+        'order_id': order_id,
+        'time': time,
+        'type': signal['type'],
+        'price': price,
+        'volume': volume,
+        'sl': signal['sl'],
+        'tp': signal['tp'],
+        'leverage': config['mt5']['leverage'],
+        'timeframe': signal.get('timeframe')
+    }
+
+
+def close_trade(trade: dict, point: float, pip_value: float) -> float:
+    """Book the PnL of a trade at its resolved exit price and return it"""
+    if trade['type'] == 'BUY':
+        profit = (trade['exit_price'] - trade['price']) / point * pip_value * trade['volume']
+    else:
+        profit = (trade['price'] - trade['exit_price']) / point * pip_value * trade['volume']
+    trade['profit'] = profit
+    return profit
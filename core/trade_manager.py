@@ -1,6 +1,10 @@
 import logging
 from datetime import datetime
-import MetaTrader5 as mt5
+
+try:
+    import MetaTrader5 as mt5
+except ImportError:  # Only needed for live trading
+    mt5 = None
 
 class TradeManager:
     def __init__(self, config):
@@ -29,6 +33,9 @@ class TradeManager:
         
     def initialize_mt5(self):
         """Initialize MetaTrader 5 connection"""
+        if mt5 is None:
+            self.logger.error("MetaTrader5 package is not installed")
+            return False
         if not mt5.initialize():
             self.logger.error("Failed to initialize MT5")
             return False
@@ -47,6 +54,8 @@ class TradeManager:
         
     def place_order(self, order_type, volume, price=None, sl=None, tp=None):
         """Place a new order"""
+        if order_type in ('BUY', 'SELL'):
+            order_type = mt5.ORDER_TYPE_BUY if order_type == 'BUY' else mt5.ORDER_TYPE_SELL
         request = {
             "action": mt5.TRADE_ACTION_DEAL,
             "symbol": self.symbol,
@@ -132,4 +141,5 @@ class TradeManager:
         
     def __del__(self):
         """Cleanup when object is destroyed"""
-        mt5.shutdown() 
\ No newline at end of file
+        if mt5 is not None:
+            mt5.shutdown() 
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""
+Config-axis vectorized backtest.
+
+This module evaluates many RSI parameter sets in one pass: the RSI series
+are computed once per (timeframe, period), thresholds are broadcast over a
+(bars x configs) array, and the exits of every entry of every config are
+resolved in a single call of the exit resolver.
+
+The evaluation is a screening approximation of Backtest.simulate, not a
+reproduction of it:
+
+- every signal opens a trade with the volume sized at the initial balance,
+  without compounding and without the max open positions limit of
+  RiskManager;
+- the drawdown is measured on the realized balance after every trade rather
+  than at the end of every main step;
+- the run does not stop when the balance is depleted;
+- trades are booked at their resolved exits even when these fall after the
+  last bar of the evaluated steps, where simulate settles them at that
+  bar's close, and trades without a resolved exit are left out.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional
+
+from core.indicators import calculate_rsi_rma
+from core.param_grid import apply_params
+
+
+RSI_NAMES = ('short', 'medium', 'long')
+
+
+def evaluate_param_sets(
+    data: Dict[str, pd.DataFrame],
+    strategy_config: dict,
+    param_sets: List[Dict[str, Any]],
+    cursor,
+    resolve_exits: Callable,
+    point: float,
+    pip_value: float,
+    trading_config: dict,
+    initial_balance: float,
+    step_mask: Optional[np.ndarray] = None,
+    rsi_source: Optional[Callable] = None
+) -> pd.DataFrame:
+    """
+    Evaluate K parameter sets over the same data in one set of array ops.
+
+    The metrics approximate those of Backtest.simulate, see the module
+    docstring for the differences.
+
+    Args:
+        data: Dictionary of timeframe name to OHLC DataFrame
+        strategy_config: Base RSI strategy config
+        param_sets: List of {dotted path: value} overrides, one per config
+        cursor: MultiTimeframeCursor over data
+        resolve_exits: Function (entry_times, sides, sl, tp) -> (price, type, time)
+        point: Symbol point size
+        pip_value: Value of one point for one lot
+        trading_config: 'trading' section of the main config
+        initial_balance: Starting balance
+        step_mask: Optional boolean mask of main steps allowed to open trades
+        rsi_source: Optional function (timeframe, period) -> RSI array,
+            defaults to computing calculate_rsi_rma on data
+
+    Returns:
+        pd.DataFrame: One row of parameters and metrics per parameter set
+    """
+    configs = [apply_params(strategy_config, params) for params in param_sets]
+    n_configs = len(configs)
+    n_steps = len(cursor)
+    timeframes = [tf for tf in strategy_config['timeframes'] if tf in data]
+
+    if rsi_source is None:
+        rsi_cache = {}
+
+        def rsi_source(tf, period):
+            if (tf, period) not in rsi_cache:
+                rsi_cache[(tf, period)] = calculate_rsi_rma(data[tf], period).to_numpy()
+            return rsi_cache[(tf, period)]
+
+    periods = np.array([[c['parameters']['rsi_periods'][name] for name in RSI_NAMES] for c in configs])
+    overbought = np.array([[c['parameters']['rsi_levels'][name]['overbought'] for name in RSI_NAMES] for c in configs])
+    oversold = np.array([[c['parameters']['rsi_levels'][name]['oversold'] for name in RSI_NAMES] for c in configs])
+    sl_pips = np.array([c['parameters']['risk_management']['stop_loss_pips'] for c in configs], dtype=float)
+    tp_pips = np.array([c['parameters']['risk_management']['take_profit_pips'] for c in configs], dtype=float)
+
+    # Volume sized once at the initial balance, as the first trade of simulate
+    risk_amount = initial_balance * (trading_config['risk_per_trade'] / 100)
+    volume = risk_amount / (sl_pips * 0.1 / point * pip_value)
+    volume = np.clip(volume, trading_config['min_position_size'], trading_config['max_position_size'])
+
+    allowed = np.ones(n_steps, dtype=bool)
+    allowed[0] = False
+    if step_mask is not None:
+        allowed &= step_mask
+
+    steps, config_idx, sides, prices = [], [], [], []
+    unique_periods, group_of = np.unique(periods, axis=0, return_inverse=True)
+    group_of = np.asarray(group_of).ravel()
+
+    for g, group_periods in enumerate(unique_periods):
+        ks = np.flatnonzero(group_of == g)
+        min_bars = int(group_periods.max())
+        # simulate skips a step until every loaded timeframe has min_bars bars
+        ready = allowed.copy()
+        for ends in cursor.ends.values():
+            ready &= ends >= min_bars
+
+        for tf in timeframes:
+            ends = cursor.ends[tf]
+            last = np.maximum(ends - 1, 0)
+            rsi = [rsi_source(tf, int(p))[last] for p in group_periods]
+
+            sell = ready[:, None].copy()
+            buy = ready[:, None].copy()
+            for j in range(len(RSI_NAMES)):
+                sell = sell & (rsi[j][:, None] >= overbought[ks, j][None, :])
+                buy = buy & (rsi[j][:, None] <= oversold[ks, j][None, :])
+            buy &= ~sell
+
+            close = data[tf]['close'].to_numpy()
+            for side, mask in ((-1, sell), (1, buy)):
+                st, kk = np.nonzero(mask)
+                steps.append(st)
+                config_idx.append(ks[kk])
+                sides.append(np.full(len(st), side))
+                prices.append(close[last[st]])
+
+    steps = np.concatenate(steps) if steps else np.array([], dtype=np.int64)
+    config_idx = np.concatenate(config_idx) if config_idx else np.array([], dtype=np.int64)
+    sides = np.concatenate(sides) if sides else np.array([], dtype=np.int64)
+    prices = np.concatenate(prices) if prices else np.array([], dtype=float)
+
+    sl = prices - sides * sl_pips[config_idx] * 0.1
+    tp = prices + sides * tp_pips[config_idx] * 0.1
+    exit_price, exit_type, exit_time = resolve_exits(cursor.close_times[steps], sides, sl, tp)
+
+    resolved = exit_type != None  # noqa: E711 - elementwise on an object array
+    profit = sides * (exit_price - prices) / point * pip_value * volume[config_idx]
+
+    trades = pd.DataFrame({
+        'config': config_idx[resolved],
+        'exit_time': exit_time[resolved],
+        'profit': profit[resolved]
+    })
+    metrics = summarize_trades(trades, n_configs, initial_balance)
+    table = pd.DataFrame(param_sets)
+    return pd.concat([table, metrics], axis=1)
+
+
+def summarize_trades(trades: pd.DataFrame, n_configs: int, initial_balance: float) -> pd.DataFrame:
+    """
+    Per-config metrics of a flat trade table with 'config', 'exit_time' and
+    'profit' columns, using the same definitions as Backtest.calculate_metrics.
+    """
+    trades = trades.sort_values(['config', 'exit_time'], kind='stable')
+    config = trades['config'].to_numpy()
+    profit = trades['profit'].to_numpy()
+
+    count = np.bincount(config, minlength=n_configs)
+    wins = np.bincount(config, weights=profit > 0, minlength=n_configs)
+    losses = np.bincount(config, weights=profit < 0, minlength=n_configs)
+    gross_profit = np.bincount(config, weights=np.where(profit > 0, profit, 0), minlength=n_configs)
+    gross_loss = -np.bincount(config, weights=np.where(profit < 0, profit, 0), minlength=n_configs)
+
+    # Realized balance path per config, ordered by exit time
+    balance = initial_balance + trades.groupby('config')['profit'].cumsum().to_numpy()
+    peak = pd.Series(np.maximum(balance, initial_balance)).groupby(config).cummax().to_numpy()
+    drawdown = np.where(peak > 0, (peak - balance) / peak, 0)
+    max_drawdown = np.zeros(n_configs)
+    np.maximum.at(max_drawdown, config, drawdown)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.DataFrame({
+            'total_trades': count,
+            'winning_trades': wins.astype(int),
+            'losing_trades': losses.astype(int),
+            'win_rate': np.where(count > 0, wins / np.maximum(count, 1), 0),
+            'profit_factor': np.where(gross_loss > 0, gross_profit / gross_loss, np.inf),
+            'max_drawdown': max_drawdown,
+            'total_profit': gross_profit,
+            'total_loss': gross_loss,
+            'net_profit': gross_profit - gross_loss
+        })
@@ -2,7 +2,7 @@ import numpy as np
 import pandas as pd
 import logging
 from core.base_trading_strategy import BaseTradingStrategy
-from core.indicators import calculate_rsi  # Nếu có sẵn
+from core.indicators import calculate_rsi, calculate_rsi_rma, IncrementalRSI  # Nếu có sẵn
 from datetime import datetime
 
 class RSIStrategy(BaseTradingStrategy):
@@ -12,6 +12,10 @@ class RSIStrategy(BaseTradingStrategy):
         self.rsi_levels = config['strategy']['parameters']['rsi_levels']
         self.risk = config['strategy']['parameters']['risk_management']
         self.trading = config.get('trading', {})
+        # Optional core.feature_cache.FeatureCache shared across backtest runs
+        self.feature_cache = None
+        # Per-timeframe RSI accumulators and signals of the last closed bar seen
+        self._tf_state = {}
 
         # Logging
         self.logger = logging.getLogger('RSIStrategy')
@@ -22,41 +26,28 @@ class RSIStrategy(BaseTradingStrategy):
             self.logger.addHandler(handler)
 
 
-    def run_strategy(self):
-        """Fetch dữ liệu và kiểm tra tín hiệu giao dịch"""
+    def run_strategy(self, data=None):
+        """Kiểm tra tín hiệu giao dịch và đặt lệnh qua trade_manager"""
         try:
-            data = {}
-            for tf in self.timeframes:
-                df = self.get_data(tf)
-                if df is not None and not df.empty:
-                    data[tf] = df
-                else:
-                    self.logger.warning(f"No data returned for {tf}")
+            if data is None:
+                data = self.get_data()
 
             signals = self.check_signals(data)
+            placed = False
             for signal in signals:
                 if not self.risk_manager.can_open_position(signal['volume'], signal['price']):
                     continue
-                entry_price = signal['price']
-                sl = signal['sl']
-                tp = self.risk_manager.calculate_take_profit(entry_price, sl)
-                volume = self.risk_manager.calculate_position_size(entry_price, sl)
-
-                order_type = (
-                    mt5.ORDER_TYPE_BUY if signal['type'] == 'BUY'
-                    else mt5.ORDER_TYPE_SELL
-                )
 
                 order_id = self.trade_manager.place_order(
-                    order_type=order_type,
-                    volume=volume,
-                    price=entry_price,
-                    sl=sl,
-                    tp=tp,
-                    strategy_name=self.__class__.__name__
+                    order_type=signal['type'],
+                    volume=signal['volume'],
+                    price=signal['price'],
+                    sl=signal['sl'],
+                    tp=signal['tp']
                 )
 
                 if order_id:
+                    placed = True
                     # Update risk manager
                     self.risk_manager.update_open_positions(
                         len(self.trade_manager.get_open_positions())
@@ -64,32 +55,53 @@ class RSIStrategy(BaseTradingStrategy):
 
                     self.add_trade_log({
                         'order_id': order_id,
-                        'type': order_type,
-                        'volume': volume,
-                        'price': price,
-                        'sl': sl,
-                        'tp': tp
+                        'type': signal['type'],
+                        'volume': signal['volume'],
+                        'price': signal['price'],
+                        'sl': signal['sl'],
+                        'tp': signal['tp'],
+                        'timeframe': signal['timeframe']
                     })
 
-            strategy.save_trade_log()
+            if placed:
+                self.save_trade_log()
 
         except Exception as e:
             self.logger.error(f"Error running strategy: {str(e)}")
 
     def calculate_rsi(self, data: pd.DataFrame, period: int) -> pd.Series:
         """Tính RSI chuẩn RMA (giống Pine Script)"""
-        src = data['close']
-        change = src.diff()
-        ups = np.where(change > 0, change, 0)
-        downs = np.where(change < 0, -change, 0)
-        ups_rma = pd.Series(ups).ewm(alpha=1 / period, min_periods=period).mean()
-        downs_rma = pd.Series(downs).ewm(alpha=1 / period, min_periods=period).mean()
-        rs = ups_rma / downs_rma
-        rsi = np.where(downs_rma == 0, 100, np.where(ups_rma == 0, 0, 100 - (100 / (1 + rs))))
-        return pd.Series(rsi, index=data.index)
+        return calculate_rsi_rma(data, period)
+
+    def rsi_array(self, df: pd.DataFrame, tf: str, period: int) -> np.ndarray:
+        """Full-history RSI of a timeframe, memoized when a feature cache is set"""
+        if self.feature_cache is None:
+            return self.calculate_rsi(df, period).to_numpy()
+        return self.feature_cache.get_or_compute(
+            tf, 'rsi_rma', (period,), df,
+            lambda: self.calculate_rsi(df, period).to_numpy()
+        )
+
+    def _make_signal(self, signal_type: str, price: float, tf: str) -> dict:
+        """Build a signal dict with SL/TP placed from the risk settings"""
+        direction = 1 if signal_type == 'BUY' else -1
+        return {
+            'type': signal_type,
+            'volume': self.trading.get('min_position_size', 0.01),
+            'price': price,
+            'sl': price - direction * self.risk['stop_loss_pips'] * 0.1,
+            'tp': price + direction * self.risk['take_profit_pips'] * 0.1,
+            'timeframe': tf
+        }
 
     def check_signals(self, data: dict) -> list:
-        """Kiểm tra tín hiệu giao dịch trên các timeframe"""
+        """
+        Kiểm tra tín hiệu giao dịch trên các timeframe.
+
+        RSI and signals of a timeframe are only re-evaluated when its last
+        bar (time, close) changes; new bars are folded into per-timeframe
+        IncrementalRSI accumulators instead of recomputing the whole series.
+        """
         signals = []
 
         for tf in self.timeframes:
@@ -102,37 +114,138 @@ class RSIStrategy(BaseTradingStrategy):
                 self.logger.warning(f"Insufficient data for timeframe {tf}")
                 continue
 
-            rsi_short = self.calculate_rsi(df, self.rsi_periods['short']).iloc[-1]
-            rsi_medium = self.calculate_rsi(df, self.rsi_periods['medium']).iloc[-1]
-            rsi_long = self.calculate_rsi(df, self.rsi_periods['long']).iloc[-1]
-
-            self.logger.info(f"{tf} RSI - Short: {rsi_short:.2f}, Medium: {rsi_medium:.2f}, Long: {rsi_long:.2f}")
-            price = df['close'].iloc[-1]
-
-            if (rsi_short >= self.rsi_levels['short']['overbought'] and
-                rsi_medium >= self.rsi_levels['medium']['overbought'] and
-                rsi_long >= self.rsi_levels['long']['overbought']):
-                signals.append({
-                    'type': 'SELL',
-                    'volume': self.trading.get('min_position_size', 0.01),
-                    'price': price,
-                    'sl': price + self.risk['stop_loss_pips'] * 0.1,
-                    'tp': price - self.risk['take_profit_pips'] * 0.1,
-                    'timeframe': tf
-                })
-                self.logger.info(f"SELL signal on {tf} @ {price:.2f}")
-
-            elif (rsi_short <= self.rsi_levels['short']['oversold'] and
-                  rsi_medium <= self.rsi_levels['medium']['oversold'] and
-                  rsi_long <= self.rsi_levels['long']['oversold']):
-                signals.append({
-                    'type': 'BUY',
-                    'volume': self.trading.get('min_position_size', 0.01),
-                    'price': price,
-                    'sl': price - self.risk['stop_loss_pips'] * 0.1,
-                    'tp': price + self.risk['take_profit_pips'] * 0.1,
-                    'timeframe': tf
-                })
-                self.logger.info(f"BUY signal on {tf} @ {price:.2f}")
+            signals.extend(dict(signal) for signal in self._timeframe_signals(tf, df))
+
+        return signals
+
+    def get_state(self) -> dict:
+        """Per-timeframe RSI accumulators and signals, for resuming a later run"""
+        return {'timeframes': {tf: dict(state) for tf, state in self._tf_state.items()}}
+
+    def set_state(self, state: dict):
+        """Restore the state returned by get_state"""
+        self._tf_state = {tf: dict(tf_state) for tf, tf_state in state.get('timeframes', {}).items()}
+
+    @staticmethod
+    def _bar_times(df: pd.DataFrame) -> np.ndarray:
+        """Bar open times, from the 'time' column or a time index"""
+        times = df['time'] if 'time' in df.columns else df.index
+        return np.asarray(times, dtype='datetime64[ns]')
+
+    def _timeframe_signals(self, tf: str, df: pd.DataFrame) -> list:
+        """Signals of the last bar of df, reusing the cached state of tf"""
+        times = self._bar_times(df)
+        closes = df['close'].to_numpy(dtype=float)
+        state = self._tf_state.get(tf)
+        if state is not None and state['time'] == times[-1] and state['close'] == closes[-1]:
+            return state['signals']
+
+        # Resume from the state after the last bar seen or, when that bar was
+        # updated in place (forming bar), from the state before it
+        periods = set(self.rsi_periods.values())
+        resume = -1
+        accumulators = {period: IncrementalRSI(period) for period in periods}
+        if state is not None:
+            for key in ('', 'prev_'):
+                if state[key + 'time'] is None:
+                    continue
+                pos = int(np.searchsorted(times, state[key + 'time']))
+                if pos < len(times) and times[pos] == state[key + 'time'] and closes[pos] == state[key + 'close']:
+                    resume = pos
+                    accumulators = {p: acc.copy() for p, acc in state[key + 'rsi'].items()}
+                    break
+
+        previous = None
+        for k in range(resume + 1, len(closes)):
+            if k == len(closes) - 1:
+                previous = {p: acc.copy() for p, acc in accumulators.items()}
+            for acc in accumulators.values():
+                acc.update(closes[k])
+
+        rsi_short = accumulators[self.rsi_periods['short']].value
+        rsi_medium = accumulators[self.rsi_periods['medium']].value
+        rsi_long = accumulators[self.rsi_periods['long']].value
+
+        self.logger.info(f"{tf} RSI - Short: {rsi_short:.2f}, Medium: {rsi_medium:.2f}, Long: {rsi_long:.2f}")
+        price = closes[-1]
+
+        signals = []
+        if (rsi_short >= self.rsi_levels['short']['overbought'] and
+            rsi_medium >= self.rsi_levels['medium']['overbought'] and
+            rsi_long >= self.rsi_levels['long']['overbought']):
+            signals.append(self._make_signal('SELL', price, tf))
+            self.logger.info(f"SELL signal on {tf} @ {price:.2f}")
+
+        elif (rsi_short <= self.rsi_levels['short']['oversold'] and
+              rsi_medium <= self.rsi_levels['medium']['oversold'] and
+              rsi_long <= self.rsi_levels['long']['oversold']):
+            signals.append(self._make_signal('BUY', price, tf))
+            self.logger.info(f"BUY signal on {tf} @ {price:.2f}")
+
+        self._tf_state[tf] = {
+            'time': times[-1],
+            'close': closes[-1],
+            'rsi': accumulators,
+            'prev_time': times[-2] if len(times) > 1 else None,
+            'prev_close': closes[-2] if len(closes) > 1 else None,
+            'prev_rsi': previous,
+            'signals': signals
+        }
+        return signals
+
+    def build_signal_arrays(self, data: dict, cursor) -> dict:
+        """
+        Vectorized backtest mode: compute the short, medium and long RSI once
+        per timeframe over the full history and align the resulting signals to
+        the main timeframe steps of the cursor.
+
+        Every main step only sees the last bar of a timeframe that is closed at
+        that step, so the arrays are free of lookahead and match what
+        check_signals returns for the same step.
 
+        Returns:
+            dict: timeframe -> {'side': int8 array (1 BUY, -1 SELL, 0 none),
+                                'price': float array of the aligned close}
+        """
+        arrays = {}
+        min_bars = max(self.rsi_periods.values())
+
+        for tf in self.timeframes:
+            if tf not in data:
+                self.logger.warning(f"No data for timeframe {tf}")
+                continue
+
+            df = data[tf]
+            rsi = {
+                name: self.rsi_array(df, tf, period)
+                for name, period in self.rsi_periods.items()
+            }
+
+            sell = np.ones(len(df), dtype=bool)
+            buy = np.ones(len(df), dtype=bool)
+            for name in ('short', 'medium', 'long'):
+                sell &= rsi[name] >= self.rsi_levels[name]['overbought']
+                buy &= rsi[name] <= self.rsi_levels[name]['oversold']
+            side = np.where(sell, -1, np.where(buy, 1, 0)).astype(np.int8)
+
+            # Index of the last closed bar of tf at each main step
+            ends = cursor.ends[tf]
+            last = np.maximum(ends - 1, 0)
+            arrays[tf] = {
+                'side': np.where(ends >= min_bars, side[last], 0).astype(np.int8),
+                'price': df['close'].to_numpy()[last]
+            }
+
+        return arrays
+
+    def signals_at(self, arrays: dict, i: int) -> list:
+        """Signals of main step i from the output of build_signal_arrays"""
+        signals = []
+        for tf in self.timeframes:
+            if tf not in arrays:
+                continue
+            side = arrays[tf]['side'][i]
+            if side != 0:
+                signal_type = 'BUY' if side > 0 else 'SELL'
+                signals.append(self._make_signal(signal_type, float(arrays[tf]['price'][i]), tf))
         return signals
@@ -7,9 +7,8 @@ execution, and proper cleanup of resources.
 """
 
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 import threading
-import time
 import json
 import os
 from typing import List, Dict
@@ -19,18 +18,29 @@ from strategies.rsi_strategy import RSIStrategy
 from core.trade_manager import TradeManager
 from core.risk_manager import RiskManager
 from core.data_manager import DataManager
+from core.clock import SystemClock
 
 class StrategyManager:
-    def __init__(self, config):
+    def __init__(self, config, clock=None, data_manager=None, trade_manager=None, risk_manager=None):
+        """
+        Args:
+            config: Main config
+            clock: Clock used for the time and the waits between cycles,
+                defaults to the wall clock
+            data_manager: Market data source with fetch_all(), defaults to MT5
+            trade_manager: Order execution, defaults to the MT5 TradeManager
+            risk_manager: Defaults to a RiskManager over config
+        """
         self.config = config
         self.logger = self._setup_logger()
         self.strategies: Dict[str, BaseTradingStrategy] = {}
-        self.trade_manager = TradeManager(config)
-        self.risk_manager = RiskManager(config)
+        self.clock = clock or SystemClock()
+        self.trade_manager = trade_manager or TradeManager(config)
+        self.risk_manager = risk_manager or RiskManager(config)
         self.running = False
         self.threads = []
 
-        self.data_manager = DataManager(
+        self.data_manager = data_manager or DataManager(
             symbol=config['trading']['symbol'],
             timeframes=config['support_timeframes'],
             logger=self.logger
@@ -40,6 +50,8 @@ class StrategyManager:
         """Setup logger for strategy manager"""
         logger = logging.getLogger('StrategyManager')
         logger.setLevel(logging.INFO)
+        if logger.handlers:
+            return logger
         
         # Create file handler
         fh = logging.FileHandler(f'logs/strategy_manager_{datetime.now().strftime("%Y%m%d")}.log')
@@ -85,6 +97,10 @@ class StrategyManager:
         else:
             raise ValueError(f"Unsupported strategy: {strategy_name}")
 
+        strategy_instance.trade_manager = self.trade_manager
+        strategy_instance.risk_manager = self.risk_manager
+        strategy_instance.clock = self.clock
+
         self.strategies[strategy_name] = strategy_instance
         self.logger.info(f"Strategy '{strategy_name}' loaded and initialized.")
         
@@ -102,20 +118,75 @@ class StrategyManager:
         """
         return self.data_manager.fetch_all()
 
+    def _interval(self, strategy: BaseTradingStrategy) -> float:
+        """Seconds between two cycles of a strategy"""
+        return strategy.config.get('interval', self.config.get('strategies', {}).get('interval', 60))
+
+    def run_cycle(self, strategy: BaseTradingStrategy):
+        """Run one cycle of a strategy on the latest data"""
+        all_data = self.fetch_all_data()  # ✅ lấy toàn bộ dữ liệu mới nhất
+        data = {tf: all_data[tf] for tf in strategy.timeframes if tf in all_data}
+        strategy.run_strategy(data)
+
     def _run_strategy(self, strategy: BaseTradingStrategy):
         """Run a single strategy in a loop"""
         while self.running:
             try:
-                all_data = self.fetch_all_data()  # ✅ lấy toàn bộ dữ liệu mới nhất
-                data = {tf: all_data[tf] for tf in strategy.timeframes if tf in all_data}
-                strategy.run_strategy(data)
+                self.run_cycle(strategy)
                 
                 # Sleep for the strategy's interval
-                time.sleep(strategy.config.get('interval', 60))
+                self.clock.sleep(self._interval(strategy))
                 
             except Exception as e:
                 self.logger.error(f"Error in strategy {strategy.__class__.__name__}: {str(e)}")
-                time.sleep(5)  # Wait before retrying
+                self.clock.sleep(5)  # Wait before retrying
+
+    def replay(self, until, exit_timeframe: str = 'M1') -> int:
+        """
+        Drive every strategy through its live cycle on a virtual clock until
+        `until`, in a single thread and without waiting.
+
+        The clock jumps to the next due cycle instead of sleeping. Before each
+        cycle, the trade manager settles SL/TP against the `exit_timeframe`
+        bars closed since the previous cycle when it supports process_bars().
+
+        Args:
+            until: Time at which the replay stops
+            exit_timeframe: Timeframe used to detect SL/TP touches
+
+        Returns:
+            int: Number of strategy cycles run
+        """
+        cycles = 0
+        previous = self.clock.now()
+        next_due = {name: previous for name in self.strategies}
+        settle = hasattr(self.trade_manager, 'process_bars') and hasattr(self.data_manager, 'bars_between')
+
+        while next_due:
+            now = min(next_due.values())
+            if now > until:
+                break
+            self.clock.advance_to(now)
+
+            if settle and now > previous:
+                self.trade_manager.process_bars(
+                    self.data_manager.bars_between(exit_timeframe, previous, now), exit_timeframe
+                )
+                self.risk_manager.update_open_positions(len(self.trade_manager.get_open_positions()))
+            previous = now
+
+            for name, strategy in self.strategies.items():
+                if next_due[name] > now:
+                    continue
+                try:
+                    self.run_cycle(strategy)
+                    next_due[name] = now + timedelta(seconds=self._interval(strategy))
+                except Exception as e:
+                    self.logger.error(f"Error in strategy {strategy.__class__.__name__}: {str(e)}")
+                    next_due[name] = now + timedelta(seconds=5)
+                cycles += 1
+
+        return cycles
                 
     def start(self):
         """Start all strategies"""
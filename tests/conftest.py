@@ -0,0 +1,130 @@
+"""
+Shared fixtures of the backtest tests.
+
+The tests run offline on a slice of the bundled data in backtest/data
+(MetaTrader5 is not needed) inside a temporary working directory, so runs
+never write into the repository's backtest/ folders.
+"""
+
+import copy
+import json
+import logging
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from backtest import Backtest  # noqa: E402
+
+# Symbol specification of XAUUSDm used instead of MT5
+POINT = 0.001
+PIP_VALUE = 0.1
+
+# Days of bundled data the tests run on, at the end of the stored history
+TEST_DAYS = 40
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Run every test in a temporary directory with the logs/ folder the managers log to"""
+    (tmp_path / 'logs').mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    """Per-step INFO logging of the strategy and the backtest slows runs down"""
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture(scope='session')
+def market_data():
+    """Last TEST_DAYS days of the bundled M5, M15 and H1 data"""
+    data = {}
+    for tf in ('M5', 'M15', 'H1'):
+        df = pd.read_csv(os.path.join(ROOT, 'backtest', 'data', f'{tf}.csv'))
+        df['time'] = pd.to_datetime(df['time'])
+        data[tf] = df
+    start = data['M5']['time'].iloc[-1] - pd.Timedelta(days=TEST_DAYS)
+    return {tf: df[df['time'] >= start].reset_index(drop=True) for tf, df in data.items()}
+
+
+@pytest.fixture(scope='session')
+def strategy_config():
+    """
+    The bundled RSI strategy config with looser medium and long levels, so
+    that the test range carries enough signals to hit the position limit
+    """
+    with open(os.path.join(ROOT, 'config', 'strategies', 'rsi_strategy.json'), 'r') as f:
+        config = json.load(f)
+    config['parameters']['rsi_levels'] = {
+        'short': {'overbought': 90, 'oversold': 10},
+        'medium': {'overbought': 80, 'oversold': 25},
+        'long': {'overbought': 75, 'oversold': 25}
+    }
+    return config
+
+
+@pytest.fixture
+def config():
+    """
+    Main config with the result cache and abort rules off and a balance that
+    lasts through the test range
+    """
+    with open(os.path.join(ROOT, 'config', 'config.json'), 'r') as f:
+        config = json.load(f)
+    config['strategies']['config_path'] = os.path.join(ROOT, 'config', 'strategies')
+    config['backtest']['result_cache']['enabled'] = False
+    config['backtest']['abort']['enabled'] = False
+    config['backtest']['engine'] = 'loop'
+    config['backtest']['initial_balance'] = 10000
+    return config
+
+
+@pytest.fixture
+def make_backtest(workdir):
+    """Factory of Backtest instances working in the temporary directory"""
+    def make(config):
+        return Backtest(copy.deepcopy(config), log_file=False)
+
+    return make
+
+
+@pytest.fixture
+def write_data(workdir, strategy_config):
+    """
+    Write market data, the symbol specification and the test strategy config
+    to the temporary working directory, as run_sharded and run_incremental
+    load them from disk
+    """
+    def write(data):
+        data_dir = workdir / 'backtest' / 'data'
+        data_dir.mkdir(parents=True, exist_ok=True)
+        for tf, df in data.items():
+            df.to_csv(data_dir / f'{tf}.csv', index=False)
+        with open(data_dir / 'symbol.json', 'w') as f:
+            json.dump({'XAUUSDm': {'point': POINT, 'trade_tick_value': PIP_VALUE}}, f)
+        strategies_dir = workdir / 'config' / 'strategies'
+        strategies_dir.mkdir(parents=True, exist_ok=True)
+        with open(strategies_dir / 'rsi_strategy.json', 'w') as f:
+            json.dump(strategy_config, f)
+        return str(strategies_dir)
+
+    return write
+
+
+def trade_key(trade):
+    """Comparable form of a trade, without the order id of the trade manager"""
+    return (
+        pd.Timestamp(trade['time']), trade['type'], trade['timeframe'],
+        round(trade['price'], 9), round(trade['volume'], 12),
+        trade['exit_type'], pd.Timestamp(trade['exit_time']),
+        round(trade['exit_price'], 9), round(trade['profit'], 9)
+    )
@@ -0,0 +1,52 @@
+"""Event-driven engine against the per-step loop engine"""
+
+import pytest
+
+from conftest import POINT, PIP_VALUE, trade_key
+from core.run_monitor import AbortRules
+
+RANGES = [(None, None), (1000, 4000), (4000, 4100)]
+
+RULES = {
+    'none': None,
+    'drawdown': AbortRules(max_drawdown=0.05),
+    'min_trades': AbortRules(min_trades=150, min_trades_after_days=10)
+}
+
+
+def run_engines(config, strategy_config, market_data, make_backtest, **kwargs):
+    results = {}
+    for engine in ('loop', 'events'):
+        config['backtest']['engine'] = engine
+        results[engine] = make_backtest(config).simulate(market_data, strategy_config, POINT, PIP_VALUE, **kwargs)
+    return results['loop'], results['events']
+
+
+def assert_same_run(loop, events, initial_balance):
+    assert list(map(trade_key, events['trades'])) == list(map(trade_key, loop['trades']))
+    assert events['equity_curve'].equals(loop['equity_curve'])
+    assert events['metrics'] == loop['metrics']
+
+    # Every booked PnL is in the final balance and nothing else is
+    total = sum(trade['profit'] for trade in loop['trades'])
+    final = loop['equity_curve']['balance'].iloc[-1] if len(loop['equity_curve']) else initial_balance
+    assert total == pytest.approx(final - initial_balance, abs=1e-6)
+
+
+@pytest.mark.parametrize('rules', RULES, ids=list(RULES))
+@pytest.mark.parametrize('start, end', RANGES)
+def test_event_engine_matches_loop(start, end, rules, config, strategy_config, market_data, make_backtest):
+    loop, events = run_engines(
+        config, strategy_config, market_data, make_backtest, start=start, end=end, abort=RULES[rules]
+    )
+    assert_same_run(loop, events, config['backtest']['initial_balance'])
+    if start is None:
+        assert loop['metrics']['total_trades'] > 0
+        assert bool(loop['metrics'].get('aborted')) == (rules != 'none')
+
+
+def test_event_engine_matches_loop_on_depleted_balance(config, strategy_config, market_data, make_backtest):
+    config['backtest']['initial_balance'] = 100
+    loop, events = run_engines(config, strategy_config, market_data, make_backtest)
+    assert loop['equity_curve']['balance'].iloc[-1] <= 0
+    assert_same_run(loop, events, 100)
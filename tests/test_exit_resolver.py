@@ -0,0 +1,162 @@
+"""Batch SL/TP exit resolution against a per-trade M1 walk"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import POINT, PIP_VALUE
+from core.exit_resolver import resolve_exits
+from core.hierarchical_exit import HierarchicalExitEngine
+from core.range_extrema import RangeExtremaIndex
+
+
+@pytest.fixture(scope='module')
+def m1():
+    """Gapless synthetic M1 random walk"""
+    rng = np.random.default_rng(7)
+    n = 3000
+    close = 2000 + np.cumsum(rng.normal(0, 0.5, n))
+    open_ = np.concatenate([[2000], close[:-1]])
+    return pd.DataFrame({
+        'time': pd.date_range('2025-01-06', periods=n, freq='1min'),
+        'open': open_,
+        'high': np.maximum(open_, close) + np.abs(rng.normal(0, 0.3, n)),
+        'low': np.minimum(open_, close) - np.abs(rng.normal(0, 0.3, n)),
+        'close': close
+    })
+
+
+@pytest.fixture(scope='module')
+def trades(m1):
+    """Random BUY/SELL trades with entries on and between bar opens"""
+    rng = np.random.default_rng(11)
+    n = 400
+    bars = rng.integers(0, len(m1) - 1, n)
+    entry_times = m1['time'].to_numpy()[bars] + rng.integers(0, 60, n).astype('timedelta64[s]')
+    prices = m1['close'].to_numpy()[bars]
+    sides = rng.choice([1, -1], n)
+    # Narrow distances make bars that touch both levels, wide ones time out
+    sl_distance = rng.uniform(0.2, 8, n)
+    tp_distance = rng.uniform(0.2, 8, n)
+    return pd.DataFrame({
+        'time': pd.to_datetime(entry_times),
+        'type': np.where(sides > 0, 'BUY', 'SELL'),
+        'side': sides,
+        'sl': prices - sides * sl_distance,
+        'tp': prices + sides * tp_distance
+    })
+
+
+def resolve(trades, m1):
+    return resolve_exits(
+        trades['time'].to_numpy(), trades['side'].to_numpy(),
+        trades['sl'].to_numpy(), trades['tp'].to_numpy(),
+        m1['time'].to_numpy(), m1['high'].to_numpy(), m1['low'].to_numpy(), m1['close'].to_numpy()
+    )
+
+
+def scan_exit(trade, m1):
+    """Per-trade walk over the M1 bars opened in [entry, entry + 60 minutes)"""
+    window = m1[(m1['time'] >= trade['time']) & (m1['time'] < trade['time'] + pd.Timedelta(minutes=60))]
+    buy = trade['side'] > 0
+    for bar in window.itertuples():
+        if (bar.low <= trade['sl']) if buy else (bar.high >= trade['sl']):
+            return trade['sl'], 'sl', bar.time
+        if (bar.high >= trade['tp']) if buy else (bar.low <= trade['tp']):
+            return trade['tp'], 'tp', bar.time
+    last = window.iloc[-1]
+    return last['close'], 'timeout', last['time']
+
+
+def test_batch_matches_per_trade_walk(trades, m1):
+    exit_price, exit_type, exit_time = resolve(trades, m1)
+    complete = trades['time'] + pd.Timedelta(minutes=60) <= m1['time'].iloc[-1]
+    assert complete.sum() > 300
+
+    for k in np.flatnonzero(complete):
+        expected_price, expected_type, expected_time = scan_exit(trades.iloc[k], m1)
+        assert (exit_type[k], exit_price[k]) == (expected_type, expected_price), f"trade {k}"
+        assert exit_time[k] == expected_time.to_datetime64(), f"trade {k}"
+
+    assert set(exit_type[complete.to_numpy()]) == {'sl', 'tp', 'timeout'}
+
+
+def test_stop_loss_wins_when_one_bar_touches_both(m1):
+    bar = m1.iloc[100]
+    trades = pd.DataFrame({
+        'time': [bar['time']] * 2,
+        'side': [1, -1],
+        'sl': [bar['low'], bar['high']],
+        'tp': [bar['high'], bar['low']]
+    })
+    exit_price, exit_type, exit_time = resolve(trades, m1)
+    assert list(exit_type) == ['sl', 'sl']
+    assert list(exit_price) == [bar['low'], bar['high']]
+    assert (exit_time == bar['time'].to_datetime64()).all()
+
+
+@pytest.fixture
+def signal_bar_data():
+    """
+    M1 bars from 10:00 whose 10:03 bar dips to 98, inside the M5 signal bar
+    10:00-10:05, and whose 10:07 bar rallies to 102.5; M5 bars built from them
+    """
+    times = pd.date_range('2025-01-06 10:00', periods=30, freq='1min')
+    high = np.full(30, 100.2)
+    low = np.full(30, 99.8)
+    low[3] = 98.0
+    high[7] = 102.5
+    m1 = pd.DataFrame({'time': times, 'open': 100.0, 'high': high, 'low': low, 'close': 100.0})
+    m5 = m1.groupby(m1['time'].dt.floor('5min')).agg(
+        {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last'}
+    ).reset_index()
+    return {'M1': m1, 'M5': m5}
+
+
+def test_touch_inside_the_signal_bar_is_ignored(signal_bar_data):
+    """A BUY filled at the 10:05 close of its signal bar exits at TP on the 10:07 bar"""
+    m1 = signal_bar_data['M1']
+    args = (
+        np.array(['2025-01-06T10:05'], dtype='datetime64[ns]'), np.array([1]), np.array([99.0]), np.array([102.0]),
+        m1['time'].to_numpy(), m1['high'].to_numpy(), m1['low'].to_numpy(), m1['close'].to_numpy()
+    )
+    engine = HierarchicalExitEngine(signal_bar_data, timeframes=['M5', 'M1'])
+    results = {
+        'dense': resolve_exits(*args),
+        'indexed': resolve_exits(*args, index=RangeExtremaIndex(m1['high'], m1['low'])),
+        'hierarchical': engine.resolve(*args[:4])
+    }
+    for name, (exit_price, exit_type, exit_time) in results.items():
+        assert (exit_type[0], exit_price[0]) == ('tp', 102.0), name
+        assert exit_time[0] == np.datetime64('2025-01-06T10:07', 'ns'), name
+
+
+def test_window_without_bars_times_out_at_the_entry(signal_bar_data):
+    """A market closure after the signal bar leaves no bar in the holding window"""
+    m1 = signal_bar_data['M1']
+    m1 = m1.assign(time=m1['time'].where(m1.index < 5, m1['time'] + pd.Timedelta(hours=2)))
+    exit_price, exit_type, exit_time = resolve_exits(
+        np.array(['2025-01-06T10:05'], dtype='datetime64[ns]'), np.array([1]), np.array([90.0]), np.array([110.0]),
+        m1['time'].to_numpy(), m1['high'].to_numpy(), m1['low'].to_numpy(), m1['close'].to_numpy()
+    )
+    assert (exit_type[0], exit_price[0]) == ('timeout', 100.0)
+    assert exit_time[0] == np.datetime64('2025-01-06T10:05', 'ns')
+
+
+def test_backtest_entries_fill_at_the_signal_bar_close(config, strategy_config, market_data, make_backtest):
+    results = make_backtest(config).simulate(market_data, strategy_config, POINT, PIP_VALUE)
+    closes = set(market_data['M5']['time'] + pd.Timedelta(minutes=5))
+    assert results['trades']
+    for trade in results['trades']:
+        assert trade['time'] in closes
+        assert trade['exit_time'] >= trade['time']
+
+
+def test_partial_window_stays_unresolved(trades, m1):
+    exit_price, exit_type, exit_time = resolve(trades, m1)
+    partial = (trades['time'] + pd.Timedelta(minutes=60) > m1['time'].iloc[-1]).to_numpy()
+    untouched = partial & (exit_type == None)  # noqa: E711
+    assert untouched.any()
+    assert np.isnan(exit_price[untouched]).all()
+    assert np.isnat(exit_time[untouched]).all()
+    assert 'timeout' not in set(exit_type[partial])
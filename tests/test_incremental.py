@@ -0,0 +1,55 @@
+"""Incremental backtest in two parts against one incremental run over all bars"""
+
+import os
+
+import pandas as pd
+
+from conftest import POINT, PIP_VALUE
+from core.results_sink import read_columns
+from core.timeframe_cursor import timeframe_delta
+
+
+def stored_results():
+    trades = read_columns('backtest/results/incremental/trades').drop(columns='order_id')
+    equity = read_columns('backtest/results/incremental/equity')
+    return trades, equity
+
+
+def test_two_incremental_runs_match_one_run(config, strategy_config, market_data, make_backtest, write_data):
+    cut = market_data['M5']['time'].iloc[int(len(market_data['M5']) * 0.7)]
+    config['strategies']['config_path'] = write_data({
+        tf: df[df['time'] + timeframe_delta(tf) <= cut] for tf, df in market_data.items()
+    })
+    backtest = make_backtest(config)
+    first = backtest.run_incremental()
+    assert first['metrics']['total_trades'] > 0
+
+    write_data(market_data)
+    backtest.run_incremental()
+    trades, equity = stored_results()
+    with open('backtest/results/incremental/metrics.json', 'r') as f:
+        metrics = f.read()
+
+    # No new bars: success with the stored metrics
+    unchanged = backtest.run_incremental()
+    assert unchanged is not None
+    assert unchanged['trades'] == [] and len(unchanged['equity_curve']) == 0
+    assert unchanged['metrics']['total_trades'] == len(trades)
+
+    os.remove('backtest/state/rsi_strategy.pkl')
+    backtest.run_incremental()
+    one_trades, one_equity = stored_results()
+    with open('backtest/results/incremental/metrics.json', 'r') as f:
+        one_metrics = f.read()
+
+    assert len(trades) > first['metrics']['total_trades']
+    pd.testing.assert_frame_equal(trades, one_trades)
+    pd.testing.assert_frame_equal(equity, one_equity)
+    assert metrics == one_metrics
+
+    # simulate() books the same trades and settles the ones left open at the end
+    full = backtest.simulate(backtest.load_data(), strategy_config, POINT, PIP_VALUE)
+    settled = pd.DataFrame([t for t in full['trades'] if t['exit_type'] != 'end'])
+    assert len(settled) == len(trades)
+    for column in ('time', 'type', 'price', 'volume', 'exit_time', 'exit_price', 'profit'):
+        assert (settled[column].to_numpy() == trades[column].to_numpy()).all(), column
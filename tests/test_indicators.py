@@ -0,0 +1,55 @@
+"""IncrementalRSI and the per-timeframe signal cache of RSIStrategy"""
+
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from core.indicators import IncrementalRSI, calculate_rsi_rma
+from core.timeframe_cursor import MultiTimeframeCursor
+from strategies.rsi_strategy import RSIStrategy
+
+
+@pytest.mark.parametrize('period', [6, 14, 24])
+def test_incremental_rsi_matches_rma_bit_for_bit(period):
+    m5 = pd.read_csv(os.path.join(ROOT, 'backtest', 'data', 'M5.csv'))
+    rsi = IncrementalRSI(period)
+    values = np.array([rsi.update(close) for close in m5['close'].to_numpy()])
+    assert np.array_equal(values, calculate_rsi_rma(m5, period).to_numpy(), equal_nan=True)
+
+
+def test_incremental_rsi_copy_is_independent():
+    rsi = IncrementalRSI(6)
+    for close in [10, 11, 12, 11, 13, 12, 14]:
+        rsi.update(close)
+    other = rsi.copy()
+    other.update(5)
+    assert rsi.value != other.value
+    rsi.update(5)
+    assert rsi.value == other.value
+
+
+def test_cached_signals_follow_bars_updated_in_place(config, strategy_config, market_data):
+    """A forming last bar, then its final close, gives the signals and RSI of a full pass"""
+    merged_config = copy.deepcopy(config)
+    merged_config['strategy'] = strategy_config
+    strategy = RSIStrategy(merged_config)
+    cursor = MultiTimeframeCursor(market_data, 'M5')
+    arrays = strategy.build_signal_arrays(market_data, cursor)
+
+    for i in range(2000, 2300):
+        window = cursor.window(i)
+        forming = dict(window)
+        forming['M5'] = window['M5'].copy()
+        forming['M5'].iloc[-1, forming['M5'].columns.get_loc('close')] += 1.5
+        strategy.check_signals(forming)
+
+        assert strategy.check_signals(window) == strategy.signals_at(arrays, i), f"step {i}"
+        state = strategy.get_state()['timeframes']
+        for tf in strategy.timeframes:
+            for period in strategy.rsi_periods.values():
+                expected = calculate_rsi_rma(window[tf], period).iloc[-1]
+                assert state[tf]['rsi'][period].value == expected, f"step {i} {tf} RSI({period})"
@@ -0,0 +1,62 @@
+"""Study persistence and GeneticOptimizer ranking"""
+
+import json
+
+import numpy as np
+import pytest
+
+from core.optimizer import COMPLETE, PRUNED, FAILED, GeneticOptimizer, SearchSpace, Study
+
+SPACE = {
+    'rsi_periods.short': {'low': 4, 'high': 12},
+    'risk_management.stop_loss_pips': {'low': 20, 'high': 100, 'step': 5}
+}
+
+
+def read_lines(path):
+    with open(path, 'r') as f:
+        return f.read().splitlines()
+
+
+def test_study_resumes_after_truncated_line(tmp_path):
+    path = str(tmp_path / 'studies' / 'rsi.jsonl')
+    study = Study(path, SPACE, 'sharpe_ratio')
+    study.add({'rsi_periods.short': 6, 'risk_management.stop_loss_pips': 50}, COMPLETE, 1.2, {'total_trades': 10}, 0.5)
+    study.add({'rsi_periods.short': 8, 'risk_management.stop_loss_pips': 30}, PRUNED, -0.4, {'total_trades': 2}, 0.1)
+    study.add({'rsi_periods.short': 9, 'risk_management.stop_loss_pips': 90}, FAILED, None, {'total_trades': 0}, 0.2)
+    # Interrupted in the middle of writing the next trial
+    with open(path, 'a') as f:
+        f.write('{"type": "trial", "number": 3, "params": {"rsi_peri')
+
+    resumed = Study(path, SPACE, 'sharpe_ratio')
+    assert [t['state'] for t in resumed.trials] == [COMPLETE, PRUNED, FAILED]
+    assert resumed.best()['value'] == 1.2
+    assert list(resumed.table()['number']) == [0, 1, 2]
+
+    resumed.add({'rsi_periods.short': 5, 'risk_management.stop_loss_pips': 60}, COMPLETE, 2.0, {}, 0.3)
+    records = [json.loads(line) for line in read_lines(path)]
+    assert [r.get('number') for r in records] == [None, 0, 1, 2, 3]
+    assert Study(path, SPACE, 'sharpe_ratio').best()['value'] == 2.0
+
+
+def test_study_rejects_a_different_space(tmp_path):
+    path = str(tmp_path / 'rsi.jsonl')
+    Study(path, SPACE, 'sharpe_ratio')
+    with pytest.raises(ValueError):
+        Study(path, SPACE, 'net_profit')
+    with pytest.raises(ValueError):
+        Study(path, {'rsi_periods.short': {'low': 4, 'high': 14}}, 'sharpe_ratio')
+
+
+def test_pruned_trials_rank_below_complete_ones():
+    optimizer = GeneticOptimizer(SearchSpace(SPACE), population=3, rng=np.random.default_rng(0))
+    optimizer.tell({'rsi_periods.short': 4, 'risk_management.stop_loss_pips': 20}, 5.0, pruned=True)
+    optimizer.tell({'rsi_periods.short': 5, 'risk_management.stop_loss_pips': 25}, 0.5)
+    optimizer.tell({'rsi_periods.short': 6, 'risk_management.stop_loss_pips': 30}, 1.0)
+    optimizer.tell({'rsi_periods.short': 7, 'risk_management.stop_loss_pips': 35}, None)
+    optimizer.tell({'rsi_periods.short': 8, 'risk_management.stop_loss_pips': 40}, float('nan'))
+
+    assert [params['rsi_periods.short'] for _, _, params in optimizer.scored] == [6, 5, 4]
+    assert len(optimizer.seen) == 5
+    for _ in range(20):
+        assert optimizer.space.key(optimizer.ask()) not in optimizer.seen
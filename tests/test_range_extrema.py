@@ -0,0 +1,92 @@
+"""RangeExtremaIndex queries against brute-force scans"""
+
+import numpy as np
+import pytest
+
+from core.exit_resolver import resolve_exits
+from core.range_extrema import RangeExtremaIndex
+
+
+@pytest.fixture(scope='module')
+def bars():
+    rng = np.random.default_rng(3)
+    n = 1000
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    highs = close + np.abs(rng.normal(0, 0.5, n))
+    lows = close - np.abs(rng.normal(0, 0.5, n))
+    return highs, lows, close
+
+
+@pytest.fixture(scope='module')
+def queries(bars):
+    """Random [start, stop) ranges including single bars and the full series"""
+    rng = np.random.default_rng(5)
+    n = len(bars[0])
+    start = rng.integers(0, n, 2000)
+    stop = np.minimum(start + rng.integers(1, 300, 2000), n)
+    start = np.concatenate([start, [0, n - 1, 17]])
+    stop = np.concatenate([stop, [n, n, 18]])
+    return start, stop
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 7, 8, 9, 1000])
+def test_range_max_min_match_brute_force(n, bars):
+    highs, lows = bars[0][:n], bars[1][:n]
+    index = RangeExtremaIndex(highs, lows)
+    start, stop = np.triu_indices(n + 1, k=1)
+    if len(start) > 5000:
+        keep = np.random.default_rng(n).choice(len(start), 5000, replace=False)
+        start, stop = start[keep], stop[keep]
+
+    assert np.array_equal(index.range_max(start, stop), [highs[a:b].max() for a, b in zip(start, stop)])
+    assert np.array_equal(index.range_min(start, stop), [lows[a:b].min() for a, b in zip(start, stop)])
+
+
+def first_crossing(values, start, stop, hit):
+    for j in range(start, stop):
+        if hit(values[j]):
+            return j
+    return stop
+
+
+def test_first_crossing_matches_brute_force(bars, queries):
+    highs, lows, close = bars
+    start, stop = queries
+    index = RangeExtremaIndex(highs, lows)
+    rng = np.random.default_rng(9)
+    # Levels around the start close, some exactly at a bar's high or low
+    up = close[start] + rng.uniform(-1, 10, len(start))
+    down = close[start] - rng.uniform(-1, 10, len(start))
+    up[::7] = highs[np.minimum(start + 5, len(highs) - 1)][::7]
+    down[::7] = lows[np.minimum(start + 5, len(lows) - 1)][::7]
+
+    expected_up = [first_crossing(highs, a, b, lambda v, x=x: v >= x) for a, b, x in zip(start, stop, up)]
+    expected_down = [first_crossing(lows, a, b, lambda v, x=x: v <= x) for a, b, x in zip(start, stop, down)]
+    found_up = index.first_high_at_or_above(start, stop, up)
+    found_down = index.first_low_at_or_below(start, stop, down)
+
+    assert np.array_equal(found_up, expected_up)
+    assert np.array_equal(found_down, expected_down)
+    assert (found_up < stop).any() and (found_up == stop).any()
+
+
+@pytest.mark.parametrize('holding_minutes', [5, 60, 240])
+def test_indexed_exits_match_dense_scan(bars, holding_minutes):
+    highs, lows, close = bars
+    times = np.datetime64('2025-01-06T00:00', 'ns') + np.arange(len(close)) * np.timedelta64(1, 'm')
+    rng = np.random.default_rng(holding_minutes)
+    n = 500
+    entry = rng.integers(0, len(close), n)
+    sides = rng.choice([1, -1], n)
+    sl = close[entry] - sides * rng.uniform(0.5, 15, n)
+    tp = close[entry] + sides * rng.uniform(0.5, 15, n)
+    args = (times[entry], sides, sl, tp, times, highs, lows, close)
+    holding = np.timedelta64(holding_minutes, 'm')
+
+    dense = resolve_exits(*args, holding=holding)
+    indexed = resolve_exits(*args, holding=holding, index=RangeExtremaIndex(highs, lows))
+
+    assert np.array_equal(dense[0], indexed[0], equal_nan=True)
+    assert np.array_equal(dense[1], indexed[1])
+    assert np.array_equal(dense[2], indexed[2], equal_nan=True)
+    assert {'sl', 'tp'} <= set(dense[1])
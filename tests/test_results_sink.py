@@ -0,0 +1,30 @@
+"""Backtest results streamed to disk through a ResultsSink"""
+
+import json
+import math
+import os
+
+
+def test_streamed_run_reports_the_full_metrics(config, make_backtest, write_data, market_data):
+    config['strategies']['config_path'] = write_data(market_data)
+    # Mark-to-market needs the trades in memory and is skipped for streamed runs
+    config['backtest']['mark_to_market'] = False
+    expected = make_backtest(config).run_backtest()['metrics']
+
+    config['backtest']['results'] = {'stream': True, 'batch_rows': 7}
+    backtest = make_backtest(config)
+    metrics = backtest.run_backtest()['metrics']
+
+    assert expected['total_trades'] > 7
+    assert set(metrics) == set(expected)
+    for key, value in expected.items():
+        if isinstance(value, float) and not math.isnan(value):
+            assert math.isclose(metrics[key], value, rel_tol=1e-9), key
+        elif isinstance(value, float):
+            assert math.isnan(metrics[key]), key
+        else:
+            assert metrics[key] == value, key
+
+    (run_dir,) = [d for d in os.listdir(backtest.results_dir) if d.startswith('run_')]
+    with open(f"{backtest.results_dir}/{run_dir}/metrics.json", 'r') as f:
+        assert json.load(f)['sharpe_ratio'] == metrics['sharpe_ratio']
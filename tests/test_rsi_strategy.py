@@ -0,0 +1,39 @@
+"""Vectorized signal arrays of RSIStrategy against the per-step check_signals path"""
+
+import copy
+
+from conftest import POINT, PIP_VALUE, trade_key
+from core.timeframe_cursor import MultiTimeframeCursor
+from strategies.rsi_strategy import RSIStrategy
+
+
+def make_strategy(config, strategy_config):
+    merged_config = copy.deepcopy(config)
+    merged_config['strategy'] = strategy_config
+    return RSIStrategy(merged_config)
+
+
+def test_signals_at_matches_check_signals_on_every_step(config, strategy_config, market_data):
+    cursor = MultiTimeframeCursor(market_data, 'M5')
+    vectorized = make_strategy(config, strategy_config)
+    arrays = vectorized.build_signal_arrays(market_data, cursor)
+    stepwise = make_strategy(config, strategy_config)
+
+    signal_steps = 0
+    for i in range(len(cursor)):
+        expected = stepwise.check_signals(cursor.window(i))
+        assert vectorized.signals_at(arrays, i) == expected, f"step {i} ({cursor.time(i)})"
+        signal_steps += bool(expected)
+    assert signal_steps > 0
+
+
+def test_vectorized_backtest_matches_loop(config, strategy_config, market_data, make_backtest):
+    results = {}
+    for vectorized in (True, False):
+        config['backtest']['vectorized'] = vectorized
+        results[vectorized] = make_backtest(config).simulate(market_data, strategy_config, POINT, PIP_VALUE)
+
+    assert results[True]['metrics']['total_trades'] > 0
+    assert list(map(trade_key, results[True]['trades'])) == list(map(trade_key, results[False]['trades']))
+    assert results[True]['equity_curve'].equals(results[False]['equity_curve'])
+    assert results[True]['metrics'] == results[False]['metrics']
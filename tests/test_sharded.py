@@ -0,0 +1,17 @@
+"""Time-sharded backtest against a single simulate() run"""
+
+from conftest import POINT, PIP_VALUE, trade_key
+
+
+def test_sharded_run_matches_simulate(config, strategy_config, market_data, make_backtest, write_data):
+    config['strategies']['config_path'] = write_data(market_data)
+    backtest = make_backtest(config)
+    data = backtest.load_data()
+
+    expected = backtest.simulate(data, strategy_config, POINT, PIP_VALUE)
+    sharded = backtest.run_sharded(shards=4, warmup_bars=500, max_workers=2)
+
+    assert expected['metrics']['total_trades'] > 0
+    assert list(map(trade_key, sharded['trades'])) == list(map(trade_key, expected['trades']))
+    assert sharded['equity_curve'].equals(expected['equity_curve'])
+    assert sharded['metrics'] == expected['metrics']
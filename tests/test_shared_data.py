@@ -0,0 +1,43 @@
+"""Market data shared with pool workers through shared memory"""
+
+import pandas as pd
+import pytest
+
+from conftest import POINT, PIP_VALUE, trade_key
+from core.shared_data import SharedMarketData, attach_market_data
+
+
+def test_attached_frames_equal_the_originals(market_data):
+    with SharedMarketData(market_data) as shared:
+        blocks, data = attach_market_data(shared.descriptor())
+        try:
+            assert list(data) == list(market_data)
+            for tf, df in market_data.items():
+                pd.testing.assert_frame_equal(data[tf], df)
+                assert not data[tf]['close'].to_numpy().flags.writeable
+        finally:
+            del data
+            for block in blocks:
+                block.close()
+
+
+def test_backtest_on_shared_data_matches_loaded_data(config, strategy_config, market_data, make_backtest):
+    backtest = make_backtest(config)
+    expected = backtest.simulate(market_data, strategy_config, POINT, PIP_VALUE)
+    with SharedMarketData(market_data) as shared:
+        blocks, data = attach_market_data(shared.descriptor())
+        try:
+            results = backtest.simulate(data, strategy_config, POINT, PIP_VALUE)
+        finally:
+            del data
+            for block in blocks:
+                block.close()
+
+    assert list(map(trade_key, results['trades'])) == list(map(trade_key, expected['trades']))
+    assert results['equity_curve'].equals(expected['equity_curve'])
+
+
+def test_object_columns_are_rejected():
+    df = pd.DataFrame({'time': pd.date_range('2025-01-01', periods=3, freq='5min'), 'symbol': ['a', 'b', 'c']})
+    with pytest.raises(ValueError):
+        SharedMarketData({'M5': df})
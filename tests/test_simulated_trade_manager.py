@@ -0,0 +1,49 @@
+"""Broker-side SL/TP settlement of SimulatedTradeManager"""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from core.clock import VirtualClock
+from core.simulated_trade_manager import SimulatedTradeManager
+
+
+@pytest.fixture
+def trading_config(config):
+    return config['trading']
+
+
+def bars(rows):
+    return pd.DataFrame(rows, columns=['time', 'high', 'low']).assign(time=lambda df: pd.to_datetime(df['time']))
+
+
+def test_position_opened_inside_a_bar_ignores_that_bar(trading_config):
+    clock = VirtualClock(datetime(2025, 5, 11, 22, 16))
+    manager = SimulatedTradeManager(trading_config, clock=clock)
+    manager.place_order('BUY', 0.01, price=100.0, sl=99.0, tp=102.0)
+
+    # The M5 bar that opened at 22:15 dipped below the SL before the entry
+    assert manager.process_bars(bars([('2025-05-11 22:15', 100.5, 98.0)]), 'M5') == []
+    assert len(manager.get_open_positions()) == 1
+
+    closed = manager.process_bars(bars([
+        ('2025-05-11 22:20', 101.0, 99.5),
+        ('2025-05-11 22:25', 102.5, 99.5)
+    ]), 'M5')
+    assert len(closed) == 1
+    assert closed[0]['exit_type'] == 'tp'
+    assert closed[0]['price_close'] == 102.0
+    assert closed[0]['close_time'] == pd.Timestamp('2025-05-11 22:30')
+    assert manager.get_open_positions() == []
+
+
+def test_stop_loss_wins_on_a_bar_touching_both_levels(trading_config):
+    clock = VirtualClock(datetime(2025, 5, 11, 22, 15))
+    manager = SimulatedTradeManager(trading_config, clock=clock)
+    manager.place_order('SELL', 0.01, price=100.0, sl=101.0, tp=98.0)
+
+    closed = manager.process_bars(bars([('2025-05-11 22:15', 101.5, 97.5)]), 'M1')
+    assert [(p['exit_type'], p['price_close'], p['close_time']) for p in closed] == [
+        ('sl', 101.0, pd.Timestamp('2025-05-11 22:16'))
+    ]